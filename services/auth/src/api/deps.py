@@ -1,7 +1,9 @@
-from db.session import Session
-from services.token import RefreshRequire, TokenFactory
+from db.session import ReadSession, Session
+from services.token import RefreshDecoded, RefreshRequire, TokenFactory
 
 __all__ = [
+    "ReadSession",
+    "RefreshDecoded",
     "RefreshRequire",
     "TokenFactory",
     "Session",
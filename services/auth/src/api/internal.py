@@ -0,0 +1,25 @@
+from hmac import compare_digest
+from typing import Annotated
+
+from fastapi import Depends, Header
+
+from core.configs.base import settings
+from core.exceptions import InternalRouteDisabled, InvalidServiceToken
+
+__all__ = [
+    "ServiceAuth",
+]
+
+
+async def _service_token_required(authorization: Annotated[str | None, Header()] = None) -> None:
+    """Let calls of other services through with the internal API token, or none while it is not set."""
+    if not settings.INTERNAL_API_TOKEN:
+        raise InternalRouteDisabled()
+
+    scheme, _, token = (authorization or "").partition(" ")
+
+    if scheme.lower() != "bearer" or not compare_digest(token.encode(), settings.INTERNAL_API_TOKEN.encode()):
+        raise InvalidServiceToken()
+
+
+ServiceAuth = Depends(_service_token_required)
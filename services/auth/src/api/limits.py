@@ -1,5 +1,6 @@
 from fastapi import Depends
-from shared.api.limits import rate_limiter
+
+from services.limits import credential_rate_limiter, rate_limiter
 
 __all__ = [
     "LimitLogin",
@@ -12,9 +13,9 @@ __all__ = [
 
 
 # AUTH LIMITERS
-LimitLogin = Depends(rate_limiter(requests=5, per="minute"))
+LimitLogin = Depends(credential_rate_limiter(requests=5, per="minute"))
 LimitLogout = Depends(rate_limiter(requests=10, per="minute"))
-LimitRegister = Depends(rate_limiter(requests=5, per="minute"))
+LimitRegister = Depends(credential_rate_limiter(requests=5, per="minute"))
 LimitTokenRefresh = Depends(rate_limiter(requests=10, per="minute"))
 
 # OAUTH2 LIMITERS
@@ -1,6 +1,9 @@
+from uuid import UUID
+
 from fastapi import APIRouter, status
 
-from api.deps import RefreshRequire, Session, TokenFactory
+from api.deps import ReadSession, RefreshRequire, Session, TokenFactory
+from api.internal import ServiceAuth
 from api.limits import LimitLogin, LimitLogout, LimitRegister
 from schemas import Credentials, LogoutStatus, TokenPair
 from services.auth import authenticate, register_account
@@ -16,7 +19,7 @@ async def register(creds: Credentials, session: Session, factory: TokenFactory)
 
 
 @router.post("/login", dependencies=[LimitLogin])
-async def login(creds: Credentials, session: Session, factory: TokenFactory) -> TokenPair:
+async def login(creds: Credentials, session: ReadSession, factory: TokenFactory) -> TokenPair:
     """Authenticate a client with provided credentials."""
     account = await authenticate(session, creds)
     return factory.create_pair(account)
@@ -27,3 +30,17 @@ async def logout(factory: RefreshRequire) -> LogoutStatus:
     """Revoke client authentication."""
     await factory.blacklist_token()
     return LogoutStatus()
+
+
+@router.post("/logout/all", dependencies=[LimitLogout])
+async def logout_everywhere(factory: RefreshRequire) -> LogoutStatus:
+    """Revoke all sessions of the client."""
+    await factory.revoke_account(factory.payload["sub"])
+    return LogoutStatus()
+
+
+@router.post("/internal/accounts/{account_id}/revoke", include_in_schema=False, dependencies=[ServiceAuth])
+async def revoke_account_sessions(account_id: UUID, factory: TokenFactory) -> LogoutStatus:
+    """Revoke all sessions of an account, e.g. after an incident."""
+    await factory.revoke_account(str(account_id))
+    return LogoutStatus()
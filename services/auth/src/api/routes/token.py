@@ -1,19 +1,55 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response, status
+from starlette.concurrency import run_in_threadpool
 
-from api.deps import RefreshRequire, TokenFactory
+from api.deps import RefreshDecoded
+from api.internal import ServiceAuth
 from api.limits import LimitTokenRefresh
-from schemas import JWKS, AccessToken, TokenPair
+from core.configs.jwt import jwt_settings
+from core.exceptions import BatchTooLarge
+from schemas import AccessToken, TokenBatch, TokenBatchRequest, TokenPair
+from services.batch import issue_access_tokens, issue_token_pairs, signing_pool
+from services.token import get_key_registry
 
 router = APIRouter(tags=["Token"])
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check `If-None-Match` header against entity tag with weak comparison."""
+    if not if_none_match:
+        return False
+
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
 @router.post("/token/refresh", dependencies=[LimitTokenRefresh])
-async def refresh_jwt_token(factory: RefreshRequire) -> AccessToken | TokenPair:
-    """Create a jwt access token from refresh token."""
+async def refresh_jwt_token(factory: RefreshDecoded) -> AccessToken | TokenPair:
+    """Create a jwt access token from refresh token, checking its revocation once while creating it."""
     return await factory.create_access_token_from_refresh()
 
 
 @router.get("/.well-known/jwks.json", include_in_schema=False)
-async def get_jwks(factory: TokenFactory) -> JWKS:
+async def get_jwks(request: Request) -> Response:
     """Get JSON web key set."""
-    return factory.jwks
+    keys = get_key_registry()
+    headers = {
+        "Cache-Control": f"public, max-age={jwt_settings.JWKS_MAX_AGE}",
+        "ETag": keys.jwks_etag,
+    }
+
+    if _etag_matches(request.headers.get("If-None-Match"), keys.jwks_etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=keys.jwks_document, media_type="application/json", headers=headers)
+
+
+@router.post("/internal/token/batch", include_in_schema=False, dependencies=[ServiceAuth])
+async def issue_token_batch(data: TokenBatchRequest) -> TokenBatch:
+    """Issue tokens for many subjects in one call."""
+    if len(data.subjects) > jwt_settings.BATCH_MAX_SIZE:
+        raise BatchTooLarge(jwt_settings.BATCH_MAX_SIZE)
+
+    issue = issue_token_pairs if data.pairs else issue_access_tokens
+    tokens = await run_in_threadpool(issue, data.subjects, signing_pool.executor)
+
+    return TokenBatch(tokens=tokens)
@@ -0,0 +1,91 @@
+from time import perf_counter
+from typing import Any
+
+from httpx import AsyncBaseTransport, AsyncHTTPTransport, Limits, Request, Response, Timeout
+
+from core.configs.http import http_settings
+from core.metrics import HTTP_CONNECTIONS_OPENED, HTTP_REQUEST_DURATION
+
+__all__ = [
+    "http_pools",
+    "HTTPPools",
+    "PooledTransport",
+]
+
+
+class PooledTransport(AsyncBaseTransport):
+    """
+    Transport over a long-lived connection pool, shared by short-lived clients.
+    Closing a client keeps pooled connections open; the pool is closed with `HTTPPools.aclose`.
+    """
+
+    __slots__ = (
+        "_name",
+        "_transport",
+    )
+
+    def __init__(self, name: str) -> None:
+        """Initialize connection pool."""
+        self._name = name
+        self._transport = AsyncHTTPTransport(
+            http2=http_settings.HTTP2,
+            retries=http_settings.RETRIES,
+            limits=Limits(
+                max_connections=http_settings.MAX_CONNECTIONS,
+                max_keepalive_connections=http_settings.MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=http_settings.KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+
+    async def handle_async_request(self, request: Request) -> Response:
+        request.extensions = {**request.extensions, "trace": self._trace}
+        started = perf_counter()
+
+        try:
+            return await self._transport.handle_async_request(request)
+        finally:
+            HTTP_REQUEST_DURATION.labels(self._name).observe(perf_counter() - started)
+
+    async def aclose(self) -> None:
+        """Keep the pool open for other clients."""
+
+    async def close_pool(self) -> None:
+        """Close pooled connections."""
+        await self._transport.aclose()
+
+    async def _trace(self, event_name: str, _: dict[str, Any]) -> None:
+        """Count new connections from `httpcore` trace events."""
+        if event_name == "connection.connect_tcp.complete":
+            HTTP_CONNECTIONS_OPENED.labels(self._name).inc()
+
+
+class HTTPPools:
+    """Connection pools of outbound HTTP clients by name, e.g. one per OAuth2 provider."""
+
+    TIMEOUT = Timeout(
+        connect=http_settings.CONNECT_TIMEOUT_SECONDS,
+        read=http_settings.READ_TIMEOUT_SECONDS,
+        write=http_settings.WRITE_TIMEOUT_SECONDS,
+        pool=http_settings.POOL_TIMEOUT_SECONDS,
+    )
+
+    __slots__ = ("_pools",)
+
+    def __init__(self) -> None:
+        """Initialize pools registry."""
+        self._pools: dict[str, PooledTransport] = {}
+
+    def get(self, name: str) -> PooledTransport:
+        """Get transport of a named pool, creating it on first use."""
+        if (pool := self._pools.get(name)) is None:
+            pool = self._pools[name] = PooledTransport(name)
+
+        return pool
+
+    async def aclose(self) -> None:
+        """Close all pools."""
+        for pool in self._pools.values():
+            await pool.close_pool()
+
+
+http_pools = HTTPPools()
@@ -1,13 +1,113 @@
+from time import perf_counter
+from typing import Any
+
+from redis.asyncio import BlockingConnectionPool, Connection, ConnectionPool
 from redis.asyncio import Redis as AsyncRedis
+from redis.asyncio import SSLConnection
+from redis.asyncio.sentinel import Sentinel, SentinelConnectionPool
+from redis.backoff import ExponentialWithJitterBackoff
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.retry import Retry
 
 from core.configs.redis import redis_settings
+from core.metrics import POOL_CHECKOUT_WAIT, REDIS_COMMAND_DURATION, REDIS_COMMAND_ERRORS
+
+__all__ = [
+    "InstrumentedConnectionPool",
+    "InstrumentedRedis",
+    "InstrumentedSentinelConnectionPool",
+    "redis",
+]
+
+
+class _InstrumentedPool(ConnectionPool):
+    """Connection pool exporting how long commands wait for a connection."""
+
+    async def get_connection(self, *args: Any, **kwargs: Any) -> Connection:
+        started = perf_counter()
+
+        try:
+            return await super().get_connection(*args, **kwargs)  # type: ignore[no-any-return]
+        finally:
+            POOL_CHECKOUT_WAIT.labels("redis").observe(perf_counter() - started)
+
+
+class InstrumentedConnectionPool(_InstrumentedPool, BlockingConnectionPool):
+    """Connection pool of a standalone Redis, waiting for a free connection when all are in use."""
+
+
+class InstrumentedSentinelConnectionPool(_InstrumentedPool, SentinelConnectionPool):
+    """Connection pool of the Redis master discovered through Sentinel."""
+
+
+class InstrumentedRedis(AsyncRedis):
+    """Redis client exporting latency and errors of every command."""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        command = str(args[0])
+        started = perf_counter()
+
+        try:
+            return await super().execute_command(*args, **options)
+        except Exception:
+            REDIS_COMMAND_ERRORS.labels(command).inc()
+            raise
+        finally:
+            REDIS_COMMAND_DURATION.labels(command).observe(perf_counter() - started)
+
+
+def _address(node: str) -> tuple[str, int]:
+    host, _, port = node.rpartition(":")
+    return host, int(port)
+
+
+def _create_client() -> InstrumentedRedis:
+    """Create Redis client for the configured topology with bounded pool, timeouts and retries."""
+    connection_kwargs: dict[str, Any] = {
+        "db": redis_settings.DB,
+        "username": redis_settings.USERNAME,
+        "password": redis_settings.PASSWORD,
+        "max_connections": redis_settings.MAX_CONNECTIONS,
+        "socket_timeout": redis_settings.SOCKET_TIMEOUT_SECONDS,
+        "socket_connect_timeout": redis_settings.CONNECT_TIMEOUT_SECONDS,
+        "health_check_interval": redis_settings.HEALTH_CHECK_INTERVAL_SECONDS,
+        "retry": Retry(
+            ExponentialWithJitterBackoff(
+                cap=redis_settings.RETRY_BACKOFF_CAP_SECONDS,
+                base=redis_settings.RETRY_BACKOFF_BASE_SECONDS,
+            ),
+            redis_settings.RETRIES,
+            supported_errors=(RedisConnectionError,),
+        ),
+        "decode_responses": True,
+    }
+
+    if redis_settings.MODE == "sentinel":
+        sentinel = Sentinel(
+            [_address(node) for node in redis_settings.SENTINELS],
+            sentinel_kwargs={
+                "password": redis_settings.SENTINEL_PASSWORD,
+                "socket_timeout": redis_settings.SOCKET_TIMEOUT_SECONDS,
+                "socket_connect_timeout": redis_settings.CONNECT_TIMEOUT_SECONDS,
+            },
+        )
+        return sentinel.master_for(  # type: ignore[no-any-return]
+            redis_settings.SENTINEL_SERVICE,
+            redis_class=InstrumentedRedis,
+            connection_pool_class=InstrumentedSentinelConnectionPool,
+            ssl=redis_settings.SSL,
+            **connection_kwargs,
+        )
+
+    return InstrumentedRedis(
+        connection_pool=InstrumentedConnectionPool(
+            host=redis_settings.HOST,
+            port=redis_settings.PORT,
+            connection_class=SSLConnection if redis_settings.SSL else Connection,
+            timeout=redis_settings.POOL_TIMEOUT_SECONDS,
+            **connection_kwargs,
+        ),
+    )
+
 
-redis = AsyncRedis(
-    host=redis_settings.HOST,
-    port=redis_settings.PORT,
-    db=redis_settings.DB,
-    username=redis_settings.USERNAME,
-    password=redis_settings.PASSWORD,
-    ssl=redis_settings.SSL,
-    decode_responses=True,
-)
+redis = _create_client()
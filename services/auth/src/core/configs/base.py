@@ -5,5 +5,8 @@ class Settings(SharedSettings):
     SERVICE_TITLE: str = "Auth Service"
     SECRET_KEY: str = "secret"
 
+    # Bearer token of services calling internal routes, which are disabled while it is not set
+    INTERNAL_API_TOKEN: str | None = None
+
 
 settings = Settings()
@@ -0,0 +1,21 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+__all__ = [
+    "account_cache_settings",
+    "AccountCacheSettings",
+]
+
+
+class AccountCacheSettings(BaseSettings):
+    ENABLED: bool = True
+    PREFIX: str = "account"
+    TTL_SECONDS: int = 300
+    NEGATIVE_TTL_SECONDS: int = 30
+
+    model_config = SettingsConfigDict(
+        env_prefix="ACCOUNT_CACHE_",
+        case_sensitive=True,
+    )
+
+
+account_cache_settings = AccountCacheSettings()
@@ -0,0 +1,23 @@
+from typing import Literal
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+__all__ = [
+    "hashing_settings",
+    "HashingSettings",
+]
+
+
+class HashingSettings(BaseSettings):
+    EXECUTOR: Literal["thread", "process"] = "thread"
+    MAX_WORKERS: int = 4
+    MAX_QUEUE_DEPTH: int = 32
+    RETRY_AFTER_SECONDS: int = 1
+
+    model_config = SettingsConfigDict(
+        env_prefix="HASHING_",
+        case_sensitive=True,
+    )
+
+
+hashing_settings = HashingSettings()
@@ -0,0 +1,31 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+__all__ = [
+    "http_settings",
+    "HTTPSettings",
+]
+
+
+class HTTPSettings(BaseSettings):
+    # Connection pool of each OAuth2 provider
+    MAX_CONNECTIONS: int = 20
+    MAX_KEEPALIVE_CONNECTIONS: int = 10
+    KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+
+    CONNECT_TIMEOUT_SECONDS: float = 3.0
+    READ_TIMEOUT_SECONDS: float = 10.0
+    WRITE_TIMEOUT_SECONDS: float = 10.0
+    POOL_TIMEOUT_SECONDS: float = 3.0
+
+    # Retries of failed connection attempts, requests themselves are never repeated
+    RETRIES: int = 2
+    # Requires the `h2` package
+    HTTP2: bool = False
+
+    model_config = SettingsConfigDict(
+        env_prefix="HTTP_",
+        case_sensitive=True,
+    )
+
+
+http_settings = HTTPSettings()
@@ -22,6 +22,7 @@ class JWTSettings(BaseSettings):
 
     SIGNING_KID: int = 0
 
+    # Algorithm of RSA keys, EC and Ed25519 keys are signed with ES256/ES384/ES512 and EdDSA by their curve.
     ALGORITHM: str = "RS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 5
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
@@ -29,8 +30,23 @@ class JWTSettings(BaseSettings):
     BLACKLIST_ENABLED: bool = True
     BLACKLIST_PREFIX: str = "jwt-denylist"
 
+    REVOCATION_FILTER_ENABLED: bool = True
+    REVOCATION_FILTER_CAPACITY: int = 1_000_000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    REVOCATION_FILTER_REBUILD_SECONDS: int = 3600
+    REVOCATION_FILTER_RETRY_SECONDS: int = 5
+    REVOCATION_CACHE_SIZE: int = 10_000
+    REVOCATION_CACHE_TTL_SECONDS: int = 60
+    REVOCATION_CHANNEL: str = "jwt-revocations"
+
     ISSUER: str = "https://example.com"
 
+    JWKS_MAX_AGE: int = 300
+
+    BATCH_MAX_SIZE: int = 10_000
+    BATCH_WORKERS: int = 0
+    BATCH_CHUNK_SIZE: int = 500
+
     model_config = SettingsConfigDict(
         env_prefix="JWT_",
         case_sensitive=True,
@@ -0,0 +1,37 @@
+from typing import Literal
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+__all__ = [
+    "limit_settings",
+    "LimitSettings",
+]
+
+
+class LimitSettings(BaseSettings):
+    ENABLED: bool = True
+    PREFIX: str = "auth-rate-limit"
+
+    # Catch-all limit of every request of a client address, on top of the limits of routes
+    GLOBAL_REQUESTS: int = 100
+    GLOBAL_PER: Literal["second", "minute", "hour", "day"] = "minute"
+
+    # Requests are counted in local buckets; hits are added to cluster-wide Redis counters in background batches
+    SYNC_INTERVAL_SECONDS: float = 0.5
+    SYNC_BATCH_SIZE: int = 1000
+    # Buckets of the oldest clients are dropped beyond this number
+    MAX_KEYS: int = 100_000
+
+    # Syncs failing or slower than the budget open the breaker after `BREAKER_FAILURES` in a row,
+    # and limits are enforced locally only until a sync is tried again after `BREAKER_RESET_SECONDS`
+    REDIS_LATENCY_BUDGET_SECONDS: float = 0.05
+    BREAKER_FAILURES: int = 3
+    BREAKER_RESET_SECONDS: float = 10.0
+
+    model_config = SettingsConfigDict(
+        env_prefix="RATE_LIMIT_",
+        case_sensitive=True,
+    )
+
+
+limit_settings = LimitSettings()
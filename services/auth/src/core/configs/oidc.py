@@ -0,0 +1,29 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+__all__ = [
+    "oidc_settings",
+    "OIDCSettings",
+]
+
+
+class OIDCSettings(BaseSettings):
+    # TTL of provider metadata and JWKS without `Cache-Control: max-age`, and bounds of any TTL
+    CACHE_DEFAULT_TTL_SECONDS: int = 3600
+    CACHE_MIN_TTL_SECONDS: int = 60
+    CACHE_MAX_TTL_SECONDS: int = 86400
+
+    # Share of TTL after which documents are refreshed in background
+    CACHE_REFRESH_AHEAD: float = 0.8
+    # Minimal interval between JWKS refetches caused by an unknown key id
+    CACHE_REFETCH_INTERVAL_SECONDS: int = 30
+
+    FETCH_TIMEOUT_SECONDS: float = 5.0
+    WARMUP_ENABLED: bool = True
+
+    model_config = SettingsConfigDict(
+        env_prefix="OIDC_",
+        case_sensitive=True,
+    )
+
+
+oidc_settings = OIDCSettings()
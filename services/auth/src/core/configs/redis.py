@@ -1,8 +1,34 @@
-from shared.configs.redis import RedisSettings
+from typing import Literal
+
+from shared.configs.redis import RedisSettings as SharedRedisSettings
 
 __all__ = [
     "redis_settings",
+    "RedisSettings",
 ]
 
 
+class RedisSettings(SharedRedisSettings):
+    # `sentinel` discovers the master of `SENTINEL_SERVICE` through `SENTINELS`, e.g. `["sentinel-0:26379"]`,
+    # and follows failovers; `HOST` and `PORT` are used in `standalone` mode only
+    MODE: Literal["standalone", "sentinel"] = "standalone"
+    SENTINELS: list[str] = []
+    SENTINEL_SERVICE: str = "mymaster"
+    SENTINEL_PASSWORD: str | None = None
+
+    # Commands wait for a free connection up to `POOL_TIMEOUT_SECONDS`, then fail instead of queueing forever
+    MAX_CONNECTIONS: int = 50
+    POOL_TIMEOUT_SECONDS: int = 1
+    CONNECT_TIMEOUT_SECONDS: float = 1.0
+    SOCKET_TIMEOUT_SECONDS: float = 1.0
+    # Connections idle for longer are pinged before use
+    HEALTH_CHECK_INTERVAL_SECONDS: int = 30
+
+    # Retries of commands which failed with a connection error, with exponential backoff and jitter.
+    # Timeouts are never retried, the command may have been applied already.
+    RETRIES: int = 2
+    RETRY_BACKOFF_BASE_SECONDS: float = 0.05
+    RETRY_BACKOFF_CAP_SECONDS: float = 0.5
+
+
 redis_settings = RedisSettings()
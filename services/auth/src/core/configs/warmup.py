@@ -0,0 +1,26 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+__all__ = [
+    "warmup_settings",
+    "WarmupSettings",
+]
+
+
+class WarmupSettings(BaseSettings):
+    ENABLED: bool = True
+
+    # Connections opened ahead of traffic, Postgres ones are capped at the pool size
+    POSTGRES_CONNECTIONS: int = 5
+    REDIS_CONNECTIONS: int = 5
+
+    # Startup fails if dependencies are still unavailable after this time
+    TIMEOUT_SECONDS: float = 30.0
+    RETRY_INTERVAL_SECONDS: float = 1.0
+
+    model_config = SettingsConfigDict(
+        env_prefix="WARMUP_",
+        case_sensitive=True,
+    )
+
+
+warmup_settings = WarmupSettings()
@@ -17,6 +17,11 @@ __all__ = [
     "InvalidToken",
     "TokenRevoked",
     "TokenRequired",
+    "HashingOverloaded",
+    "BatchTooLarge",
+    "InternalRouteDisabled",
+    "InvalidServiceToken",
+    "RateLimitExceeded",
 ]
 
 logger = getLogger("uvicorn.error")
@@ -116,3 +121,56 @@ class TokenRequired(HTTPException):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"{token_type.title()} token required.",
         )
+
+
+class HashingOverloaded(HTTPException):
+
+    def __init__(self, retry_after: int, detail: str = "Service is busy. Please try again later.") -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class BatchTooLarge(HTTPException):
+
+    def __init__(self, max_size: int) -> None:
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch size exceeds {max_size} subjects.",
+        )
+
+
+class InternalRouteDisabled(HTTPException):
+
+    def __init__(self, detail: str = "Not Found") -> None:
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail,
+        )
+
+
+class InvalidServiceToken(HTTPException):
+
+    def __init__(self, detail: str = "Invalid service token.") -> None:
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=detail,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+class RateLimitExceeded(HTTPException):
+
+    def __init__(
+        self,
+        retry_after: int,
+        detail: str = "Too many requests. Please try again later.",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={**(headers or {}), "Retry-After": str(retry_after)},
+        )
@@ -0,0 +1,73 @@
+from asyncio import gather, sleep, timeout
+from contextlib import AsyncExitStack
+from logging import getLogger
+from time import monotonic
+
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.clients.redis import redis
+from core.configs.postgres import pg_settings
+from core.configs.warmup import warmup_settings
+from core.health.checks import check_postgres, check_redis
+from db.session import async_engine
+
+__all__ = [
+    "warm_up",
+]
+
+logger = getLogger("uvicorn.error")
+
+
+async def _warm_up_postgres(count: int) -> None:
+    """Open connections at once, so they stay in the pool after being returned."""
+    async with AsyncExitStack() as stack:
+        results = await gather(
+            *(stack.enter_async_context(async_engine.connect()) for _ in range(count)),
+            return_exceptions=True,
+        )
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        await gather(*(connection.execute(text("SELECT 1")) for connection in results))
+
+
+async def _warm_up_redis(count: int) -> None:
+    """Open connections at once, so they stay in the pool after being released."""
+    pool = redis.connection_pool
+    connections = []
+
+    try:
+        for _ in range(count):
+            connections.append(await pool.get_connection())
+    finally:
+        for connection in connections:
+            await pool.release(connection)
+
+
+async def warm_up() -> None:
+    """
+    Fill Postgres and Redis pools and run health checks, retrying until they pass or the timeout expires.
+    Runs on startup before the application serves any request, so the pod becomes ready only after that.
+    """
+    deadline = monotonic() + warmup_settings.TIMEOUT_SECONDS
+    postgres_connections = min(warmup_settings.POSTGRES_CONNECTIONS, pg_settings.POOL_SIZE)
+
+    while True:
+        try:
+            async with timeout(max(deadline - monotonic(), 0)):
+                await _warm_up_postgres(postgres_connections)
+                await _warm_up_redis(warmup_settings.REDIS_CONNECTIONS)
+                await gather(check_postgres(), check_redis())
+
+            return
+        except (OSError, RedisError, SQLAlchemyError) as exc:
+            if monotonic() + warmup_settings.RETRY_INTERVAL_SECONDS >= deadline:
+                logger.error(f"Warm-up failed after {warmup_settings.TIMEOUT_SECONDS}s: {exc!r}")
+                raise
+
+            logger.warning(f"Warm-up failed, retrying: {exc!r}")
+            await sleep(warmup_settings.RETRY_INTERVAL_SECONDS)
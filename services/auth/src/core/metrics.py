@@ -0,0 +1,169 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+__all__ = [
+    "ACCOUNT_CACHE_LOOKUPS",
+    "HTTP_CONNECTIONS_OPENED",
+    "HTTP_REQUEST_DURATION",
+    "OIDC_DOCUMENT_FETCHES",
+    "OIDC_STALE_DOCUMENTS",
+    "PASSWORD_HASH_DURATION",
+    "PASSWORD_HASH_IN_FLIGHT",
+    "PASSWORD_HASH_QUEUE_WAIT",
+    "PASSWORD_HASH_REJECTED",
+    "POOL_CHECKOUT_WAIT",
+    "POOL_READ_RETRIES",
+    "POOL_VALIDATIONS",
+    "POSTGRES_COMPILED_CACHE",
+    "POSTGRES_REPLICA_LAG",
+    "POSTGRES_ROUTED_READS",
+    "RATE_LIMIT_BREAKER_OPEN",
+    "RATE_LIMIT_DECISIONS",
+    "RATE_LIMIT_SYNC_DURATION",
+    "REDIS_COMMAND_DURATION",
+    "REDIS_COMMAND_ERRORS",
+    "REVOCATION_CHECKS",
+    "REVOCATION_FILTER_SYNCED",
+]
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# --- Password hashing -------------------------------------------------------------------------------------------------
+
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "auth_password_hash_queue_wait_seconds",
+    "Time a password hashing job waits for a free worker.",
+    ["operation"],
+    buckets=_LATENCY_BUCKETS,
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "auth_password_hash_duration_seconds",
+    "Time a worker spends hashing or verifying a password.",
+    ["operation"],
+    buckets=_LATENCY_BUCKETS,
+)
+PASSWORD_HASH_IN_FLIGHT = Gauge(
+    "auth_password_hash_in_flight",
+    "Password hashing jobs queued or running in the worker pool.",
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "auth_password_hash_rejected_total",
+    "Password hashing jobs rejected because the worker pool queue is full.",
+    ["operation"],
+)
+
+# --- Token revocation -------------------------------------------------------------------------------------------------
+
+REVOCATION_CHECKS = Counter(
+    "auth_revocation_checks_total",
+    "Refresh token revocation checks by the tier that answered them.",
+    ["tier"],
+)
+REVOCATION_FILTER_SYNCED = Gauge(
+    "auth_revocation_filter_synced",
+    "Whether the local revocation filter is in sync with the Redis blacklist.",
+)
+
+# --- Account cache ----------------------------------------------------------------------------------------------------
+
+ACCOUNT_CACHE_LOOKUPS = Counter(
+    "auth_account_cache_lookups_total",
+    "Account cache lookups by key and result: hit, negative_hit, miss or error.",
+    ["key", "result"],
+)
+
+# --- OpenID provider documents ----------------------------------------------------------------------------------------
+
+OIDC_DOCUMENT_FETCHES = Counter(
+    "auth_oidc_document_fetches_total",
+    "Fetches of OpenID provider metadata and JWKS by result.",
+    ["result"],
+)
+OIDC_STALE_DOCUMENTS = Counter(
+    "auth_oidc_stale_documents_total",
+    "Expired OpenID provider documents served because refreshing them failed.",
+)
+
+# --- Outbound HTTP ----------------------------------------------------------------------------------------------------
+
+HTTP_REQUEST_DURATION = Histogram(
+    "auth_http_request_duration_seconds",
+    "Duration of outbound HTTP requests by pool, including connection setup.",
+    ["pool"],
+    buckets=_LATENCY_BUCKETS,
+)
+HTTP_CONNECTIONS_OPENED = Counter(
+    "auth_http_connections_opened_total",
+    "Outbound connections opened by pool; requests minus connections are served by reused ones.",
+    ["pool"],
+)
+
+# --- Connection pools -------------------------------------------------------------------------------------------------
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "auth_pool_checkout_wait_seconds",
+    "Time spent getting a Postgres or Redis connection from its pool, including opening a new one.",
+    ["pool"],
+    buckets=_LATENCY_BUCKETS,
+)
+POOL_VALIDATIONS = Counter(
+    "auth_pool_validations_total",
+    "Background validations of idle Postgres connections by result: ok or invalidated.",
+    ["result"],
+)
+POOL_READ_RETRIES = Counter(
+    "auth_pool_read_retries_total",
+    "Idempotent reads retried on a new Postgres connection after hitting a dead one.",
+)
+
+# --- Postgres replicas ------------------------------------------------------------------------------------------------
+
+POSTGRES_REPLICA_LAG = Gauge(
+    "auth_postgres_replica_lag_seconds",
+    "Replication lag of a Postgres replica as of its last check, infinite if it is unavailable.",
+    ["replica"],
+)
+POSTGRES_ROUTED_READS = Counter(
+    "auth_postgres_routed_reads_total",
+    "Lookups eligible for a replica by where they were sent: replica or primary.",
+    ["target"],
+)
+
+# --- Postgres statements ----------------------------------------------------------------------------------------------
+
+POSTGRES_COMPILED_CACHE = Counter(
+    "auth_postgres_compiled_cache_total",
+    "Executed statements by SQLAlchemy compiled cache result: hit, miss or uncached.",
+    ["result"],
+)
+
+# --- Redis commands ---------------------------------------------------------------------------------------------------
+
+REDIS_COMMAND_DURATION = Histogram(
+    "auth_redis_command_duration_seconds",
+    "Duration of Redis commands, including waiting for a connection and retries.",
+    ["command"],
+    buckets=_LATENCY_BUCKETS,
+)
+REDIS_COMMAND_ERRORS = Counter(
+    "auth_redis_command_errors_total",
+    "Redis commands which failed, including timeouts and connection errors.",
+    ["command"],
+)
+
+# --- Rate limits ------------------------------------------------------------------------------------------------------
+
+RATE_LIMIT_DECISIONS = Counter(
+    "auth_rate_limit_decisions_total",
+    "Rate limit checks by result: allowed, or rejected by the local bucket or the cluster-wide counter.",
+    ["result"],
+)
+RATE_LIMIT_SYNC_DURATION = Histogram(
+    "auth_rate_limit_sync_duration_seconds",
+    "Duration of syncing a batch of local hits with the Redis counters.",
+    buckets=_LATENCY_BUCKETS,
+)
+RATE_LIMIT_BREAKER_OPEN = Gauge(
+    "auth_rate_limit_breaker_open",
+    "Whether rate limits are enforced locally only because Redis is slow or failing, by limiter.",
+    ["limiter"],
+)
@@ -1,24 +1,127 @@
+from asyncio import get_running_loop
 from base64 import urlsafe_b64encode
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from hashlib import sha256
 from logging import ERROR, getLogger
 from os import urandom
+from secrets import token_urlsafe
+from time import perf_counter
+from typing import Callable, TypeVar
 
 from passlib.context import CryptContext
 
+from core.configs.hashing import hashing_settings
+from core.exceptions import HashingOverloaded
+from core.metrics import (
+    PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_IN_FLIGHT,
+    PASSWORD_HASH_QUEUE_WAIT,
+    PASSWORD_HASH_REJECTED,
+)
+
+__all__ = [
+    "UNUSABLE_PASSWORD_HASH",
+    "generate_code_challenge",
+    "generate_code_verifier",
+    "hash_password",
+    "password_hasher",
+    "verify_password",
+]
+
+T = TypeVar("T")
+
 getLogger("passlib").setLevel(ERROR)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Hash of a random password which is never revealed, for accounts created through a provider and checked
+# for unknown emails. It is hashed once per process with the cost of real hashes, so that a login with
+# an unknown email takes as long as one with a wrong password.
+UNUSABLE_PASSWORD_HASH = pwd_context.hash(token_urlsafe(32))
+
 
-def hash_password(password: str) -> str:
+def _hash(password: str) -> str:
     """Hash password with bcrypt algorithm."""
     return pwd_context.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password with the bcrypt algorithm and return status valid or not."""
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    """Verify password with the bcrypt algorithm."""
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _timed(func: Callable[..., T], *args: str) -> tuple[T, float]:
+    """Run a function inside a worker and return its result with the execution time."""
+    started = perf_counter()
+    result = func(*args)
+    return result, perf_counter() - started
+
+
+class _PasswordHasher:
+    """Bounded worker pool that keeps bcrypt off the event loop."""
+
+    __slots__ = (
+        "_executor",
+        "_in_flight",
+    )
+
+    def __init__(self) -> None:
+        """Initialize password hasher."""
+        self._executor: Executor | None = None
+        self._in_flight = 0
+
+    @property
+    def executor(self) -> Executor:
+        """Get worker pool, creating it on first use."""
+        if self._executor is None:
+            executor_cls = ProcessPoolExecutor if hashing_settings.EXECUTOR == "process" else ThreadPoolExecutor
+            self._executor = executor_cls(max_workers=hashing_settings.MAX_WORKERS)
+
+        return self._executor
+
+    async def run(self, operation: str, func: Callable[..., T], *args: str) -> T:
+        """
+        Run a hashing function in the worker pool.
+        Shed load with 503 when too many jobs are already queued or running.
+        """
+        if self._in_flight >= hashing_settings.MAX_QUEUE_DEPTH:
+            PASSWORD_HASH_REJECTED.labels(operation).inc()
+            raise HashingOverloaded(retry_after=hashing_settings.RETRY_AFTER_SECONDS)
+
+        self._in_flight += 1
+        PASSWORD_HASH_IN_FLIGHT.inc()
+        submitted = perf_counter()
+
+        try:
+            result, duration = await get_running_loop().run_in_executor(self.executor, _timed, func, *args)
+        finally:
+            self._in_flight -= 1
+            PASSWORD_HASH_IN_FLIGHT.dec()
+
+        PASSWORD_HASH_DURATION.labels(operation).observe(duration)
+        PASSWORD_HASH_QUEUE_WAIT.labels(operation).observe(max(perf_counter() - submitted - duration, 0.0))
+
+        return result
+
+    def shutdown(self) -> None:
+        """Shut down worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = _PasswordHasher()
+
+
+async def hash_password(password: str) -> str:
+    """Hash password with bcrypt algorithm."""
+    return await password_hasher.run("hash", _hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify password with the bcrypt algorithm and return status valid or not."""
+    return await password_hasher.run("verify", _verify, plain_password, hashed_password)
+
+
 def generate_code_verifier() -> str:
     """Generate code verifier for PKCE."""
     return urlsafe_b64encode(urandom(40)).rstrip(b"=").decode("ascii")
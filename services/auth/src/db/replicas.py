@@ -0,0 +1,106 @@
+from asyncio import CancelledError, Task, create_task, gather, sleep
+from contextlib import suppress
+from itertools import count
+from logging import getLogger
+from typing import Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.configs.postgres import pg_settings
+from core.metrics import POSTGRES_REPLICA_LAG
+
+__all__ = [
+    "ReplicaRouter",
+]
+
+logger = getLogger("uvicorn.error")
+
+# Replay lag, which is zero when everything received is replayed, even if the primary had no writes for a while
+_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaRouter:
+    """
+    Round-robin over Postgres replicas which are available and keep up with the primary.
+    Replicas are checked in background; without a healthy one, reads fall back to the primary.
+    """
+
+    CHECK_INTERVAL = pg_settings.REPLICA_CHECK_INTERVAL_SECONDS
+    MAX_LAG = pg_settings.REPLICA_MAX_LAG_SECONDS
+
+    __slots__ = (
+        "_engines",
+        "_healthy",
+        "_next",
+        "_task",
+    )
+
+    def __init__(self, engines: Sequence[AsyncEngine]) -> None:
+        """Initialize router, considering replicas unhealthy until they are checked."""
+        self._engines = tuple(engines)
+        self._healthy: tuple[AsyncEngine, ...] = ()
+        self._next = count()
+        self._task: Task[None] | None = None
+
+    @staticmethod
+    async def _lag(engine: AsyncEngine) -> float:
+        """Get replication lag of a replica in seconds."""
+        async with engine.connect() as connection:
+            return float(await connection.scalar(_LAG_QUERY))
+
+    def engine(self) -> AsyncEngine | None:
+        """Get the next healthy replica, if any."""
+        if not (healthy := self._healthy):
+            return None
+
+        return healthy[next(self._next) % len(healthy)]
+
+    async def check(self) -> None:
+        """Check availability and lag of all replicas."""
+        results = await gather(*(self._lag(engine) for engine in self._engines), return_exceptions=True)
+        healthy = []
+
+        for engine, result in zip(self._engines, results):
+            name = engine.pool.logging_name
+
+            if isinstance(result, BaseException):
+                logger.warning(f"Postgres replica {name} is unavailable: {result!r}")
+            elif result > self.MAX_LAG:
+                logger.warning(f"Postgres replica {name} lags by {result:.1f}s")
+            else:
+                healthy.append(engine)
+
+            POSTGRES_REPLICA_LAG.labels(name).set(result if isinstance(result, float) else float("inf"))
+
+        self._healthy = tuple(healthy)
+
+    async def start(self) -> None:
+        """Check replicas and keep checking them in background."""
+        if not self._engines or self._task is not None:
+            return
+
+        await self.check()
+        self._task = create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop checking replicas."""
+        if self._task is not None:
+            self._task.cancel()
+
+            with suppress(CancelledError):
+                await self._task
+
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await sleep(self.CHECK_INTERVAL)
+            await self.check()
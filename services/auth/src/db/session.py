@@ -1,37 +1,202 @@
-from typing import Annotated, AsyncGenerator
+from time import perf_counter
+from typing import Annotated, Any, AsyncGenerator, Awaitable, Callable
+from uuid import uuid4
 
 from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import Connection, Executable, Result, event
+from sqlalchemy.engine.default import DefaultExecutionContext
+from sqlalchemy.engine.interfaces import CacheStats, DBAPICursor
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session as SyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
 
 from core.configs.postgres import pg_settings
+from core.metrics import POOL_CHECKOUT_WAIT, POOL_READ_RETRIES, POSTGRES_COMPILED_CACHE, POSTGRES_ROUTED_READS
+from db.replicas import ReplicaRouter
 
 __all__ = [
+    "after_commit",
     "async_session_factory",
+    "engines",
+    "execute_read",
+    "read_from_replica",
+    "read_session_factory",
+    "ReadSession",
+    "replica_router",
     "Session",
 ]
 
-async_engine = create_async_engine(
-    url=pg_settings.ASYNC_DATABASE_URL,
-    echo=pg_settings.DEBUG,
-    future=True,
-    pool_pre_ping=True,
-    pool_size=pg_settings.POOL_SIZE,
-    max_overflow=pg_settings.MAX_OVERFLOW,
-    pool_timeout=pg_settings.POOL_TIMEOUT,
-    pool_recycle=pg_settings.POOL_RECYCLE,
-)
+
+# Key of session info holding callbacks to run after commit
+_AFTER_COMMIT = "after_commit"
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool exporting how long sessions wait for a connection."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = perf_counter()
+
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.labels(self.logging_name).observe(perf_counter() - started)
+
+
+_COMPILED_CACHE_RESULTS = {
+    CacheStats.CACHE_HIT: "hit",
+    CacheStats.CACHE_MISS: "miss",
+}
+
+
+def _statement_name() -> str:
+    """Name prepared statements uniquely, so they never collide on server connections shared by pgbouncer."""
+    return f"__asyncpg_{uuid4().hex}__"
+
+
+def _connect_args() -> dict[str, Any]:
+    """Get asyncpg arguments for the configured statement cache mode."""
+    cache_size = pg_settings.STATEMENT_CACHE_SIZE if pg_settings.STATEMENT_CACHE_MODE == "named" else 0
+
+    return {
+        "prepared_statement_cache_size": cache_size,
+        "prepared_statement_name_func": _statement_name,
+        "statement_cache_size": cache_size,
+    }
+
+
+def _observe_compiled_cache(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: DefaultExecutionContext | None,
+    executemany: bool,
+) -> None:
+    """Count executions by compiled cache result, listening to `after_cursor_execute`."""
+    if context is not None:
+        result = _COMPILED_CACHE_RESULTS.get(context.cache_hit, "uncached")
+        POSTGRES_COMPILED_CACHE.labels(result).inc()
+
+
+def _create_engine(url: str, name: str, **kwargs: Any) -> AsyncEngine:
+    engine = create_async_engine(
+        url=url,
+        echo=pg_settings.DEBUG,
+        future=True,
+        connect_args=_connect_args(),
+        query_cache_size=pg_settings.COMPILED_CACHE_SIZE,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name=name,
+        pool_pre_ping=pg_settings.POOL_HEALTH_MODE == "pre_ping",
+        pool_size=pg_settings.POOL_SIZE,
+        max_overflow=pg_settings.MAX_OVERFLOW,
+        pool_timeout=pg_settings.POOL_TIMEOUT,
+        pool_recycle=pg_settings.POOL_RECYCLE,
+        **kwargs,
+    )
+    event.listen(engine.sync_engine, "after_cursor_execute", _observe_compiled_cache)
+
+    return engine
+
+
+async_engine = _create_engine(pg_settings.ASYNC_DATABASE_URL, "postgres")
+
+# Lookups run in autocommit mode, so they don't pay BEGIN / COMMIT round-trips
+read_engine = async_engine.execution_options(isolation_level="AUTOCOMMIT")
+replica_engines = [
+    _create_engine(url, f"postgres_replica_{idx}", isolation_level="AUTOCOMMIT")
+    for idx, url in enumerate(pg_settings.REPLICA_URLS)
+]
+engines = (async_engine, *replica_engines)
+
+replica_router = ReplicaRouter(replica_engines)
+
+
+class RoutingSession(SyncSession):
+    """
+    Session sending lookups of `execute_read` to a healthy replica, and everything else to the primary.
+    Once the session used the primary, e.g. after a registration, its lookups stay there to read its own writes.
+    """
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, replica: bool = False, **kwargs: Any) -> Any:
+        if replica and not self.info.get("primary"):
+            if (engine := replica_router.engine()) is not None:
+                POSTGRES_ROUTED_READS.labels("replica").inc()
+                self.info["replica"] = True
+                return engine.sync_engine
+
+            POSTGRES_ROUTED_READS.labels("primary").inc()
+        else:
+            self.info["primary"] = True
+
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
 
 async_session_factory = async_sessionmaker(
     bind=async_engine,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
 )
+read_session_factory = async_sessionmaker(
+    bind=read_engine,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+)
+
+
+def read_from_replica(session: AsyncSession) -> bool:
+    """Check if a lookup of the session was sent to a replica, which may lag behind the primary."""
+    return bool(session.info.get("replica"))
+
+
+async def execute_read(session: AsyncSession, stmt: Executable) -> Result[Any]:
+    """
+    Execute an idempotent read on a replica if there is a healthy one, retrying it on a new connection
+    if the pooled one turned out to be dead.
+    Only the first statement of a transaction is retried, since nothing else is lost with the connection.
+    """
+    retries = 0 if session.in_transaction() else pg_settings.READ_RETRIES
+
+    while True:
+        try:
+            return await session.execute(stmt, bind_arguments={"replica": True})
+        except DBAPIError as exc:
+            if not exc.connection_invalidated or retries <= 0:
+                raise
+
+            retries -= 1
+            POOL_READ_RETRIES.inc()
+            await session.rollback()
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[Any]]) -> None:
+    """Run a callback once the session committed, e.g. to update caches; it is dropped on rollback."""
+    session.info.setdefault(_AFTER_COMMIT, []).append(callback)
 
 
 async def _db_session() -> AsyncGenerator[AsyncSession, None]:
-    """Get a database session with auto-commit and auto-rollback."""
+    """
+    Get a database session with auto-commit and auto-rollback.
+    The transaction begins with the first statement, so the first read can be retried by `execute_read`.
+    """
     async with async_session_factory() as async_session:
-        async with async_session.begin():
-            yield async_session
+        yield async_session
+        await async_session.commit()
+
+        for callback in async_session.info.pop(_AFTER_COMMIT, []):
+            await callback()
+
+
+async def _read_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get a database session for lookups, without a transaction.
+    Every statement is committed on its own, so it must not be used for writes.
+    """
+    async with read_session_factory() as async_session:
+        yield async_session
 
 
 Session = Annotated[AsyncSession, Depends(_db_session)]
+ReadSession = Annotated[AsyncSession, Depends(_read_db_session)]
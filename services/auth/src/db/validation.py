@@ -0,0 +1,78 @@
+from asyncio import CancelledError, Task, create_task, sleep
+from contextlib import suppress
+from logging import getLogger
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.configs.postgres import pg_settings
+from core.metrics import POOL_VALIDATIONS
+from db.session import engines
+
+__all__ = [
+    "PoolValidator",
+    "pool_validator",
+]
+
+logger = getLogger("uvicorn.error")
+
+
+class PoolValidator:
+    """
+    Background validation of idle pooled Postgres connections, replacing a ping on every checkout.
+    Idle connections are checked out one by one and pinged; a dead one makes SQLAlchemy invalidate the pool,
+    so connections broken by a database or pgbouncer restart are replaced before requests get them.
+    """
+
+    INTERVAL = pg_settings.POOL_VALIDATION_INTERVAL_SECONDS
+
+    __slots__ = ("_task",)
+
+    def __init__(self) -> None:
+        """Initialize pool validator."""
+        self._task: Task[None] | None = None
+
+    async def start(self) -> None:
+        """Start validating idle connections in background."""
+        if self._task is None:
+            self._task = create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop validating idle connections."""
+        if self._task is not None:
+            self._task.cancel()
+
+            with suppress(CancelledError):
+                await self._task
+
+            self._task = None
+
+    async def validate(self) -> None:
+        """Ping every connection idle in the pools."""
+        for engine in engines:
+            await self._validate(engine)
+
+    async def _validate(self, engine: AsyncEngine) -> None:
+        # The pool is FIFO, so each checkout takes the longest idle connection and returns it to the end
+        for _ in range(engine.pool.checkedin()):  # type: ignore[attr-defined]
+            try:
+                async with engine.connect() as connection:
+                    await connection.exec_driver_sql("SELECT 1")
+            except DBAPIError as exc:
+                POOL_VALIDATIONS.labels("invalidated").inc()
+                logger.warning(f"Idle Postgres connection is dead, pool invalidated: {exc!r}")
+                return
+
+            POOL_VALIDATIONS.labels("ok").inc()
+
+    async def _run(self) -> None:
+        while True:
+            await sleep(self.INTERVAL)
+
+            try:
+                await self.validate()
+            except (OSError, DBAPIError) as exc:
+                logger.warning(f"Postgres pool validation failed: {exc!r}")
+
+
+pool_validator = PoolValidator()
@@ -1,23 +1,72 @@
+from contextlib import asynccontextmanager
 from logging.config import dictConfig
+from typing import AsyncGenerator
 
 from asyncpg import PostgresError
 from authlib.integrations.base_client import OAuthError
 from authlib.jose import JoseError
 from fastapi import FastAPI
 from shared.core.exceptions import db_exception_handler
-from shared.middlewares import InternalOnlyMiddleware, PrometheusMiddleware, RateLimiterMiddleware
+from shared.middlewares import InternalOnlyMiddleware, PrometheusMiddleware
 from shared.security import setup_docs
 from sqlalchemy.exc import SQLAlchemyError
 from starlette.middleware.sessions import SessionMiddleware
 
 from api.routers import router
-from core.clients.redis import redis
+from core.clients.http import http_pools
 from core.configs.base import settings
+from core.configs.jwt import jwt_settings
+from core.configs.limits import limit_settings
+from core.configs.oidc import oidc_settings
+from core.configs.postgres import pg_settings
+from core.configs.warmup import warmup_settings
 from core.exceptions import auth_exception_handler
+from core.health.warmup import warm_up
 from core.logs.config import logging_settings
+from core.security import password_hasher
+from db.session import replica_router
+from db.validation import pool_validator
+from services.batch import signing_pool
+from services.limits import RateLimiterMiddleware, hybrid_limiter
+from services.oauth2 import OIDC_METADATA_URLS
+from services.oidc import provider_cache
+from services.revocation import revocation_filter
 
 dictConfig(dict(logging_settings))
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
+    """Start up and shut down application resources."""
+    if warmup_settings.ENABLED:
+        await warm_up()
+
+    if jwt_settings.BLACKLIST_ENABLED and jwt_settings.REVOCATION_FILTER_ENABLED:
+        await revocation_filter.start()
+
+    await provider_cache.start(OIDC_METADATA_URLS if oidc_settings.WARMUP_ENABLED else ())
+
+    if pg_settings.POOL_HEALTH_MODE == "background":
+        await pool_validator.start()
+
+    await replica_router.start()
+    signing_pool.start(jwt_settings.BATCH_WORKERS)
+
+    if limit_settings.ENABLED:
+        await hybrid_limiter.start()
+
+    yield
+
+    await hybrid_limiter.stop()
+    await replica_router.stop()
+    await pool_validator.stop()
+    await provider_cache.stop()
+    await revocation_filter.stop()
+    await http_pools.aclose()
+    password_hasher.shutdown()
+    signing_pool.shutdown()
+
+
 app = FastAPI(
     title=settings.SERVICE_TITLE,
     version=settings.API_VERSION,
@@ -25,6 +74,7 @@ app = FastAPI(
     redoc_url=None,
     openapi_url=None,
     root_path="/auth",
+    lifespan=lifespan,
 )
 setup_docs(app)
 
@@ -32,7 +82,7 @@ setup_docs(app)
 app.include_router(router)
 
 # Middleware
-app.add_middleware(RateLimiterMiddleware, redis_client=redis)
+app.add_middleware(RateLimiterMiddleware, requests=limit_settings.GLOBAL_REQUESTS, per=limit_settings.GLOBAL_PER)
 app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
 app.add_middleware(InternalOnlyMiddleware)
 app.add_middleware(PrometheusMiddleware)
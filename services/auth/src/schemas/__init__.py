@@ -1,14 +1,18 @@
+from .account import AccountSnapshot
 from .credentials import Credentials
 from .oauth2 import OAuth2AccountSchema, OAuth2Callback
 from .statuses import LogoutStatus
-from .token import JWK, JWKS, AccessToken, TokenPair
+from .token import JWK, JWKS, AccessToken, TokenBatch, TokenBatchRequest, TokenPair
 
 __all__ = [
     "AccessToken",
+    "AccountSnapshot",
     "Credentials",
     "LogoutStatus",
     "OAuth2AccountSchema",
     "OAuth2Callback",
+    "TokenBatch",
+    "TokenBatchRequest",
     "TokenPair",
     "JWK",
     "JWKS",
@@ -0,0 +1,16 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+__all__ = [
+    "AccountSnapshot",
+]
+
+
+class AccountSnapshot(BaseModel):
+    id: UUID  # noqa: VNE003
+    email: str
+    password_hash: str
+    is_active: bool
+    is_verified: bool
+    oauth2_provider: str | None = None
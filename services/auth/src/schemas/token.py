@@ -1,10 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 __all__ = [
     "AccessToken",
     "TokenPair",
     "JWK",
     "JWKS",
+    "TokenBatch",
+    "TokenBatchRequest",
 ]
 
 
@@ -20,14 +22,30 @@ class TokenPair(AccessToken):
     refresh_token: str
 
 
+class TokenBatchRequest(BaseModel):
+    subjects: list[str] = Field(min_length=1)
+    pairs: bool = True
+
+
+class TokenBatch(BaseModel):
+    tokens: list[TokenPair] | list[AccessToken]
+
+
 class JWK(BaseModel):
     alg: str
-    e: str  # noqa: VNE001
     kid: str
     kty: str
-    n: str  # noqa: VNE001
     use: str
 
+    # RSA
+    e: str | None = None  # noqa: VNE001
+    n: str | None = None  # noqa: VNE001
+
+    # EC, OKP
+    crv: str | None = None
+    x: str | None = None  # noqa: VNE001
+    y: str | None = None  # noqa: VNE001
+
 
 class JWKS(BaseModel):
     keys: list[JWK]
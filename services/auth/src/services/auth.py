@@ -1,54 +1,94 @@
+from functools import partial
+
 from pydantic import EmailStr
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from uuid6 import uuid7
 
 from core.exceptions import AccountAlreadyExists, InvalidCredentials, OAuth2AccountExists
-from core.security import hash_password, verify_password
+from core.security import UNUSABLE_PASSWORD_HASH, hash_password, verify_password
+from db.session import after_commit, execute_read, read_from_replica
 from enums import OAuth2ProviderEnum
-from models import OAuth2Account
 from models.account import Account
-from schemas import Credentials
+from schemas import AccountSnapshot, Credentials
+from services.cache import AccountCache, account_cache
 
 __all__ = [
     "authenticate",
+    "get_account",
     "register_account",
 ]
 
 
-async def get_account(session: AsyncSession, email: EmailStr) -> Account | None:
-    """Get a client account by email address from a database."""
+async def get_account(session: AsyncSession, email: EmailStr) -> AccountSnapshot | None:
+    """Get a client account by email address from the cache or a database."""
+    hit, cached = await account_cache.get_by_email(email)
+
+    if hit:
+        return cached
+
     stmt = select(Account).where(Account.email == email)
-    result = await session.execute(stmt)
+    result = await execute_read(session, stmt)
 
-    return result.scalar_one_or_none()
+    if (db_account := result.scalar_one_or_none()) is None and read_from_replica(session):
+        # A replica may not have replayed a fresh registration yet, so only the primary can tell the email is unknown
+        db_account = (await session.execute(stmt)).scalar_one_or_none()
+
+    account = AccountCache.snapshot(db_account) if db_account else None
+    await account_cache.set(email, account)
+
+    return account
 
 
-async def register_account(session: AsyncSession, creds: Credentials) -> Account:
-    """Register a new client account with provided credentials."""
-    if await get_account(session, creds.email):
+async def register_account(session: AsyncSession, creds: Credentials) -> AccountSnapshot:
+    """
+    Register a new client account with provided credentials.
+    A single `INSERT ... ON CONFLICT DO NOTHING` lets the unique email index settle concurrent sign-ups.
+    """
+    # Reject known emails before spending time on hashing
+    hit, cached = await account_cache.get_by_email(creds.email)
+
+    if hit and cached is not None:
         raise AccountAlreadyExists()
 
-    account = Account(
+    account = AccountSnapshot(
+        id=uuid7(),
         email=creds.email,
-        password_hash=hash_password(creds.password),
+        password_hash=await hash_password(creds.password),
+        is_active=True,
+        is_verified=False,
+    )
+
+    stmt = (
+        insert(Account)
+        .values(account.model_dump(exclude={"oauth2_provider"}))
+        .on_conflict_do_nothing(index_elements=[Account.email])
+        .returning(Account.id)
     )
 
-    session.add(account)
-    await session.flush()
+    if await session.scalar(stmt) is None:
+        raise AccountAlreadyExists()
+
+    # Drop the cached unknown email, once the account is visible to other requests
+    after_commit(session, partial(account_cache.invalidate, creds.email, account.id))
 
     return account
 
 
-async def authenticate(session: AsyncSession, creds: Credentials) -> Account:
+async def authenticate(session: AsyncSession, creds: Credentials) -> AccountSnapshot:
     """Authenticate a client with provided credentials."""
     if account := await get_account(session, creds.email):
 
         # Check password and return a client account if the password is valid
-        if verify_password(creds.password, str(account.password_hash)):
+        if await verify_password(creds.password, account.password_hash):
             return account
 
         # Notify a client that he can get in through his provider.
-        if isinstance(account.oauth2, OAuth2Account):
-            raise OAuth2AccountExists(OAuth2ProviderEnum(account.oauth2.provider))
+        if account.oauth2_provider is not None:
+            raise OAuth2AccountExists(OAuth2ProviderEnum(account.oauth2_provider))
+    else:
+        # Spend as long on an unknown email as on a wrong password, so that accounts can't be told apart
+        await verify_password(creds.password, UNUSABLE_PASSWORD_HASH)
 
     raise InvalidCredentials()
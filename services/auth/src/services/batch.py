@@ -0,0 +1,90 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import chain, islice, repeat
+from multiprocessing import get_context
+from typing import Iterator, Sequence
+
+from core.configs.jwt import jwt_settings
+from enums import TokenTypeEnum
+from schemas import AccessToken, TokenPair
+from services.token import get_key_registry, sign_tokens
+
+__all__ = [
+    "issue_access_tokens",
+    "issue_token_pairs",
+    "signing_pool",
+]
+
+
+class _SigningPool:
+    """Process pool signing batches, started once and shared by all batch calls."""
+
+    __slots__ = ("_executor",)
+
+    def __init__(self) -> None:
+        """Initialize signing pool without workers."""
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor | None:
+        """Get process pool, or `None` while batches are signed in the current process."""
+        return self._executor
+
+    def start(self, workers: int) -> None:
+        """Start process pool with a number of workers, unless one worker is asked for."""
+        if self._executor is None and workers > 1:
+            # Workers are spawned, so they don't inherit event loop and connection state of the application,
+            # and parse keys once when they start.
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context("spawn"),
+                initializer=get_key_registry,
+            )
+
+    def shutdown(self) -> None:
+        """Shut down process pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+signing_pool = _SigningPool()
+
+
+def _chunks(subjects: Sequence[str], size: int) -> Iterator[list[str]]:
+    """Split subjects into chunks of a given size."""
+    iterator = iter(subjects)
+
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _sign(executor: Executor | None, subjects: Sequence[str], token_type: TokenTypeEnum, now: datetime) -> list[str]:
+    """Sign tokens in the current process or spread chunks of subjects across the process pool."""
+    if executor is None:
+        return sign_tokens(subjects, token_type, now)
+
+    chunks = _chunks(subjects, jwt_settings.BATCH_CHUNK_SIZE)
+    results = executor.map(sign_tokens, chunks, repeat(token_type), repeat(now))
+
+    return list(chain.from_iterable(results))
+
+
+def issue_token_pairs(subjects: Sequence[str], executor: Executor | None = None) -> list[TokenPair]:
+    """Issue token pairs for many subjects with one timestamp, optionally signing in a process pool."""
+    now = datetime.now(timezone.utc)
+    access_tokens = _sign(executor, subjects, TokenTypeEnum.ACCESS, now)
+    refresh_tokens = _sign(executor, subjects, TokenTypeEnum.REFRESH, now)
+
+    return [
+        TokenPair(access_token=access_token, refresh_token=refresh_token)
+        for access_token, refresh_token in zip(access_tokens, refresh_tokens)
+    ]
+
+
+def issue_access_tokens(subjects: Sequence[str], executor: Executor | None = None) -> list[AccessToken]:
+    """Issue access tokens for many subjects with one timestamp, optionally signing in a process pool."""
+    now = datetime.now(timezone.utc)
+    access_tokens = _sign(executor, subjects, TokenTypeEnum.ACCESS, now)
+
+    return [AccessToken(access_token=access_token) for access_token in access_tokens]
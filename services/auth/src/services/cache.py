@@ -0,0 +1,131 @@
+from logging import getLogger
+from uuid import UUID
+
+from pydantic import ValidationError
+from redis.exceptions import RedisError
+
+from core.clients.redis import redis
+from core.configs.cache import account_cache_settings
+from core.metrics import ACCOUNT_CACHE_LOOKUPS
+from models import Account
+from schemas import AccountSnapshot
+
+__all__ = [
+    "AccountCache",
+    "account_cache",
+]
+
+logger = getLogger("uvicorn.error")
+
+
+class AccountCache:
+    """
+    Read-through cache of account snapshots in Redis, looked up by email or id.
+    Unknown emails are cached as well, so repeated attempts with them don't reach the database.
+    Changed emails are marked for a while instead of dropped, and an unknown email never replaces an entry,
+    so a lookup which read the database before a sign-up committed can't hide the new account.
+    Redis failures are treated as misses.
+    """
+
+    ENABLED = account_cache_settings.ENABLED
+    PREFIX = account_cache_settings.PREFIX
+    TTL = account_cache_settings.TTL_SECONDS
+    NEGATIVE_TTL = account_cache_settings.NEGATIVE_TTL_SECONDS
+
+    # Cached value of an unknown account
+    MISSING = ""
+    # Cached value of a changed account, looked up in the database until it expires
+    INVALIDATED = "invalidated"
+
+    __slots__ = ()
+
+    @staticmethod
+    def snapshot(account: Account) -> AccountSnapshot:
+        """Get a snapshot of a client account, detached from a database session."""
+        return AccountSnapshot(
+            id=account.id,
+            email=account.email,
+            password_hash=account.password_hash,
+            is_active=account.is_active,
+            is_verified=account.is_verified,
+            oauth2_provider=account.oauth2.provider if account.oauth2 is not None else None,
+        )
+
+    async def get_by_email(self, email: str) -> tuple[bool, AccountSnapshot | None]:
+        """Get cached account by email, as `(hit, account)`; a hit without an account means the email is unknown."""
+        return await self._get("email", email)
+
+    async def get_by_id(self, account_id: UUID) -> tuple[bool, AccountSnapshot | None]:
+        """Get cached account by id, as `(hit, account)`."""
+        return await self._get("id", str(account_id))
+
+    async def set(self, email: str, account: AccountSnapshot | None) -> None:  # noqa: A003
+        """Cache an account under its email and id, or remember that the email is unknown."""
+        if not self.ENABLED:
+            return
+
+        try:
+            if account is None:
+                await redis.set(self._key("email", email), self.MISSING, ex=self.NEGATIVE_TTL, nx=True)
+            else:
+                value = account.model_dump_json()
+
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.set(self._key("email", email), value, ex=self.TTL)
+                    pipe.set(self._key("id", str(account.id)), value, ex=self.TTL)
+                    await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"Account cache write failed: {exc!r}")
+
+    async def invalidate(self, email: str, account_id: UUID | None = None) -> None:
+        """Drop cached account after it was created or changed."""
+        if not self.ENABLED:
+            return
+
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                # Outlives lookups reading the database before the change, so they can't cache the email as unknown
+                pipe.set(self._key("email", email), self.INVALIDATED, ex=self.NEGATIVE_TTL)
+
+                if account_id is not None:
+                    pipe.delete(self._key("id", str(account_id)))
+
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"Account cache invalidation failed, entries expire in {self.TTL}s: {exc!r}")
+
+    async def _get(self, kind: str, value: str) -> tuple[bool, AccountSnapshot | None]:
+        if not self.ENABLED:
+            return False, None
+
+        try:
+            cached = await redis.get(self._key(kind, value))
+        except RedisError as exc:
+            ACCOUNT_CACHE_LOOKUPS.labels(kind, "error").inc()
+            logger.warning(f"Account cache read failed: {exc!r}")
+            return False, None
+
+        result, account = self._decode(cached)
+        ACCOUNT_CACHE_LOOKUPS.labels(kind, result).inc()
+
+        return result != "miss", account
+
+    def _decode(self, cached: str | None) -> tuple[str, AccountSnapshot | None]:
+        """Decode a cached value into the lookup result and the account."""
+        if cached is None or cached == self.INVALIDATED:
+            return "miss", None
+
+        if cached == self.MISSING:
+            return "negative_hit", None
+
+        try:
+            return "hit", AccountSnapshot.model_validate_json(cached)
+        except ValidationError:
+            # Entry written by an incompatible version, fall back to the database
+            return "miss", None
+
+    def _key(self, kind: str, value: str) -> str:
+        return f"{self.PREFIX}:{kind}:{value}"
+
+
+account_cache = AccountCache()
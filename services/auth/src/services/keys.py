@@ -0,0 +1,105 @@
+from base64 import urlsafe_b64encode
+from hashlib import sha256
+from json import dumps
+from typing import Any
+
+from authlib.jose import JsonWebKey, JsonWebSignature, Key
+
+from schemas import JWK, JWKS
+
+__all__ = [
+    "KeyRegistry",
+]
+
+
+class KeyRegistry:
+    """
+    Registry of parsed signing and verification keys indexed by key id.
+    RSA keys use the configured RSA algorithm, EC and OKP keys get the algorithm of their curve.
+    """
+
+    CURVE_ALGORITHMS = {
+        "P-256": "ES256",
+        "P-384": "ES384",
+        "P-521": "ES512",
+        "Ed25519": "EdDSA",
+    }
+
+    __slots__ = (
+        "_jwks",
+        "_jwks_document",
+        "_jwks_etag",
+        "_signing_algorithm",
+        "_signing_header",
+        "_signing_key",
+        "_verification_keys",
+    )
+
+    def __init__(self, algorithm: str, signing_kid: str, private_key: str, public_keys: dict[str, str]) -> None:
+        """Parse PEM key material once into ready-to-use key objects."""
+        self._signing_key = self.import_key(private_key, signing_kid, algorithm)
+        signing_algorithm = self._signing_key.options["alg"]
+
+        self._signing_algorithm = JsonWebSignature.ALGORITHMS_REGISTRY[signing_algorithm]
+        self._signing_header = self.b64encode({"alg": signing_algorithm, "kid": signing_kid, "typ": "JWT"})
+        self._verification_keys = {
+            kid: self.import_key(public_key, kid, algorithm) for kid, public_key in public_keys.items()
+        }
+        self._jwks = JWKS(keys=[JWK(**key.tokens) for key in self._verification_keys.values()])
+        self._jwks_document = self._jwks.model_dump_json(exclude_none=True).encode("utf-8")
+        self._jwks_etag = f'"{sha256(self._jwks_document).hexdigest()}"'
+
+    @property
+    def jwks(self) -> JWKS:
+        """Get JSON web key set."""
+        return self._jwks
+
+    @property
+    def jwks_document(self) -> bytes:
+        """Get pre-serialized JSON web key set."""
+        return self._jwks_document
+
+    @property
+    def jwks_etag(self) -> str:
+        """Get strong entity tag of the pre-serialized JSON web key set."""
+        return self._jwks_etag
+
+    @property
+    def signing_key(self) -> Key:
+        """Get private key used to sign new tokens."""
+        return self._signing_key
+
+    @staticmethod
+    def b64encode(data: dict[str, Any]) -> bytes:
+        """Encode compact JSON into an unpadded base64url segment."""
+        return urlsafe_b64encode(dumps(data, separators=(",", ":")).encode("utf-8")).rstrip(b"=")
+
+    @classmethod
+    def import_key(cls, raw_key: str, kid: str, rsa_algorithm: str) -> Key:
+        """Import PEM key material into a key object with the algorithm matching its type."""
+        key: Key = JsonWebKey.import_key(raw_key, {"kid": kid, "use": "sig"})  # type: ignore[arg-type]
+
+        if key.kty == "RSA":
+            key.options["alg"] = rsa_algorithm
+        elif (curve := key.tokens.get("crv")) in cls.CURVE_ALGORITHMS:
+            key.options["alg"] = cls.CURVE_ALGORITHMS[curve]
+        else:
+            raise ValueError(f"Unsupported key '{kid}' of type '{key.kty}' with curve '{curve}'.")
+
+        return key
+
+    def sign(self, payload: dict[str, Any]) -> str:
+        """Sign payload into a compact JWS with the pre-encoded header and the parsed signing key."""
+        signing_input = self._signing_header + b"." + self.b64encode(payload)
+        signature = urlsafe_b64encode(self._signing_algorithm.sign(signing_input, self._signing_key)).rstrip(b"=")
+
+        return (signing_input + b"." + signature).decode("ascii")
+
+    def find_verification_key(self, header: dict[str, Any], _: Any) -> Key:
+        """Select verification key by the `kid` of a token header and check that `alg` matches the key."""
+        key = self._verification_keys.get(header.get("kid", ""))
+
+        if key is None or key.options["alg"] != header.get("alg"):
+            raise ValueError("Invalid JSON Web Key Set")
+
+        return key
@@ -0,0 +1,459 @@
+from asyncio import CancelledError, Task, create_task, sleep, timeout
+from contextlib import suppress
+from dataclasses import dataclass
+from itertools import islice
+from logging import getLogger
+from math import ceil
+from time import monotonic, perf_counter, time
+from typing import Awaitable, Callable, Literal, Sequence
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from redis.exceptions import RedisError
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.clients.redis import redis
+from core.configs.limits import limit_settings
+from core.exceptions import RateLimitExceeded
+from core.metrics import RATE_LIMIT_BREAKER_OPEN, RATE_LIMIT_DECISIONS, RATE_LIMIT_SYNC_DURATION
+
+__all__ = [
+    "CircuitBreaker",
+    "credential_rate_limiter",
+    "gcra_limiter",
+    "GCRARateLimiter",
+    "hybrid_limiter",
+    "HybridRateLimiter",
+    "rate_limiter",
+    "RateLimiterMiddleware",
+    "RateLimitState",
+    "TokenBucket",
+]
+
+logger = getLogger("uvicorn.error")
+
+PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+# Generic cell rate algorithm over all keys of a check, with times in milliseconds of the Redis clock.
+# A request is allowed only if every key allows it, and then it is counted for every key.
+# Returns whether it is allowed, requests remaining, and milliseconds until a retry and until the limit resets.
+_GCRA_SCRIPT = redis.register_script(
+    """
+    local time = redis.call("TIME")
+    local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+    local limit, period = tonumber(ARGV[1]), tonumber(ARGV[2])
+    local interval = period / limit
+    local allowed, remaining, retry_after, reset = 1, limit, 0, 0
+    local tats = {}
+
+    for i, key in ipairs(KEYS) do
+        local tat = math.max(tonumber(redis.call("GET", key)) or now, now)
+        local allow_at = tat + interval - period
+
+        if allow_at > now then
+            allowed, remaining = 0, 0
+            retry_after = math.max(retry_after, allow_at - now)
+        else
+            remaining = math.min(remaining, math.floor((now - allow_at) / interval))
+        end
+
+        tats[i] = tat + interval
+        reset = math.max(reset, tat - now)
+    end
+
+    if allowed == 1 then
+        for i, key in ipairs(KEYS) do
+            redis.call("SET", key, string.format("%d", math.ceil(tats[i])), "PX", math.ceil(tats[i] - now))
+            reset = math.max(reset, tats[i] - now)
+        end
+    end
+
+    return {allowed, remaining, math.ceil(retry_after), math.ceil(reset)}
+    """
+)
+
+
+class TokenBucket:
+    """Bucket of `requests` tokens, refilled evenly over `period` seconds."""
+
+    __slots__ = (
+        "period",
+        "requests",
+        "tokens",
+        "updated",
+    )
+
+    def __init__(self, requests: int, period: int, now: float) -> None:
+        """Initialize a full bucket."""
+        self.period = period
+        self.requests = requests
+        self.tokens = float(requests)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take a token, return 0 if there was one or seconds until the next one."""
+        rate = self.requests / self.period
+        self.tokens = min(self.requests, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+
+        return (1 - self.tokens) / rate
+
+    def full(self, now: float) -> bool:
+        """Check if the bucket refilled, so dropping it changes nothing."""
+        return self.tokens + (now - self.updated) * self.requests / self.period >= self.requests
+
+
+class CircuitBreaker:
+    """
+    Breaker of calls to a failing or slow dependency.
+    Opens after a number of failures in a row and lets a trial call through once the reset timeout passed.
+    """
+
+    __slots__ = (
+        "_failures",
+        "_max_failures",
+        "_name",
+        "_opened_at",
+        "_reset_seconds",
+    )
+
+    def __init__(self, name: str, max_failures: int, reset_seconds: float) -> None:
+        """Initialize closed breaker."""
+        self._failures = 0
+        self._max_failures = max_failures
+        self._name = name
+        self._opened_at: float | None = None
+        self._reset_seconds = reset_seconds
+
+    @property
+    def closed(self) -> bool:
+        """Check if calls go through."""
+        return self._opened_at is None
+
+    def allow(self) -> bool:
+        """Check if a call may go through: always while closed, and as a trial once the reset timeout passed."""
+        return self._opened_at is None or monotonic() - self._opened_at >= self._reset_seconds
+
+    def succeed(self) -> None:
+        """Close the breaker after a successful call."""
+        self._failures = 0
+        self._set_opened_at(None)
+
+    def fail(self) -> None:
+        """Count a failed call, opening the breaker, or opening it again after a failed trial."""
+        self._failures += 1
+
+        if self._failures >= self._max_failures:
+            self._set_opened_at(monotonic())
+
+    def _set_opened_at(self, value: float | None) -> None:
+        self._opened_at = value
+        RATE_LIMIT_BREAKER_OPEN.labels(self._name).set(int(value is not None))
+
+
+class HybridRateLimiter:
+    """
+    Rate limiter answering from in-process token buckets, so checks never wait for Redis.
+    Allowed hits are added to per-window Redis counters in background batches, and a key whose cluster-wide
+    count reached its limit is rejected locally until the window ends. While Redis is failing or slower
+    than the latency budget, the breaker stops syncing and every replica enforces limits on its own.
+    """
+
+    PREFIX = limit_settings.PREFIX
+    SYNC_INTERVAL = limit_settings.SYNC_INTERVAL_SECONDS
+    SYNC_BATCH_SIZE = limit_settings.SYNC_BATCH_SIZE
+    MAX_KEYS = limit_settings.MAX_KEYS
+    LATENCY_BUDGET = limit_settings.REDIS_LATENCY_BUDGET_SECONDS
+
+    __slots__ = (
+        "_blocked",
+        "_breaker",
+        "_buckets",
+        "_pending",
+        "_task",
+    )
+
+    def __init__(self) -> None:
+        """Initialize rate limiter without any buckets."""
+        self._blocked: dict[str, float] = {}
+        self._breaker = CircuitBreaker("hybrid", limit_settings.BREAKER_FAILURES, limit_settings.BREAKER_RESET_SECONDS)
+        self._buckets: dict[str, TokenBucket] = {}
+        self._pending: dict[str, int] = {}
+        self._task: Task[None] | None = None
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """Get breaker of syncs with Redis."""
+        return self._breaker
+
+    def hit(self, key: str, requests: int, period: int) -> float:
+        """Count a request, return 0 if it is allowed or seconds until the key may retry."""
+        if (blocked_until := self._blocked.get(key, 0.0)) > (now := time()):
+            RATE_LIMIT_DECISIONS.labels("rejected_global").inc()
+            return blocked_until - now
+
+        if (bucket := self._buckets.get(key)) is None:
+            if len(self._buckets) >= self.MAX_KEYS:
+                self._evict()
+
+            bucket = self._buckets[key] = TokenBucket(requests, period, monotonic())
+
+        if retry_after := bucket.take(monotonic()):
+            RATE_LIMIT_DECISIONS.labels("rejected_local").inc()
+            return retry_after
+
+        self._pending[key] = self._pending.get(key, 0) + 1
+        RATE_LIMIT_DECISIONS.labels("allowed").inc()
+
+        return 0.0
+
+    async def sync(self) -> None:
+        """Add pending hits to Redis counters, and block keys which reached their limits cluster-wide."""
+        if not self._breaker.allow():
+            # Local-only enforcement, hits of this time are never synced
+            self._pending.clear()
+            return
+
+        hits = [(key, self._pending.pop(key)) for key in list(islice(self._pending, self.SYNC_BATCH_SIZE))]
+        # Hits of evicted buckets are dropped, their limits are not known anymore
+        batch = [(key, count, bucket) for key, count in hits if (bucket := self._buckets.get(key))]
+        now = time()
+
+        if not batch or (counts := await self._add(batch, now)) is None:
+            return
+
+        self._blocked = {key: until for key, until in self._blocked.items() if until > now}
+
+        for (key, _, bucket), count in zip(batch, counts):
+            if count >= bucket.requests:
+                self._blocked[key] = (now // bucket.period + 1) * bucket.period
+
+    async def start(self) -> None:
+        """Start syncing hits with Redis in background."""
+        if self._task is None:
+            self._task = create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop syncing hits with Redis, syncing the pending ones."""
+        if self._task is not None:
+            self._task.cancel()
+
+            with suppress(CancelledError):
+                await self._task
+
+            self._task = None
+            await self.sync()
+
+    async def _run(self) -> None:
+        while True:
+            await sleep(self.SYNC_INTERVAL)
+            await self.sync()
+
+    async def _add(self, batch: list[tuple[str, int, TokenBucket]], now: float) -> list[int] | None:
+        """Add hits to counters of current windows in one round-trip, return the counts or `None` on failure."""
+        started = perf_counter()
+
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, hits, bucket in batch:
+                    name = f"{self.PREFIX}:{key}:{int(now // bucket.period)}"
+                    pipe.incrby(name, hits)
+                    pipe.expire(name, bucket.period)
+
+                results = await pipe.execute()
+        except (RedisError, OSError) as exc:
+            self._breaker.fail()
+            logger.warning(f"Rate limit sync with Redis failed: {exc!r}")
+            return None
+        finally:
+            RATE_LIMIT_SYNC_DURATION.observe(elapsed := perf_counter() - started)
+
+        if elapsed > self.LATENCY_BUDGET:
+            self._breaker.fail()
+        else:
+            self._breaker.succeed()
+
+        return [int(count) for count in results[::2]]
+
+    def _evict(self) -> None:
+        """Drop refilled buckets without pending hits, or the oldest one if none of them is."""
+        now = monotonic()
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items() if key in self._pending or not bucket.full(now)
+        }
+
+        if len(self._buckets) >= self.MAX_KEYS:
+            del self._buckets[next(iter(self._buckets))]
+
+
+hybrid_limiter = HybridRateLimiter()
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitState:
+    limit: int
+    remaining: int
+    retry_after: float
+    reset: float
+
+    @property
+    def allowed(self) -> bool:
+        return self.retry_after == 0
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(ceil(self.reset)),
+        }
+
+
+class GCRARateLimiter:
+    """
+    Rate limiter checking and counting all keys of a request in a single Redis script call, so the decision
+    is exact cluster-wide and rejected requests cost one round-trip. Calls failing or slower than the latency
+    budget count against the breaker, and while it is open checks are left to the local buckets.
+    """
+
+    PREFIX = limit_settings.PREFIX
+    LATENCY_BUDGET = limit_settings.REDIS_LATENCY_BUDGET_SECONDS
+
+    __slots__ = ("_breaker",)
+
+    def __init__(self) -> None:
+        """Initialize rate limiter with a closed breaker."""
+        self._breaker = CircuitBreaker("gcra", limit_settings.BREAKER_FAILURES, limit_settings.BREAKER_RESET_SECONDS)
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """Get breaker of calls to Redis."""
+        return self._breaker
+
+    async def check(self, keys: Sequence[str], requests: int, period: int) -> RateLimitState | None:
+        """Count a request against every key, return the state of the strictest one or `None` on failure."""
+        if not self._breaker.allow():
+            return None
+
+        names = [f"{self.PREFIX}:gcra:{key}" for key in keys]
+
+        try:
+            async with timeout(self.LATENCY_BUDGET):
+                allowed, remaining, retry_after, reset = await _GCRA_SCRIPT(
+                    keys=names,
+                    args=[requests, period * 1000],
+                    client=redis,
+                )
+        except (RedisError, OSError) as exc:
+            self._breaker.fail()
+            logger.warning(f"Rate limit check with Redis failed: {exc!r}")
+            return None
+
+        self._breaker.succeed()
+        RATE_LIMIT_DECISIONS.labels("allowed" if allowed else "rejected_global").inc()
+
+        return RateLimitState(requests, int(remaining), int(retry_after) / 1000, int(reset) / 1000)
+
+
+gcra_limiter = GCRARateLimiter()
+
+
+def rate_limiter(
+    requests: int,
+    per: Literal["second", "minute", "hour", "day"],
+) -> Callable[[Request], Awaitable[None]]:
+    """Create a dependency limiting requests of a client to a route."""
+    period = PERIODS[per]
+
+    async def limiter(request: Request) -> None:
+        if not limit_settings.ENABLED:
+            return
+
+        client = request.client.host if request.client else "unknown"
+
+        if retry_after := hybrid_limiter.hit(f"{request.method}:{request.url.path}:{client}", requests, period):
+            raise RateLimitExceeded(ceil(retry_after))
+
+    return limiter
+
+
+class RateLimiterMiddleware:
+    """Middleware limiting all requests of a client address from the local buckets, before any route limit."""
+
+    __slots__ = ("_app", "_period", "_requests")
+
+    def __init__(self, app: ASGIApp, requests: int, per: Literal["second", "minute", "hour", "day"]) -> None:
+        """Initialize middleware with the limit of a client."""
+        self._app = app
+        self._period = PERIODS[per]
+        self._requests = requests
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not limit_settings.ENABLED:
+            await self._app(scope, receive, send)
+            return
+
+        client = scope["client"][0] if scope.get("client") else "unknown"
+
+        if retry_after := hybrid_limiter.hit(f"*:{client}", self._requests, self._period):
+            exc = RateLimitExceeded(ceil(retry_after))
+            response = JSONResponse(content={"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+            await response(scope, receive, send)
+            return
+
+        await self._app(scope, receive, send)
+
+
+async def _email(request: Request) -> str | None:
+    """Get the account email from a JSON body, if any."""
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+
+    email = body.get("email") if isinstance(body, dict) else None
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+def credential_rate_limiter(
+    requests: int,
+    per: Literal["second", "minute", "hour", "day"],
+) -> Callable[[Request, Response], Awaitable[None]]:
+    """
+    Create a dependency limiting attempts with credentials per client address and per account email,
+    checked in one Redis call before the credentials are looked at.
+    """
+    period = PERIODS[per]
+
+    async def limiter(request: Request, response: Response) -> None:
+        if not limit_settings.ENABLED:
+            return
+
+        client = request.client.host if request.client else "unknown"
+        keys = [f"{request.url.path}:ip:{client}"]
+
+        if email := await _email(request):
+            keys.append(f"{request.url.path}:email:{email}")
+
+        if (state := await gcra_limiter.check(keys, requests, period)) is None:
+            # Redis is unavailable, limit the client address locally
+            if retry_after := hybrid_limiter.hit(f"{request.method}:{request.url.path}:{client}", requests, period):
+                raise RateLimitExceeded(ceil(retry_after))
+
+            return
+
+        if not state.allowed:
+            raise RateLimitExceeded(ceil(state.retry_after), headers=state.headers)
+
+        response.headers.update(state.headers)
+
+    return limiter
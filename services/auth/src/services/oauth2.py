@@ -1,11 +1,15 @@
-from secrets import token_urlsafe
+from functools import partial
+from typing import Any
 
 from authlib.integrations.httpx_client import AsyncOAuth2Client
 from authlib.integrations.starlette_client import OAuth
 from fastapi import Request
-from sqlalchemy import select
+from sqlalchemy import CTE, Select, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from uuid6 import uuid7
 
+from core.clients.http import HTTPPools, http_pools
 from core.configs.oauth2 import OAuth2Settings
 from core.exceptions import (
     InvalidProviderForPlatform,
@@ -14,18 +18,34 @@ from core.exceptions import (
     MissingNonce,
     OAuth2AccountExists,
 )
-from core.security import hash_password
+from core.security import UNUSABLE_PASSWORD_HASH
+from db.session import after_commit
 from enums import MobilePlatformEnum, OAuth2ProviderEnum, PlatformEnum
 from models import Account, OAuth2Account
-from schemas import OAuth2AccountSchema, OAuth2Callback, TokenPair
+from schemas import AccountSnapshot, OAuth2AccountSchema, OAuth2Callback, TokenPair
+from services.cache import account_cache
+from services.oidc import CachedOAuth2App
 from services.token import TokenFactory
 
 __all__ = [
+    "OIDC_METADATA_URLS",
     "get_oauth2_client",
     "oauth2_finalize_mobile",
     "oauth2_finalize_web",
 ]
 
+GOOGLE_METADATA_URL = "https://accounts.google.com/.well-known/openid-configuration"
+APPLE_METADATA_URL = "https://appleid.apple.com/.well-known/openid-configuration"
+
+# Providers whose metadata and JWKS are served from the shared provider cache
+OIDC_METADATA_URLS = (
+    GOOGLE_METADATA_URL,
+    APPLE_METADATA_URL,
+)
+
+# Account columns returned along with the provider after sign-in
+_ACCOUNT_COLUMNS = (Account.id, Account.email, Account.password_hash, Account.is_active, Account.is_verified)
+
 oauth2 = OAuth()  # type: ignore
 
 # --- Google -----------------------------------------------------------------------------------------------------------
@@ -42,8 +62,13 @@ for google_platform in PlatformEnum:
         name=f"{google}_{google_platform}",
         client_id=google_oauth2.CLIENT_ID,
         client_secret=google_oauth2.CLIENT_SECRET,
-        client_kwargs={"scope": "openid email profile"},
-        server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
+        client_kwargs={
+            "scope": "openid email profile",
+            "timeout": HTTPPools.TIMEOUT,
+            "transport": http_pools.get(google),
+        },
+        server_metadata_url=GOOGLE_METADATA_URL,
+        client_cls=CachedOAuth2App,
     )
 
 # --- Facebook ---------------------------------------------------------------------------------------------------------
@@ -63,7 +88,11 @@ for facebook_platform in PlatformEnum:
         access_token_url="https://graph.facebook.com/v19.0/oauth/access_token",
         authorize_url="https://www.facebook.com/v19.0/dialog/oauth",
         api_base_url="https://graph.facebook.com/v19.0/",
-        client_kwargs={"scope": "email public_profile"},
+        client_kwargs={
+            "scope": "email public_profile",
+            "timeout": HTTPPools.TIMEOUT,
+            "transport": http_pools.get(facebook),
+        },
     )
 
 # --- Apple ------------------------------------------------------------------------------------------------------------
@@ -80,47 +109,113 @@ for apple_platform in [PlatformEnum.IOS, PlatformEnum.WEB]:
         name=f"{apple}_{apple_platform}",
         client_id=apple_oauth2.CLIENT_ID,  # usually the Services ID
         client_secret=apple_oauth2.CLIENT_SECRET,  # JWT signed with an Apple private key
-        server_metadata_url="https://appleid.apple.com/.well-known/openid-configuration",
-        client_kwargs={"scope": "openid email name"},
+        server_metadata_url=APPLE_METADATA_URL,
+        client_kwargs={
+            "scope": "openid email name",
+            "timeout": HTTPPools.TIMEOUT,
+            "transport": http_pools.get(apple),
+        },
+        client_cls=CachedOAuth2App,
     )
 
 # ----------------------------------------------------------------------------------------------------------------------
 
 
-async def oauth2_authenticate(session: AsyncSession, account_info: OAuth2AccountSchema) -> Account:
-    """Authenticate client with OAuth2 provider."""
-    # 1. Check for existing a client account by email
-    account: Account | None = await session.scalar(
-        select(Account).where(Account.email == account_info.email),
+def _link_oauth2_account(account: CTE, account_info: OAuth2AccountSchema) -> Select[Any]:
+    """
+    Build a single statement that links an account to the provider unless it is linked already,
+    and returns the account with its provider.
+    """
+    linked = (
+        insert(OAuth2Account)
+        .from_select(
+            ["account_id", "provider", "provider_id"],
+            select(account.c.id, literal(account_info.provider), literal(account_info.provider_id)),
+        )
+        .on_conflict_do_nothing(index_elements=[OAuth2Account.account_id])
+        .returning(OAuth2Account.account_id, OAuth2Account.provider)
+        .cte("linked_account")
     )
 
-    # 2. Raise error if a client account exists but the provider mismatches
-    if account and isinstance(account.oauth2, OAuth2Account):
-        if (provider := account.oauth2.provider) != account_info.provider:
-            raise OAuth2AccountExists(OAuth2ProviderEnum(provider))
+    # All parts see the table as it was before the statement, so `oauth_accounts` holds only earlier links
+    return (
+        select(
+            account,
+            func.coalesce(OAuth2Account.provider, linked.c.provider).label("oauth2_provider"),
+            linked.c.account_id.is_not(None).label("linked"),
+        )
+        .outerjoin(OAuth2Account, OAuth2Account.account_id == account.c.id)
+        .outerjoin(linked, linked.c.account_id == account.c.id)
+    )
 
-    # 3. Create a new account
-    if account is None:
-        new_account = Account(
+
+def _upsert_oauth2_account(account_info: OAuth2AccountSchema) -> Select[Any]:
+    """
+    Build a single statement that creates an account or verifies an unverified one by email, and links it.
+    `ON CONFLICT DO UPDATE` returns and locks an unverified row, so concurrent sign-ins get the same account.
+    Verified accounts are left untouched, so the statement returns no row for them.
+    """
+    upserted = (
+        insert(Account)
+        .values(
+            id=uuid7(),
             email=account_info.email,
-            password_hash=hash_password(token_urlsafe(32)),
+            password_hash=UNUSABLE_PASSWORD_HASH,
+            is_active=True,
             is_verified=True,
-            oauth2=OAuth2Account(
-                provider=account_info.provider,
-                provider_id=account_info.provider_id,
-            ),
         )
-        session.add(new_account)
-        return new_account
-
-    # 4. Create a new OAuth account
-    if account.oauth2 is None:
-        account.is_verified = True
-        account.oauth2 = OAuth2Account(
-            account_id=account.id,
-            provider=account_info.provider,
-            provider_id=account_info.provider_id,
+        .on_conflict_do_update(
+            index_elements=[Account.email],
+            set_={"is_verified": True},
+            where=Account.is_verified.is_(False),
         )
+        .returning(*_ACCOUNT_COLUMNS)
+        .cte("upserted_account")
+    )
+
+    return _link_oauth2_account(upserted, account_info)
+
+
+def _select_oauth2_account(account_info: OAuth2AccountSchema) -> Select[Any]:
+    """Build a single statement that reads a verified account by email, and links it."""
+    existing = select(*_ACCOUNT_COLUMNS).where(Account.email == account_info.email).cte("existing_account")
+    return _link_oauth2_account(existing, account_info)
+
+
+async def oauth2_authenticate(session: AsyncSession, account_info: OAuth2AccountSchema) -> AccountSnapshot:
+    """Authenticate client with OAuth2 provider."""
+    # 1. Accounts already linked to a provider only need a token pair, skip the database
+    hit, cached = await account_cache.get_by_email(account_info.email)
+
+    if hit and cached is not None and cached.oauth2_provider is not None:
+        if cached.oauth2_provider != account_info.provider:
+            raise OAuth2AccountExists(OAuth2ProviderEnum(cached.oauth2_provider))
+
+        return cached
+
+    # 2. Create a new account or verify an existing one, and link it to the provider in one round-trip
+    if (row := (await session.execute(_upsert_oauth2_account(account_info))).one_or_none()) is None:
+        # A verified account only needs the link, without writing a new version of its row
+        row = (await session.execute(_select_oauth2_account(account_info))).one()
+
+    account = AccountSnapshot(
+        id=row.id,
+        email=row.email,
+        password_hash=row.password_hash,
+        is_active=row.is_active,
+        is_verified=row.is_verified,
+        oauth2_provider=row.oauth2_provider,
+    )
+
+    # 3. Raise error if a client account exists but the provider mismatches, the transaction is rolled back
+    if account.oauth2_provider != account_info.provider:
+        raise OAuth2AccountExists(OAuth2ProviderEnum(account.oauth2_provider))
+
+    # Update the cache once the account and its link are visible to other requests
+    if row.linked:
+        after_commit(session, partial(account_cache.invalidate, account.email, account.id))
+    else:
+        after_commit(session, partial(account_cache.set, account.email, account))
 
     return account
 
@@ -164,9 +259,12 @@ async def oauth2_finalize_mobile(
 ) -> TokenPair:
     """Finalize mobile authentication."""
     provider_settings = OAuth2Settings.get_settings(provider, platform)
+    # Short-lived client over the provider's connection pool, which outlives it
     async_client = AsyncOAuth2Client(
         client_id=provider_settings.CLIENT_ID,
         token_endpoint=provider_settings.TOKEN_ENDPOINT,
+        timeout=HTTPPools.TIMEOUT,
+        transport=http_pools.get(provider),
     )
 
     async with async_client as client:
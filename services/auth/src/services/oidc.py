@@ -0,0 +1,205 @@
+from asyncio import CancelledError, Task, create_task, gather, shield, sleep
+from contextlib import suppress
+from dataclasses import dataclass
+from logging import getLogger
+from re import compile as re_compile
+from time import monotonic
+from typing import Any, Iterable
+
+from authlib.integrations.starlette_client import StarletteOAuth2App
+from httpx import AsyncBaseTransport, AsyncClient, HTTPError
+
+from core.configs.oidc import oidc_settings
+from core.metrics import OIDC_DOCUMENT_FETCHES, OIDC_STALE_DOCUMENTS
+
+__all__ = [
+    "CachedOAuth2App",
+    "ProviderCache",
+    "provider_cache",
+]
+
+logger = getLogger("uvicorn.error")
+
+_MAX_AGE = re_compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)")
+
+
+@dataclass(slots=True)
+class _Document:
+    value: dict[str, Any]
+    checked_at: float
+    expires_at: float
+
+    @property
+    def refresh_at(self) -> float:
+        return self.checked_at + (self.expires_at - self.checked_at) * oidc_settings.CACHE_REFRESH_AHEAD
+
+
+class ProviderCache:
+    """
+    Cache of OpenID provider metadata and JWKS shared by all OAuth2 clients of the process.
+    Documents live as long as the provider's `Cache-Control` allows and are refreshed in background before
+    they expire. Concurrent fetches of one document are merged into a single request, and an expired document
+    is still served while the provider is unavailable.
+    """
+
+    DEFAULT_TTL = oidc_settings.CACHE_DEFAULT_TTL_SECONDS
+    MIN_TTL = oidc_settings.CACHE_MIN_TTL_SECONDS
+    MAX_TTL = oidc_settings.CACHE_MAX_TTL_SECONDS
+    REFETCH_INTERVAL = oidc_settings.CACHE_REFETCH_INTERVAL_SECONDS
+    TIMEOUT = oidc_settings.FETCH_TIMEOUT_SECONDS
+
+    __slots__ = (
+        "_client",
+        "_documents",
+        "_inflight",
+        "_task",
+        "_transport",
+    )
+
+    def __init__(self, transport: AsyncBaseTransport | None = None) -> None:
+        """Initialize provider cache."""
+        self._client: AsyncClient | None = None
+        self._documents: dict[str, _Document] = {}
+        self._inflight: dict[str, Task[_Document]] = {}
+        self._task: Task[None] | None = None
+        self._transport = transport
+
+    @property
+    def client(self) -> AsyncClient:
+        """Get HTTP client, creating it on first use."""
+        if self._client is None:
+            self._client = AsyncClient(timeout=self.TIMEOUT, transport=self._transport)
+
+        return self._client
+
+    async def get_metadata(self, metadata_url: str) -> dict[str, Any]:
+        """Get provider metadata."""
+        return await self._get(metadata_url)
+
+    async def get_jwks(self, metadata_url: str, force: bool = False) -> dict[str, Any]:
+        """
+        Get provider JWKS.
+        With `force`, e.g. for a token signed by an unknown key, JWKS is refetched
+        unless it was fetched less than `REFETCH_INTERVAL` ago.
+        """
+        metadata = await self.get_metadata(metadata_url)
+        return await self._get(metadata["jwks_uri"], force)
+
+    async def start(self, metadata_urls: Iterable[str]) -> None:
+        """Warm up documents of given providers and keep them fresh in background."""
+        for result in await gather(*(self.get_jwks(url) for url in metadata_urls), return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning(f"OpenID provider warm-up failed: {result!r}")
+
+        if self._task is None:
+            self._task = create_task(self._refresh())
+
+    async def stop(self) -> None:
+        """Stop background refresh and close HTTP client."""
+        if self._task is not None:
+            self._task.cancel()
+
+            with suppress(CancelledError):
+                await self._task
+
+            self._task = None
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get(self, url: str, force: bool = False) -> dict[str, Any]:
+        document = self._documents.get(url)
+        now = monotonic()
+
+        if document is not None:
+            refetch = force and now - document.checked_at >= self.REFETCH_INTERVAL
+
+            if now < document.expires_at and not refetch:
+                return document.value
+
+        return (await self._fetch(url)).value
+
+    async def _fetch(self, url: str) -> _Document:
+        """Fetch a document, sharing the request with concurrent callers."""
+        if (task := self._inflight.get(url)) is None:
+            task = self._inflight[url] = create_task(self._load(url))
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+
+        # A cancelled caller must not cancel the request for others
+        return await shield(task)
+
+    async def _load(self, url: str) -> _Document:
+        """Load a document from the provider, falling back to the cached one on failure."""
+        try:
+            response = await self.client.get(url)
+            response.raise_for_status()
+            value = response.json()
+        except (HTTPError, ValueError) as exc:
+            OIDC_DOCUMENT_FETCHES.labels("error").inc()
+
+            if (stale := self._documents.get(url)) is None:
+                raise
+
+            # Retry after the minimal TTL rather than on every callback
+            OIDC_STALE_DOCUMENTS.inc()
+            logger.warning(f"Serving stale OpenID provider document {url}: {exc!r}")
+            stale.checked_at = monotonic()
+            stale.expires_at = stale.checked_at + self.MIN_TTL
+            return stale
+
+        OIDC_DOCUMENT_FETCHES.labels("ok").inc()
+        now = monotonic()
+
+        document = self._documents[url] = _Document(
+            value=value,
+            checked_at=now,
+            expires_at=now + self._ttl(response.headers.get("Cache-Control")),
+        )
+        return document
+
+    async def _refresh(self) -> None:
+        """Refresh documents in background before they expire."""
+        while True:
+            now = monotonic()
+            refresh_at = min((document.refresh_at for document in self._documents.values()), default=now + self.MIN_TTL)
+            await sleep(min(max(refresh_at - now, 1.0), self.MIN_TTL))
+
+            now = monotonic()
+            due = [url for url, document in self._documents.items() if document.refresh_at <= now]
+
+            for result in await gather(*(self._fetch(url) for url in due), return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.warning(f"OpenID provider document refresh failed: {result!r}")
+
+    def _ttl(self, cache_control: str | None) -> float:
+        """Get TTL of a document from `Cache-Control` header within configured bounds."""
+        if not cache_control:
+            return self.DEFAULT_TTL
+
+        if "no-store" in cache_control or "no-cache" in cache_control:
+            return self.MIN_TTL
+
+        if match := _MAX_AGE.search(cache_control):
+            return min(max(int(match.group(1)), self.MIN_TTL), self.MAX_TTL)
+
+        return self.DEFAULT_TTL
+
+
+provider_cache = ProviderCache()
+
+
+class CachedOAuth2App(StarletteOAuth2App):  # type: ignore[misc]
+    """Starlette OAuth2 client reading provider metadata and JWKS from the shared provider cache."""
+
+    async def load_server_metadata(self) -> dict[str, Any]:
+        if self._server_metadata_url:
+            self.server_metadata.update(await provider_cache.get_metadata(self._server_metadata_url))
+
+        return self.server_metadata  # type: ignore[no-any-return]
+
+    async def fetch_jwk_set(self, force: bool = False) -> dict[str, Any]:
+        if not self._server_metadata_url:
+            return await super().fetch_jwk_set(force)  # type: ignore[no-any-return]
+
+        return await provider_cache.get_jwks(self._server_metadata_url, force)
@@ -0,0 +1,193 @@
+from asyncio import CancelledError, Task, create_task, sleep
+from contextlib import suppress
+from hashlib import blake2b
+from logging import getLogger
+from math import ceil, log
+from time import monotonic
+from typing import Iterator
+
+from redis.exceptions import RedisError
+
+from core.clients.redis import redis
+from core.configs.jwt import jwt_settings
+from core.metrics import REVOCATION_FILTER_SYNCED
+
+__all__ = [
+    "BloomFilter",
+    "RevocationFilter",
+    "revocation_filter",
+]
+
+logger = getLogger("uvicorn.error")
+
+
+class BloomFilter:
+    """Probabilistic set of strings without false negatives."""
+
+    __slots__ = (
+        "_bits",
+        "_hashes",
+        "_size",
+    )
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        """Size the filter for expected capacity and false positive rate."""
+        self._size = max(8, ceil(-capacity * log(error_rate) / log(2) ** 2))
+        self._hashes = max(1, round(self._size / capacity * log(2)))
+        self._bits = bytearray(ceil(self._size / 8))
+
+    def add(self, item: str) -> None:
+        """Add an item to the filter."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def _positions(self, item: str) -> Iterator[int]:
+        """Get bit positions of an item with double hashing."""
+        digest = blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+        for idx in range(self._hashes):
+            yield (first + idx * second) % self._size
+
+
+class RevocationFilter:
+    """
+    Local tier in front of the Redis blacklist.
+    Revoked `jti` values, families and accounts are mirrored into an in-process Bloom filter, kept in sync
+    with other replicas through Redis pub/sub, so a token that was never revoked is answered without network I/O.
+    """
+
+    CAPACITY = jwt_settings.REVOCATION_FILTER_CAPACITY
+    ERROR_RATE = jwt_settings.REVOCATION_FILTER_ERROR_RATE
+    REBUILD_SECONDS = jwt_settings.REVOCATION_FILTER_REBUILD_SECONDS
+    RETRY_SECONDS = jwt_settings.REVOCATION_FILTER_RETRY_SECONDS
+
+    CACHE_SIZE = jwt_settings.REVOCATION_CACHE_SIZE
+    CACHE_TTL = jwt_settings.REVOCATION_CACHE_TTL_SECONDS
+
+    BLACKLIST_PREFIX = jwt_settings.BLACKLIST_PREFIX
+    CHANNEL = jwt_settings.REVOCATION_CHANNEL
+
+    __slots__ = (
+        "_bloom",
+        "_cache",
+        "_synced",
+        "_task",
+    )
+
+    def __init__(self) -> None:
+        """Initialize revocation filter."""
+        self._bloom = BloomFilter(self.CAPACITY, self.ERROR_RATE)
+        self._cache: dict[str, float] = {}
+        self._synced = False
+        self._task: Task[None] | None = None
+
+    @property
+    def synced(self) -> bool:
+        """Check if the filter mirrors the Redis blacklist."""
+        return self._synced
+
+    def lookup(self, jti: str) -> bool | None:
+        """
+        Check revocation locally.
+        Return `False` if the token is certainly not revoked, `True` if it is known to be revoked
+        and `None` if only Redis can tell.
+        """
+        if not self._synced:
+            return None
+
+        if jti not in self._bloom:
+            return False
+
+        if self._cache.get(jti, 0.0) > monotonic():
+            return True
+
+        return None
+
+    def add(self, name: str) -> None:
+        """Add a revocation to the filter only, for revocations which don't apply to every token looked up."""
+        self._bloom.add(name)
+
+    def remember(self, jti: str) -> None:
+        """Remember a revoked token in the filter and the positive cache."""
+        self._bloom.add(jti)
+
+        if len(self._cache) >= self.CACHE_SIZE:
+            self._evict()
+
+        self._cache[jti] = monotonic() + self.CACHE_TTL
+
+    async def start(self) -> None:
+        """Start syncing the filter with Redis in background."""
+        if self._task is None:
+            self._task = create_task(self._sync())
+
+    async def stop(self) -> None:
+        """Stop syncing the filter with Redis."""
+        if self._task is not None:
+            self._task.cancel()
+
+            with suppress(CancelledError):
+                await self._task
+
+            self._task = None
+
+        self._set_synced(False)
+
+    async def _sync(self) -> None:
+        """Keep the filter in sync, reconnecting after Redis failures."""
+        while True:
+            try:
+                await self._listen()
+            except (RedisError, OSError) as exc:
+                self._set_synced(False)
+                logger.warning(f"Revocation filter lost sync with Redis: {exc!r}")
+
+            await sleep(self.RETRY_SECONDS)
+
+    async def _listen(self) -> None:
+        """Load the blacklist and apply revocations published by other replicas."""
+        async with redis.pubsub() as pubsub:
+            # Subscribe before loading, so revocations made while loading are not lost.
+            await pubsub.subscribe(self.CHANNEL)
+            await self._rebuild()
+
+            rebuild_at = monotonic() + self.REBUILD_SECONDS
+
+            while True:
+                if message := await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0):
+                    self._bloom.add(message["data"])
+
+                # Bloom filters can't forget, so drop expired revocations by periodic rebuild.
+                if monotonic() >= rebuild_at:
+                    await self._rebuild()
+                    rebuild_at = monotonic() + self.REBUILD_SECONDS
+
+    async def _rebuild(self) -> None:
+        """Rebuild the filter from blacklisted keys in Redis."""
+        bloom = BloomFilter(self.CAPACITY, self.ERROR_RATE)
+        prefix_length = len(self.BLACKLIST_PREFIX) + 1
+
+        async for key in redis.scan_iter(match=f"{self.BLACKLIST_PREFIX}:*", count=1000):
+            bloom.add(key[prefix_length:])
+
+        self._bloom = bloom
+        self._set_synced(True)
+
+    def _evict(self) -> None:
+        """Drop expired entries of the positive cache, or the oldest one if none expired."""
+        now = monotonic()
+        self._cache = {jti: expires_at for jti, expires_at in self._cache.items() if expires_at > now}
+
+        if len(self._cache) >= self.CACHE_SIZE:
+            del self._cache[next(iter(self._cache))]
+
+    def _set_synced(self, value: bool) -> None:
+        self._synced = value
+        REVOCATION_FILTER_SYNCED.set(int(value))
+
+
+revocation_filter = RevocationFilter()
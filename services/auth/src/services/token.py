@@ -1,29 +1,55 @@
 from datetime import datetime, timedelta, timezone
 from functools import lru_cache
+from itertools import repeat
 from time import time
-from typing import Annotated
+from typing import Annotated, NoReturn, Sequence
 from uuid import uuid4
 
-from authlib.jose import JsonWebKey, JsonWebToken, JWTClaims
+from authlib.jose import JsonWebToken, JWTClaims
 from fastapi import Depends, Request
 
 from core.clients.redis import redis
 from core.configs.jwt import jwt_settings
 from core.exceptions import InvalidToken, TokenRequired, TokenRevoked
+from core.metrics import REVOCATION_CHECKS
 from enums import TokenTypeEnum
 from models import Account
-from schemas import JWKS, AccessToken, TokenPair
+from schemas import JWKS, AccessToken, AccountSnapshot, TokenPair
+from services.keys import KeyRegistry
+from services.revocation import revocation_filter
 
 __all__ = [
+    "get_key_registry",
+    "sign_tokens",
+    "RefreshDecoded",
     "RefreshRequire",
     "TokenFactory",
 ]
 
+# Blacklist a token unless it is revoked already, on its own, with its family or its account,
+# and announce it to other replicas, in one round-trip
+_BLACKLIST_SCRIPT = redis.register_script(
+    """
+    if redis.call("EXISTS", KEYS[2]) == 1 then
+        return 0
+    end
+    local revoked_before = redis.call("GET", KEYS[3])
+    if revoked_before and tonumber(ARGV[4]) < tonumber(revoked_before) then
+        return 0
+    end
+    if redis.call("SET", KEYS[1], 1, "NX", "EX", ARGV[1]) then
+        redis.call("PUBLISH", ARGV[2], ARGV[3])
+        return 1
+    end
+    return 0
+    """
+)
+
 
 class _TokenFactory:
     """Token factory for creating and validating tokens."""
 
-    JWT = JsonWebToken(jwt_settings.ALGORITHM)
+    JWT = JsonWebToken([jwt_settings.ALGORITHM, *KeyRegistry.CURVE_ALGORITHMS.values()])
     ISSUER = jwt_settings.ISSUER
 
     PRIVATE_KEYS = jwt_settings.PRIVATE_KEYS
@@ -36,6 +62,7 @@ class _TokenFactory:
 
     BLACKLIST_ENABLED = jwt_settings.BLACKLIST_ENABLED
     BLACKLIST_PREFIX = jwt_settings.BLACKLIST_PREFIX
+    REVOCATION_CHANNEL = jwt_settings.REVOCATION_CHANNEL
 
     __slots__ = (
         "_now",
@@ -64,49 +91,96 @@ class _TokenFactory:
 
     @classmethod
     @lru_cache(maxsize=1)
+    def get_keys(cls) -> KeyRegistry:
+        """Get registry of parsed signing and verification keys."""
+        return KeyRegistry(
+            algorithm=cls.ALGORITHM,
+            signing_kid=cls.signing_kid(),
+            private_key=cls.PRIVATE_KEYS[cls.SIGNING_KID],
+            public_keys={cls.signing_kid(idx): public_key for idx, public_key in enumerate(cls.PUBLIC_KEYS)},
+        )
+
+    @classmethod
     def get_jwks(cls) -> JWKS:
         """Get JSON web key set."""
-        options = {"alg": cls.ALGORITHM, "use": "sig"}
+        return cls.get_keys().jwks
+
+    @classmethod
+    def reload_keys(cls) -> None:
+        """Drop parsed keys, so rotated key material is loaded on the next use."""
+        cls.get_keys.cache_clear()
+
+    @classmethod
+    def sign_tokens(
+        cls,
+        subjects: Sequence[str],
+        token_type: TokenTypeEnum,
+        now: datetime,
+        families: Sequence[str | None] | None = None,
+    ) -> list[str]:
+        """
+        Sign tokens of one type for many subjects with one timestamp and one parsed signing key.
+        Refresh tokens carry a family id, shared by all tokens rotated from the same login; a new family is started
+        for every subject without one.
+        """
+        keys = cls.get_keys()
+
+        issued_at = int(now.timestamp())
+        issued_at_ms = int(now.timestamp() * 1000)
+        expires_at = int((now + getattr(cls, f"{token_type.name}_EXPIRES")).timestamp())
+
+        tokens = []
+
+        for subject, family in zip(subjects, families or repeat(None)):
+            claims = {
+                "exp": expires_at,
+                "iat": issued_at,
+                "iat_ms": issued_at_ms,
+                "iss": cls.ISSUER,
+                "jti": str(uuid4()),
+                "nbf": issued_at,
+                "sub": subject,
+                "type": token_type,
+            }
 
-        keys = [
-            JsonWebKey.import_key(public_key, options).tokens  # type: ignore[arg-type]
-            for idx, public_key in enumerate(cls.PUBLIC_KEYS)
-            if options.update({"kid": cls.signing_kid(idx)}) is None
-        ]
-        return JWKS(keys=keys)
+            if token_type is TokenTypeEnum.REFRESH:
+                claims["fid"] = family or str(uuid4())
 
-    def create_token(self, subject: str, token_type: TokenTypeEnum) -> str:
+            tokens.append(keys.sign(claims))
+
+        return tokens
+
+    @classmethod
+    async def revoke_family(cls, family: str) -> None:
+        """Revoke all refresh tokens of a family, e.g. when one of them is reused after rotation."""
+        await cls._revoke(f"family:{family}", 1)
+
+    @classmethod
+    async def revoke_account(cls, subject: str) -> None:
+        """Revoke all refresh tokens of an account issued until now with a single write, to the millisecond."""
+        await cls._revoke(f"account:{subject}", int(time() * 1000))
+
+    @classmethod
+    async def _revoke(cls, name: str, value: int) -> None:
+        """Store a revocation for as long as refresh tokens live, and announce it to other replicas."""
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(f"{cls.BLACKLIST_PREFIX}:{name}", value, ex=int(cls.REFRESH_EXPIRES.total_seconds()))
+            pipe.publish(cls.REVOCATION_CHANNEL, name)
+            await pipe.execute()
+
+        revocation_filter.add(name)
+
+    def create_token(self, subject: str, token_type: TokenTypeEnum, family: str | None = None) -> str:
         """Create a token from a subject and token type."""
-        expires_delta = getattr(self, f"{token_type.name}_EXPIRES")
-
-        header = {
-            "alg": self.ALGORITHM,
-            "kid": self.signing_kid(),
-            "typ": "JWT",
-        }
-        payload = {
-            "exp": self._now + expires_delta,
-            "iat": self._now,
-            "iss": self.ISSUER,
-            "jti": str(uuid4()),
-            "nbf": self._now,
-            "sub": subject,
-            "type": token_type,
-        }
-        token: str = self.JWT.encode(
-            header=header,
-            payload=payload,
-            key=self.PRIVATE_KEYS[self.SIGNING_KID],
-        )
-        return token
+        return self.sign_tokens([subject], token_type, self._now, [family])[0]
 
     def access_token(self, subject: str) -> str:
         """Create an access token from a subject."""
         return self.create_token(subject, TokenTypeEnum.ACCESS)
 
-    def refresh_token(self, subject: str) -> str:
-        """Create a refresh token from a subject."""
-        return self.create_token(subject, TokenTypeEnum.REFRESH)
+    def refresh_token(self, subject: str, family: str | None = None) -> str:
+        """Create a refresh token from a subject, continuing a token family if given."""
+        return self.create_token(subject, TokenTypeEnum.REFRESH, family)
 
     async def create_access_token_from_refresh(self) -> AccessToken | TokenPair:
         """
@@ -114,35 +188,54 @@ class _TokenFactory:
         If the refresh token closes to be expired, create a new pair.
         """
         if not self.payload:
-            await self.token_required(TokenTypeEnum.REFRESH)
+            await self.token_required(TokenTypeEnum.REFRESH, check_revoked=False)
 
         subject, exp = self.payload["sub"], self.payload["exp"]
         signin_changed = self.payload.header["kid"] != self.signing_kid()
 
         if timedelta(seconds=int(exp) - int(time())) < timedelta(days=3) or signin_changed:
-            await self.blacklist_token()
-            return self.create_pair(subject)
+            return await self.rotate_refresh_token()
+
+        if await self.is_token_revoked():
+            await self._reject_reused()
 
         return AccessToken(access_token=self.access_token(subject))
 
-    def create_pair(self, account: Account | str) -> TokenPair:
-        """Create a token pair from a client account."""
-        subject = str(account.id) if isinstance(account, Account) else account
+    async def rotate_refresh_token(self) -> TokenPair:
+        """
+        Revoke refresh token and create a new pair.
+        The check and the revocation are atomic, so of concurrent rotations with one token only the first succeeds.
+        """
+        if not await self.blacklist_token():
+            await self._reject_reused()
+
+        return self.create_pair(self.payload["sub"], family=self.payload.get("fid"))
+
+    def create_pair(self, account: Account | AccountSnapshot | str, family: str | None = None) -> TokenPair:
+        """Create a token pair from a client account, continuing a token family if given."""
+        subject = str(account.id) if isinstance(account, (Account, AccountSnapshot)) else account
 
         return TokenPair(
             access_token=self.access_token(subject),
-            refresh_token=self.refresh_token(subject),
+            refresh_token=self.refresh_token(subject, family),
         )
 
-    async def blacklist_token(self) -> None:
-        """Blacklist refresh token."""
+    async def blacklist_token(self) -> bool:
+        """Blacklist refresh token, return `False` if it was revoked already."""
         if not self.payload:
             await self.token_required(TokenTypeEnum.REFRESH)
 
         jti = self.payload["jti"]
-        ttl = int(self.payload["exp"]) - int(time())
+        ttl = max(int(self.payload["exp"]) - int(time()), 1)
 
-        await redis.setex(f"{self.BLACKLIST_PREFIX}:{jti}", ttl, 1)
+        blacklisted = await _BLACKLIST_SCRIPT(
+            keys=[f"{self.BLACKLIST_PREFIX}:{name}" for name in self._revocation_names()],
+            args=[ttl, self.REVOCATION_CHANNEL, jti, self._issued_at_ms()],
+            client=redis,
+        )
+        revocation_filter.remember(jti)
+
+        return bool(blacklisted)
 
     def get_token_from_header(self) -> str | None:
         """Get token from header."""
@@ -166,15 +259,14 @@ class _TokenFactory:
     def decode_token(self, token: str) -> JWTClaims:
         """Decode the token and check if it is valid."""
         try:
-            key = self.jwks.model_dump()["keys"]
-            claims = self.JWT.decode(token, key)
+            claims = self.JWT.decode(token, self.get_keys().find_verification_key)
         except ValueError as exc:
             raise InvalidToken(exc.args[0])
 
         claims.validate()
         return claims
 
-    async def token_required(self, token_type: TokenTypeEnum) -> None:
+    async def token_required(self, token_type: TokenTypeEnum, check_revoked: bool = True) -> None:
         """Check if the token is valid."""
         if not (token := self.get_token(token_type)):
             raise TokenRequired(token_type)
@@ -184,18 +276,64 @@ class _TokenFactory:
         if self.payload.get("type") != token_type:
             raise TokenRequired(token_type)
 
-        if token_type is TokenTypeEnum.REFRESH and await self.is_token_revoked():
+        if token_type is TokenTypeEnum.REFRESH and check_revoked and await self.is_token_revoked():
             raise TokenRevoked()
 
     async def is_token_revoked(self) -> bool:
-        """Check if the token is revoked."""
+        """Check if the token is revoked, on its own, with its family or with all tokens of its account."""
         if not self.BLACKLIST_ENABLED:
             return False
 
-        jti = self.payload["jti"]
-        key = f"{self.BLACKLIST_PREFIX}:{jti}"
+        names = self._revocation_names()
+        lookups = [revocation_filter.lookup(name) for name in names]
 
-        return bool(await redis.exists(key))
+        if any(lookups) or None not in lookups:
+            REVOCATION_CHECKS.labels("local").inc()
+            return any(lookups)
+
+        REVOCATION_CHECKS.labels("redis").inc()
+
+        jti, family, account = await redis.mget(*(f"{self.BLACKLIST_PREFIX}:{name}" for name in names))
+
+        for name, value in ((names[0], jti), (names[1], family)):
+            if value is not None:
+                revocation_filter.remember(name)
+
+        # Tokens issued after the account was revoked stay valid, so that revocation is not cached
+        revoked_before = int(account) if account is not None else -1
+        return jti is not None or family is not None or self._issued_at_ms() < revoked_before
+
+    def _issued_at_ms(self) -> int:
+        """Get issuance time of the token in milliseconds, to the second for tokens issued before the claim."""
+        return int(self.payload.get("iat_ms", int(self.payload["iat"]) * 1000))
+
+    def _revocation_names(self) -> tuple[str, str, str]:
+        """Get names the token is revoked under: its own id, its family and its account."""
+        return (
+            self.payload["jti"],
+            f"family:{self.payload.get('fid', '')}",
+            f"account:{self.payload['sub']}",
+        )
+
+    async def _reject_reused(self) -> NoReturn:
+        """
+        Reject a revoked refresh token.
+        Reuse of a rotated token means that it leaked, so all tokens rotated from the same login are revoked as well.
+        """
+        if family := self.payload.get("fid"):
+            await self.revoke_family(family)
+
+        raise TokenRevoked()
+
+
+def get_key_registry() -> KeyRegistry:
+    """Get registry of parsed keys shared by all token factories."""
+    return _TokenFactory.get_keys()
+
+
+def sign_tokens(subjects: Sequence[str], token_type: TokenTypeEnum, now: datetime) -> list[str]:
+    """Sign tokens of one type for many subjects with one timestamp, starting a new family for refresh tokens."""
+    return _TokenFactory.sign_tokens(subjects, token_type, now)
 
 
 async def _require_refresh(factory: "TokenFactory") -> "TokenFactory":
@@ -204,5 +342,12 @@ async def _require_refresh(factory: "TokenFactory") -> "TokenFactory":
     return factory
 
 
+async def _decode_refresh(factory: "TokenFactory") -> "TokenFactory":
+    """Check if the token is valid, leaving revocation to the caller."""
+    await factory.token_required(TokenTypeEnum.REFRESH, check_revoked=False)
+    return factory
+
+
 TokenFactory = Annotated[_TokenFactory, Depends(_TokenFactory)]
 RefreshRequire = Annotated[TokenFactory, Depends(_require_refresh)]
+RefreshDecoded = Annotated[TokenFactory, Depends(_decode_refresh)]
@@ -0,0 +1,66 @@
+import pytest
+from fastapi import FastAPI, status
+from httpx import ASGITransport, AsyncClient
+from pytest_mock import MockerFixture
+
+from api.routes import auth, token
+from core.configs.base import settings
+from services.token import _TokenFactory  # noqa
+
+BATCH = {"subjects": ["user-1"], "pairs": False}
+REVOKE_URL = "/internal/accounts/00000000-0000-0000-0000-000000000001/revoke"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestServiceAuth:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(settings, "INTERNAL_API_TOKEN", "service-token")
+        mocker.patch("api.routes.token.issue_access_tokens", return_value=[])
+        self.revoke_account = mocker.patch.object(_TokenFactory, "revoke_account")
+
+        app = FastAPI()
+        app.include_router(auth.router)
+        app.include_router(token.router)
+        self.client = AsyncClient(transport=ASGITransport(app=app), base_url="http://auth")
+
+    @pytest.mark.parametrize(
+        "headers, expected",
+        [
+            ({}, status.HTTP_401_UNAUTHORIZED),
+            ({"Authorization": "Bearer other-token"}, status.HTTP_401_UNAUTHORIZED),
+            ({"Authorization": "Basic service-token"}, status.HTTP_401_UNAUTHORIZED),
+            ({"Authorization": "Bearer service-token"}, status.HTTP_200_OK),
+        ],
+    )
+    async def test_token_batch(self, headers: dict[str, str], expected: int) -> None:
+        response = await self.client.post("/internal/token/batch", json=BATCH, headers=headers)
+
+        assert response.status_code == expected
+
+    @pytest.mark.parametrize(
+        "headers, expected",
+        [
+            ({}, status.HTTP_401_UNAUTHORIZED),
+            ({"Authorization": "Bearer other-token"}, status.HTTP_401_UNAUTHORIZED),
+            ({"Authorization": "Bearer service-token"}, status.HTTP_200_OK),
+        ],
+    )
+    async def test_account_revocation(self, headers: dict[str, str], expected: int) -> None:
+        response = await self.client.post(REVOKE_URL, headers=headers)
+
+        assert response.status_code == expected
+        assert self.revoke_account.called is (expected == status.HTTP_200_OK)
+
+    async def test_disabled_without_token(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(settings, "INTERNAL_API_TOKEN", None)
+
+        headers = {"Authorization": "Bearer "}
+        responses = [
+            await self.client.post("/internal/token/batch", json=BATCH, headers=headers),
+            await self.client.post(REVOKE_URL, headers=headers),
+        ]
+
+        assert [response.status_code for response in responses] == [status.HTTP_404_NOT_FOUND] * 2
+        assert not self.revoke_account.called
@@ -0,0 +1,139 @@
+"""Benchmarks of rate limit checks in `services/limits.py`."""
+
+from asyncio import run as run_async
+from asyncio import sleep
+from time import time
+from typing import Any, Callable, Coroutine
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from api.limits import LimitLogin
+from api.routes import auth
+from services import limits
+from services.limits import GCRARateLimiter, HybridRateLimiter, rate_limiter
+from tests.benchmarks.common import Benchmark, run
+from tests.fakes import FakePipeline, FakeRedis
+
+__all__ = [
+    "run_suite",
+]
+
+CLIENT = "127.0.0.1"
+CREDENTIALS = {"email": "user@example.com", "password": "password"}
+
+
+class _RemoteRedis(FakeRedis):
+    """`FakeRedis` paying a network round-trip per command, or once per pipeline."""
+
+    def __init__(self, round_trip: float) -> None:
+        super().__init__()
+        self.round_trip = round_trip
+
+    async def incrby(self, key: str, amount: int = 1) -> int:
+        await sleep(self.round_trip)
+        return await super().incrby(key, amount)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        await sleep(self.round_trip)
+        return await super().expire(key, seconds)
+
+    async def evalsha(self, sha: str, numkeys: int, *args: Any) -> Any:
+        await sleep(self.round_trip)
+        return await super().evalsha(sha, numkeys, *args)
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        local = FakeRedis()
+        local._data = self._data
+        return _RemotePipeline(local, self.round_trip)
+
+
+class _RemotePipeline(FakePipeline):
+    def __init__(self, redis: FakeRedis, round_trip: float) -> None:
+        super().__init__(redis)
+        self._round_trip = round_trip
+
+    async def execute(self) -> list[Any]:
+        await sleep(self._round_trip)
+        return await super().execute()
+
+
+def _login_rejected(name: str, app: FastAPI, exhaust: Callable[[], Coroutine[Any, Any, None]]) -> Benchmark:
+    """Build login attempts rejected by an exhausted limit, so credentials are never checked."""
+    client = AsyncClient(transport=ASGITransport(app=app, client=(CLIENT, 1234)), base_url="http://auth")
+
+    async def login() -> None:
+        response = await client.post("/login", json=CREDENTIALS)
+        assert response.status_code == 429, response.text
+
+    run_async(exhaust())
+    return Benchmark(name, login, number=100)
+
+
+def _login_benchmarks(label: str) -> list[Benchmark]:
+    """Build login benchmarks, the same route limited by the local buckets or by one Redis script call."""
+    gcra_app, hybrid_app = FastAPI(), FastAPI()
+    gcra_app.include_router(auth.router)
+    hybrid_app.include_router(auth.router)
+    hybrid_app.dependency_overrides[LimitLogin.dependency] = rate_limiter(5, "minute")
+
+    async def exhaust_hybrid() -> None:
+        for _ in range(5):
+            limits.hybrid_limiter.hit(f"POST:/login:{CLIENT}", 5, 60)
+
+    async def exhaust_gcra() -> None:
+        for _ in range(5):
+            await limits.gcra_limiter.check([f"/login:ip:{CLIENT}", f"/login:email:{CREDENTIALS['email']}"], 5, 60)
+
+    return [
+        _login_rejected(f"login_rejected[hybrid,{label}]", hybrid_app, exhaust_hybrid),
+        _login_rejected(f"login_rejected[gcra,{label}]", gcra_app, exhaust_gcra),
+    ]
+
+
+def _benchmarks(redis: _RemoteRedis, label: str) -> list[Benchmark]:
+    hybrid, gcra = HybridRateLimiter(), GCRARateLimiter()
+
+    async def fixed_window() -> None:
+        # Counter of the current window, incremented and checked by every request
+        name = f"POST:/login:{CLIENT}:{int(time() // 60)}"
+        await redis.incrby(name)
+        await redis.expire(name, 60)
+
+    async def hybrid_sync() -> None:
+        hybrid.hit(f"POST:/login:{CLIENT}", 10**9, 60)
+        await hybrid.sync()
+
+    async def gcra_check() -> None:
+        await gcra.check([f"/login:ip:{CLIENT}", f"/login:email:{CREDENTIALS['email']}"], 10**9, 60)
+
+    return [
+        Benchmark(f"rate_limit_hybrid_sync[{label}]", hybrid_sync),
+        Benchmark(f"rate_limit_fixed_window[{label}]", fixed_window),
+        Benchmark(f"rate_limit_gcra[{label}]", gcra_check),
+    ]
+
+
+def run_suite(repeat: int, round_trips: list[float] | None = None) -> dict[str, float]:
+    """
+    Run rate limit benchmarks against in-memory Redis, with and without a simulated network round-trip,
+    which is what a check waiting for Redis mostly pays for.
+    """
+    hybrid = HybridRateLimiter()
+    results = run([Benchmark("rate_limit_hybrid_hit", lambda: hybrid.hit(CLIENT, 10**9, 60), number=2000)], repeat)
+
+    for round_trip in round_trips or [0.0, 0.001]:
+        redis, label = _RemoteRedis(round_trip), f"rtt={round_trip * 1000:g}ms"
+
+        with (
+            patch("services.limits.redis", redis),
+            patch("services.limits.hybrid_limiter", HybridRateLimiter()),
+            patch("services.limits.gcra_limiter", GCRARateLimiter()),
+            patch.object(GCRARateLimiter, "LATENCY_BUDGET", 1.0),
+            patch.object(HybridRateLimiter, "LATENCY_BUDGET", 1.0),
+        ):
+            # Login limits are exhausted when benchmarks are built, and runs end long before a token is refilled
+            results |= run(_benchmarks(redis, label) + _login_benchmarks(label), repeat)
+
+    return results
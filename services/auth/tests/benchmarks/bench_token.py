@@ -0,0 +1,120 @@
+"""Benchmarks of token issuance and validation in `services/token.py`."""
+
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+from unittest.mock import patch
+
+from cryptography.hazmat.primitives.asymmetric.ec import SECP256R1
+from cryptography.hazmat.primitives.asymmetric.ec import generate_private_key as generate_ec_private_key
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+
+from api.limits import LimitTokenRefresh
+from api.routes import token
+from enums import TokenTypeEnum
+from services.revocation import revocation_filter
+from services.token import _TokenFactory  # noqa
+from tests.benchmarks.common import Benchmark, run
+from tests.fakes import FakeRedis
+from tests.helpers import serialize_key_pair
+
+__all__ = [
+    "KEY_TYPES",
+    "run_suite",
+]
+
+KEY_TYPES: dict[str, Callable[[], Any]] = {
+    "rsa2048": lambda: generate_private_key(public_exponent=65537, key_size=2048),
+    "rsa4096": lambda: generate_private_key(public_exponent=65537, key_size=4096),
+    "es256": lambda: generate_ec_private_key(SECP256R1()),
+    "eddsa": Ed25519PrivateKey.generate,
+}
+
+
+@contextmanager
+def _signing_key(key_type: str) -> Iterator[None]:
+    """Use a freshly generated key of a given type for signing and verification."""
+    private_pem, public_pem = serialize_key_pair(KEY_TYPES[key_type]())
+
+    with (
+        patch.object(_TokenFactory, "PRIVATE_KEYS", [private_pem]),
+        patch.object(_TokenFactory, "PUBLIC_KEYS", [public_pem]),
+        patch.object(_TokenFactory, "SIGNING_KID", 0),
+    ):
+        _TokenFactory.reload_keys()
+        yield
+
+    _TokenFactory.reload_keys()
+
+
+def _request(headers: dict[str, str] | None = None) -> Request:
+    """Build a bare request with given headers."""
+    raw_headers = [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw_headers, "query_string": b""})
+
+
+def _app() -> FastAPI:
+    """Build an application with token routes only and no rate limiting."""
+    app = FastAPI()
+    app.include_router(token.router)
+    app.dependency_overrides[LimitTokenRefresh.dependency] = lambda: None  # type: ignore[attr-defined]
+    return app
+
+
+def _benchmarks(key_type: str) -> list[Benchmark]:
+    factory = _TokenFactory(request=_request())
+    access_token = factory.create_token("subject", TokenTypeEnum.ACCESS)
+    refresh_token = factory.create_token("subject", TokenTypeEnum.REFRESH)
+
+    refresh_headers = {"Authorization": f"Bearer {refresh_token}"}
+    client = AsyncClient(transport=ASGITransport(app=_app()), base_url="http://auth")
+
+    async def token_required() -> None:
+        await _TokenFactory(request=_request(refresh_headers)).token_required(TokenTypeEnum.REFRESH)
+
+    async def get_jwks() -> None:
+        await token.get_jwks(_request())
+
+    async def refresh_round_trip() -> None:
+        response = await client.post("/token/refresh", headers=refresh_headers)
+        response.raise_for_status()
+
+    return [
+        Benchmark(f"create_token[{key_type}]", lambda: factory.create_token("subject", TokenTypeEnum.ACCESS)),
+        Benchmark(f"create_pair[{key_type}]", lambda: factory.create_pair("subject")),
+        Benchmark(f"decode_token[{key_type}]", lambda: factory.decode_token(access_token)),
+        Benchmark(f"token_required[{key_type}]", token_required),
+        Benchmark(f"get_jwks[{key_type}]", get_jwks, number=2000),
+        Benchmark(f"refresh_round_trip[{key_type}]", refresh_round_trip, number=100),
+    ]
+
+
+def run_suite(repeat: int, key_types: list[str] | None = None) -> dict[str, float]:
+    """Run token benchmarks for each key type against in-memory Redis."""
+    results: dict[str, float] = {}
+
+    with (
+        patch("services.token.redis", FakeRedis()),
+        patch("services.revocation.redis", FakeRedis()),
+    ):
+        for key_type in key_types or list(KEY_TYPES):
+            with _signing_key(key_type):
+                results |= run(_benchmarks(key_type), repeat)
+
+    # The same checks answered by the local revocation filter instead of Redis
+    with patch("services.revocation.redis", FakeRedis()), _signing_key("es256"):
+        revocation_filter._set_synced(True)
+        factory = _TokenFactory(request=_request())
+        refresh_headers = {"Authorization": f"Bearer {factory.create_token('subject', TokenTypeEnum.REFRESH)}"}
+
+        async def token_required_local() -> None:
+            await _TokenFactory(request=_request(refresh_headers)).token_required(TokenTypeEnum.REFRESH)
+
+        try:
+            results |= run([Benchmark("token_required_local_filter[es256]", token_required_local)], repeat)
+        finally:
+            revocation_filter._set_synced(False)
+
+    return results
@@ -0,0 +1,96 @@
+"""Timing harness shared by benchmark suites."""
+
+from asyncio import iscoroutinefunction, new_event_loop
+from dataclasses import dataclass
+from json import dumps, loads
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+
+__all__ = [
+    "Benchmark",
+    "compare",
+    "load_baseline",
+    "run",
+    "save_baseline",
+]
+
+BenchmarkFunc = Callable[[], Any] | Callable[[], Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    func: BenchmarkFunc
+    number: int = 200
+
+
+def _measure(benchmark: Benchmark, repeat: int) -> float:
+    """Get median time of one call in seconds over `repeat` rounds of `number` calls."""
+    func, number = benchmark.func, benchmark.number
+
+    if iscoroutinefunction(func):
+        loop = new_event_loop()
+
+        async def _round() -> float:
+            started = perf_counter()
+            for _ in range(number):
+                await func()
+            return perf_counter() - started
+
+        try:
+            loop.run_until_complete(_round())  # warm up
+            timings = [loop.run_until_complete(_round()) for _ in range(repeat)]
+        finally:
+            loop.close()
+    else:
+
+        def _round() -> float:
+            started = perf_counter()
+            for _ in range(number):
+                func()
+            return perf_counter() - started
+
+        _round()  # warm up
+        timings = [_round() for _ in range(repeat)]
+
+    return median(timings) / number
+
+
+def run(benchmarks: list[Benchmark], repeat: int = 5) -> dict[str, float]:
+    """Run benchmarks and print time per call."""
+    results = {}
+
+    for benchmark in benchmarks:
+        results[benchmark.name] = seconds = _measure(benchmark, repeat)
+        print(f"{benchmark.name:<48} {seconds * 1e6:>12.1f} µs/op")
+
+    return results
+
+
+def load_baseline(path: Path) -> dict[str, float]:
+    """Load stored baseline results."""
+    return loads(path.read_text()) if path.exists() else {}
+
+
+def save_baseline(path: Path, results: dict[str, float]) -> None:
+    """Store results as the new baseline, keeping baseline of benchmarks that were not run."""
+    path.write_text(dumps({**load_baseline(path), **results}, indent=2, sort_keys=True) + "\n")
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    """Get names of benchmarks that are slower than baseline by more than `threshold`."""
+    regressions = []
+
+    for name, seconds in results.items():
+        if (expected := baseline.get(name)) is None:
+            continue
+
+        change = seconds / expected - 1
+        print(f"{name:<48} {change:>+12.1%}")
+
+        if change > threshold:
+            regressions.append(name)
+
+    return regressions
@@ -0,0 +1,62 @@
+"""
+Runs benchmark suites and compares results with the stored baseline.
+
+    python -m tests.benchmarks.run                  # run all suites and check regressions
+    python -m tests.benchmarks.run --save           # run all suites and store results as baseline
+    python -m tests.benchmarks.run token --threshold 0.1
+    python -m tests.benchmarks.run limits
+"""
+
+from argparse import ArgumentParser, RawTextHelpFormatter
+from pathlib import Path
+from typing import Callable
+
+from tests.benchmarks import bench_limits, bench_token
+from tests.benchmarks.common import compare, load_baseline, save_baseline
+
+SUITES: dict[str, Callable[[int], dict[str, float]]] = {
+    "limits": bench_limits.run_suite,
+    "token": bench_token.run_suite,
+}
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__, formatter_class=RawTextHelpFormatter)
+
+    parser.add_argument("suites", nargs="*", help=f"Suites to run: {', '.join(SUITES)}. All by default.")
+    parser.add_argument("--repeat", type=int, default=5, help="Rounds per benchmark, median is reported.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown against the baseline.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="Baseline file.")
+    parser.add_argument("--save", action="store_true", help="Store results as the new baseline.")
+
+    args = parser.parse_args()
+
+    if unknown := set(args.suites) - set(SUITES):
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+
+    results: dict[str, float] = {}
+
+    for name in args.suites or SUITES:
+        print(f"\n--- {name} ---")
+        results |= SUITES[name](args.repeat)
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline saved to {args.baseline}")
+        exit(0)
+
+    if not (baseline := load_baseline(args.baseline)):
+        print(f"\nNo baseline found at {args.baseline}, run with --save to create one.")
+        exit(0)
+
+    print("\n--- change against baseline ---")
+
+    if regressions := compare(results, baseline, args.threshold):
+        print(f"\nRegressions over {args.threshold:.0%}: {', '.join(regressions)}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
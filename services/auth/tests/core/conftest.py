@@ -0,0 +1,6 @@
+from warnings import catch_warnings, simplefilter
+
+with catch_warnings():
+    # passlib still imports the `crypt` module deprecated since Python 3.11
+    simplefilter("ignore", DeprecationWarning)
+    import passlib.context  # noqa: F401
@@ -0,0 +1,38 @@
+from asyncio import IncompleteReadError, StreamReader, StreamWriter, start_server
+from contextlib import suppress
+
+import pytest
+from httpx import AsyncClient
+
+from core.clients.http import PooledTransport
+from core.metrics import HTTP_CONNECTIONS_OPENED
+
+
+async def _handle(reader: StreamReader, writer: StreamWriter) -> None:
+    """Answer keep-alive HTTP/1.1 requests until the client disconnects."""
+    with suppress(IncompleteReadError):
+        while await reader.readuntil(b"\r\n\r\n"):
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+
+    writer.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestPooledTransport:
+    async def test_connections_outlive_clients(self) -> None:
+        transport = PooledTransport("test")
+        opened = HTTP_CONNECTIONS_OPENED.labels("test")._value.get()
+
+        async with await start_server(_handle, "127.0.0.1", 0) as server:
+            host, port = server.sockets[0].getsockname()[:2]
+
+            for _ in range(3):
+                async with AsyncClient(transport=transport) as client:
+                    response = await client.get(f"http://{host}:{port}")
+                    assert response.text == "ok"
+
+            await transport.close_pool()
+
+        assert HTTP_CONNECTIONS_OPENED.labels("test")._value.get() - opened == 1
@@ -0,0 +1,60 @@
+from asyncio import timeout
+from socket import socket
+
+import pytest
+from pytest_mock import MockerFixture
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from core.clients.redis import InstrumentedRedis, InstrumentedSentinelConnectionPool, _create_client  # noqa
+from core.metrics import REDIS_COMMAND_ERRORS
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestRedisClient:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        self.settings = mocker.patch("core.clients.redis.redis_settings")
+        self.settings.configure_mock(
+            MODE="standalone",
+            DB=0,
+            USERNAME=None,
+            PASSWORD=None,
+            SSL=False,
+            MAX_CONNECTIONS=2,
+            POOL_TIMEOUT_SECONDS=1,
+            CONNECT_TIMEOUT_SECONDS=0.1,
+            SOCKET_TIMEOUT_SECONDS=0.1,
+            HEALTH_CHECK_INTERVAL_SECONDS=30,
+            RETRIES=2,
+            RETRY_BACKOFF_BASE_SECONDS=0.01,
+            RETRY_BACKOFF_CAP_SECONDS=0.05,
+        )
+
+    async def test_slow_redis_fails_fast(self) -> None:
+        errors = REDIS_COMMAND_ERRORS.labels("GET")._value.get()
+
+        # Connections complete in the listen backlog and are never answered, like by an overloaded Redis
+        with socket() as server:
+            server.bind(("127.0.0.1", 0))
+            server.listen()
+            self.settings.HOST, self.settings.PORT = server.getsockname()
+
+            client = _create_client()
+
+            async with timeout(1):
+                with pytest.raises(RedisTimeoutError):
+                    await client.get("key")
+
+            await client.aclose()
+
+        assert REDIS_COMMAND_ERRORS.labels("GET")._value.get() - errors == 1
+
+    async def test_sentinel_master(self) -> None:
+        self.settings.configure_mock(MODE="sentinel", SENTINELS=["sentinel-0:26379"], SENTINEL_SERVICE="auth")
+
+        client = _create_client()
+
+        assert isinstance(client, InstrumentedRedis)
+        assert isinstance(client.connection_pool, InstrumentedSentinelConnectionPool)
+        assert client.connection_pool.service_name == "auth"
@@ -0,0 +1,57 @@
+from asyncio import Event, gather
+from typing import Any
+
+import pytest
+from pytest_mock import MockerFixture
+
+from core.exceptions import HashingOverloaded
+from core.security import UNUSABLE_PASSWORD_HASH, _PasswordHasher, hash_password, pwd_context, verify_password  # noqa
+
+
+@pytest.mark.unit
+class TestPasswordHasher:
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify_password(self) -> None:
+        password_hash = await hash_password("password")
+
+        assert password_hash != "password"
+        assert await verify_password("password", password_hash)
+        assert not await verify_password("wrong-password", password_hash)
+
+    @pytest.mark.asyncio
+    async def test_unusable_hash_costs_as_much_as_real_ones(self) -> None:
+        password_hash = await hash_password("password")
+
+        assert UNUSABLE_PASSWORD_HASH.split("$")[2] == password_hash.split("$")[2]
+        assert not pwd_context.needs_update(UNUSABLE_PASSWORD_HASH)
+
+    @pytest.mark.asyncio
+    async def test_run_sheds_load_when_queue_is_full(self, mocker: MockerFixture) -> None:
+        mocker.patch("core.security.hashing_settings.MAX_QUEUE_DEPTH", 1)
+        hasher = _PasswordHasher()
+
+        started, release = Event(), Event()
+
+        async def blocking_job() -> Any:
+            started.set()
+            await release.wait()
+            return "done", 0.0
+
+        mocker.patch("core.security.get_running_loop").return_value.run_in_executor.side_effect = (
+            lambda *_: blocking_job()
+        )
+
+        async def second_job() -> None:
+            await started.wait()
+
+            with pytest.raises(HashingOverloaded) as exc_info:
+                await hasher.run("hash", str, "password")
+
+            assert exc_info.value.status_code == 503
+            release.set()
+
+        result, _ = await gather(hasher.run("hash", str, "password"), second_job())
+
+        assert result == "done"
+        hasher.shutdown()
@@ -0,0 +1,39 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from pytest_mock import MockerFixture
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from core.health.warmup import warm_up
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestWarmUp:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        mocker.patch("core.health.warmup.warmup_settings.RETRY_INTERVAL_SECONDS", 0.01)
+        mocker.patch("core.health.warmup.warmup_settings.TIMEOUT_SECONDS", 0.1)
+
+        self.postgres = mocker.patch("core.health.warmup._warm_up_postgres", AsyncMock())
+        self.redis = mocker.patch("core.health.warmup._warm_up_redis", AsyncMock())
+        self.checks = [
+            mocker.patch("core.health.warmup.check_postgres", AsyncMock()),
+            mocker.patch("core.health.warmup.check_redis", AsyncMock()),
+        ]
+
+    async def test_retries_until_dependencies_are_available(self) -> None:
+        self.redis.side_effect = [RedisConnectionError("unavailable"), None]
+
+        await warm_up()
+
+        assert self.postgres.await_count == 2
+        assert self.redis.await_count == 2
+        assert all(check.await_count == 1 for check in self.checks)
+
+    async def test_fails_after_timeout(self) -> None:
+        self.checks[1].side_effect = RedisConnectionError("unavailable")
+
+        # Either the last failure, or the timeout if the last retry started too close to it
+        with pytest.raises((RedisConnectionError, TimeoutError)):
+            await warm_up()
@@ -0,0 +1,64 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from db.replicas import ReplicaRouter
+from db.session import RoutingSession, async_engine
+
+
+def _engine(name: str) -> MagicMock:
+    engine = MagicMock()
+    engine.pool.logging_name = name
+    return engine
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestReplicaRouter:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        self.engines = [_engine("a"), _engine("b"), _engine("c")]
+        self.lags: dict[str, float | Exception] = {"a": 0.0, "b": 0.5, "c": 0.0}
+        self.router = ReplicaRouter(self.engines)
+
+        async def lag(engine: MagicMock) -> float:
+            if isinstance(result := self.lags[engine.pool.logging_name], Exception):
+                raise result
+            return result
+
+        mocker.patch.object(ReplicaRouter, "_lag", AsyncMock(side_effect=lag))
+
+    async def test_unchecked_replicas_are_not_used(self) -> None:
+        assert self.router.engine() is None
+
+    async def test_round_robin_over_healthy_replicas(self) -> None:
+        self.lags["b"] = 60.0
+        self.lags["c"] = OSError("unavailable")
+        await self.router.check()
+
+        assert {self.router.engine() for _ in range(4)} == {self.engines[0]}
+
+        self.lags["c"] = 0.0
+        await self.router.check()
+
+        assert [self.router.engine() for _ in range(4)] == [self.engines[0], self.engines[2]] * 2
+
+
+@pytest.mark.unit
+class TestRoutingSession:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        self.replica = _engine("replica")
+        mocker.patch.object(ReplicaRouter, "engine", return_value=self.replica)
+        self.session = RoutingSession(bind=async_engine.sync_engine)
+
+    def test_lookups_go_to_replica(self) -> None:
+        assert not self.session.info.get("replica")
+        assert self.session.get_bind(replica=True) is self.replica.sync_engine
+        assert self.session.get_bind(replica=True) is self.replica.sync_engine
+        assert self.session.info["replica"]
+
+    def test_lookups_stay_on_primary_after_using_it(self) -> None:
+        assert self.session.get_bind() is async_engine.sync_engine
+        assert self.session.get_bind(replica=True) is async_engine.sync_engine
@@ -0,0 +1,103 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+
+from db.session import _connect_args, _db_session, after_commit, execute_read, read_session_factory
+from models import Account
+
+STMT = select(Account)
+
+
+def _error(connection_invalidated: bool) -> DBAPIError:
+    return DBAPIError("SELECT", {}, ConnectionResetError(), connection_invalidated=connection_invalidated)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestExecuteRead:
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        self.result = MagicMock()
+        self.session = AsyncMock()
+        self.session.in_transaction = MagicMock(return_value=False)
+
+    async def test_read_is_retried_on_dead_connection(self) -> None:
+        self.session.execute.side_effect = [_error(True), self.result]
+
+        assert await execute_read(self.session, STMT) is self.result
+        self.session.rollback.assert_awaited_once()
+
+    async def test_other_errors_are_raised(self) -> None:
+        self.session.execute.side_effect = [_error(False), self.result]
+
+        with pytest.raises(DBAPIError):
+            await execute_read(self.session, STMT)
+
+    async def test_read_within_transaction_is_not_retried(self) -> None:
+        self.session.in_transaction.return_value = True
+        self.session.execute.side_effect = [_error(True), self.result]
+
+        with pytest.raises(DBAPIError):
+            await execute_read(self.session, STMT)
+
+        self.session.rollback.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestAfterCommit:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        self.session = AsyncMock(info={})
+        factory = mocker.patch("db.session.async_session_factory")
+        factory.return_value.__aenter__.return_value = self.session
+
+        self.callback = AsyncMock(side_effect=lambda: self.session.commit.assert_awaited_once())
+
+    async def test_callbacks_run_after_commit(self) -> None:
+        sessions = _db_session()
+        after_commit(await anext(sessions), self.callback)
+
+        with pytest.raises(StopAsyncIteration):
+            await anext(sessions)
+
+        self.callback.assert_awaited_once()
+
+    async def test_callbacks_are_dropped_on_error(self) -> None:
+        sessions = _db_session()
+        after_commit(await anext(sessions), self.callback)
+
+        with pytest.raises(ValueError):
+            await sessions.athrow(ValueError())
+
+        self.session.commit.assert_not_awaited()
+        self.callback.assert_not_awaited()
+
+
+@pytest.mark.unit
+def test_read_sessions_autocommit() -> None:
+    engine = read_session_factory.kw["bind"]
+
+    assert engine.get_execution_options()["isolation_level"] == "AUTOCOMMIT"
+
+
+@pytest.mark.unit
+class TestStatementCache:
+    def test_named_statements_are_cached(self) -> None:
+        args = _connect_args()
+        name_func = args["prepared_statement_name_func"]
+
+        assert args["prepared_statement_cache_size"] > 0
+        assert args["statement_cache_size"] > 0
+        assert name_func() != name_func()
+
+    def test_cache_is_disabled_for_transaction_pooling(self, mocker: MockerFixture) -> None:
+        mocker.patch("db.session.pg_settings.STATEMENT_CACHE_MODE", "disabled")
+
+        args = _connect_args()
+
+        assert args["prepared_statement_cache_size"] == 0
+        assert args["statement_cache_size"] == 0
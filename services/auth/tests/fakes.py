@@ -0,0 +1,175 @@
+"""In-process stand-ins for external services used by unit tests, benchmarks and load tests."""
+
+from fnmatch import fnmatchcase
+from math import ceil, floor
+from time import monotonic, time
+from types import TracebackType
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine
+
+from redis.commands.core import AsyncScript
+
+from services.limits import _GCRA_SCRIPT  # noqa
+from services.token import _BLACKLIST_SCRIPT  # noqa
+
+__all__ = [
+    "FakePipeline",
+    "FakeRedis",
+]
+
+
+FakeScript = Callable[["FakeRedis", tuple[Any, ...], tuple[Any, ...]], Awaitable[Any]]
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of `redis.asyncio.Redis` commands used by the auth service."""
+
+    # Python versions of Lua scripts, by script SHA
+    SCRIPTS: dict[str, FakeScript] = {}
+
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[Any, float | None]] = {}
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    @classmethod
+    def script(cls, script: AsyncScript) -> Callable[[FakeScript], FakeScript]:
+        """Register a Python version of a Lua script."""
+
+        def register(func: FakeScript) -> FakeScript:
+            cls.SCRIPTS[script.sha] = func
+            return func
+
+        return register
+
+    async def get(self, key: str) -> Any:
+        return self._get(key)
+
+    async def mget(self, *keys: str) -> list[Any]:
+        return [self._get(key) for key in keys]
+
+    async def set(self, key: str, value: Any, ex: int | None = None, nx: bool = False) -> bool | None:
+        if nx and self._get(key) is not None:
+            return None
+
+        self._data[key] = (value, monotonic() + ex if ex else None)
+        return True
+
+    async def setex(self, key: str, ttl: int, value: Any) -> bool:
+        return bool(await self.set(key, value, ex=ttl))
+
+    async def incrby(self, key: str, amount: int = 1) -> int:
+        value = int(self._get(key) or 0) + amount
+        _, expires_at = self._data.get(key, (None, None))
+
+        self._data[key] = (value, expires_at)
+        return value
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if (value := self._get(key)) is None:
+            return False
+
+        self._data[key] = (value, monotonic() + seconds)
+        return True
+
+    async def exists(self, *keys: str) -> int:
+        return sum(self._get(key) is not None for key in keys)
+
+    async def publish(self, channel: str, message: Any) -> int:
+        return 0
+
+    async def ping(self) -> bool:
+        return True
+
+    async def evalsha(self, sha: str, numkeys: int, *args: Any) -> Any:
+        return await self.SCRIPTS[sha](self, args[:numkeys], args[numkeys:])
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    async def scan_iter(self, match: str = "*", count: int | None = None) -> AsyncIterator[str]:
+        for key in list(self._data):
+            if fnmatchcase(key, match) and self._get(key) is not None:
+                yield key
+
+    def _get(self, key: str) -> Any:
+        value, expires_at = self._data.get(key, (None, None))
+
+        if expires_at is not None and expires_at <= monotonic():
+            self._data.pop(key, None)
+            return None
+
+        return value
+
+
+@FakeRedis.script(_BLACKLIST_SCRIPT)
+async def _blacklist(redis: FakeRedis, keys: tuple[Any, ...], args: tuple[Any, ...]) -> int:
+    if await redis.exists(keys[1]):
+        return 0
+
+    if (revoked_before := await redis.get(keys[2])) is not None and int(args[3]) < int(revoked_before):
+        return 0
+
+    if not await redis.set(keys[0], 1, ex=int(args[0]), nx=True):
+        return 0
+
+    await redis.publish(args[1], args[2])
+    return 1
+
+
+@FakeRedis.script(_GCRA_SCRIPT)
+async def _gcra(redis: FakeRedis, keys: tuple[Any, ...], args: tuple[Any, ...]) -> list[int]:
+    now = floor(time() * 1000)
+    limit, period = int(args[0]), int(args[1])
+    interval = period / limit
+    allowed, remaining, retry_after, reset = 1, limit, 0.0, 0.0
+    tats = []
+
+    for key in keys:
+        tat = max(float(await redis.get(key) or now), now)
+
+        if (allow_at := tat + interval - period) > now:
+            allowed, remaining = 0, 0
+            retry_after = max(retry_after, allow_at - now)
+        else:
+            remaining = min(remaining, floor((now - allow_at) / interval))
+
+        tats.append(tat + interval)
+        reset = max(reset, tat - now)
+
+    if allowed:
+        for key, tat in zip(keys, tats):
+            await redis.set(key, ceil(tat), ex=ceil((tat - now) / 1000))
+            reset = max(reset, tat - now)
+
+    return [allowed, remaining, ceil(retry_after), ceil(reset)]
+
+
+class FakePipeline:
+    """Pipeline of `FakeRedis` commands, queued and run on `execute`."""
+
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._commands: list[Coroutine[Any, Any, Any]] = []
+
+    async def execute(self) -> list[Any]:
+        commands, self._commands = self._commands, []
+        return [await command for command in commands]
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info: type[BaseException] | BaseException | TracebackType | None) -> None:
+        for command in self._commands:
+            command.close()
+
+        self._commands.clear()
+
+    def __getattr__(self, name: str) -> Callable[..., "FakePipeline"]:
+        command = getattr(self._redis, name)
+
+        def queue(*args: Any, **kwargs: Any) -> "FakePipeline":
+            self._commands.append(command(*args, **kwargs))
+            return self
+
+        return queue
@@ -0,0 +1,29 @@
+"""Helpers shared by unit tests and benchmarks."""
+
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+
+__all__ = [
+    "serialize_key_pair",
+]
+
+
+def serialize_key_pair(private_key: Any) -> tuple[str, str]:
+    """Serializes a private key and its public key to PEM."""
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode("utf-8")
+
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode("utf-8")
+    )
+
+    return private_pem, public_pem
@@ -0,0 +1,108 @@
+"""In-process OpenID Connect provider standing in for Google in load runs."""
+
+from asyncio import sleep
+from hashlib import sha256
+from secrets import token_urlsafe
+from time import time
+from urllib.parse import parse_qs
+
+from authlib.jose import JsonWebToken, RSAKey
+from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
+from fastapi import FastAPI, HTTPException, Request
+from httpx import ASGITransport
+
+__all__ = [
+    "FakeOIDCProvider",
+]
+
+
+class FakeOIDCProvider:
+    """
+    Issue RS256 ID tokens the way Google does, without the network.
+    The browser consent step is skipped: `authorize` returns a code right away.
+    Metadata, JWKS and token endpoints are served on Google paths, so OAuth2 clients
+    only need the provider `transport`, whatever host their URLs point to.
+    """
+
+    ISSUER = "https://accounts.google.com"
+    KID = "load"
+
+    __slots__ = (
+        "_codes",
+        "_jwt",
+        "_key",
+        "app",
+        "latency",
+        "transport",
+    )
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """Initialize provider with simulated network latency in seconds."""
+        private_key = generate_private_key(public_exponent=65537, key_size=2048)
+
+        self._codes: dict[str, dict[str, str]] = {}
+        self._jwt = JsonWebToken(["RS256"])
+        self._key = RSAKey.import_key(private_key, {"kid": self.KID, "use": "sig", "alg": "RS256"})
+
+        self.latency = latency
+        self.app = self._build_app()
+        self.transport = ASGITransport(app=self.app)
+
+    def authorize(self, email: str, client_id: str, nonce: str) -> str:
+        """Grant an authorization code to a client on behalf of a user."""
+        code = token_urlsafe(16)
+        self._codes[code] = {"email": email, "aud": client_id, "nonce": nonce}
+        return code
+
+    def _issue(self, code: str) -> dict[str, str | int]:
+        """Exchange an authorization code for tokens."""
+        if (grant := self._codes.pop(code, None)) is None:
+            raise HTTPException(status_code=400, detail="invalid_grant")
+
+        now = int(time())
+        claims = {
+            **grant,
+            "iss": self.ISSUER,
+            "sub": sha256(grant["email"].encode()).hexdigest()[:21],
+            "email_verified": True,
+            "iat": now,
+            "exp": now + 3600,
+        }
+        header = {"alg": "RS256", "kid": self.KID}
+
+        return {
+            "access_token": token_urlsafe(32),
+            "token_type": "Bearer",
+            "expires_in": 3600,
+            "id_token": self._jwt.encode(header, claims, self._key).decode("ascii"),
+        }
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+        jwks = {"keys": [self._key.as_dict(is_private=False, kid=self.KID, use="sig", alg="RS256")]}
+        metadata = {
+            "issuer": self.ISSUER,
+            "authorization_endpoint": f"{self.ISSUER}/o/oauth2/v2/auth",
+            "token_endpoint": "https://oauth2.googleapis.com/token",
+            "jwks_uri": "https://www.googleapis.com/oauth2/v3/certs",
+            "id_token_signing_alg_values_supported": ["RS256"],
+        }
+
+        @app.get("/.well-known/openid-configuration")
+        async def get_metadata() -> dict[str, object]:
+            await sleep(self.latency)
+            return metadata
+
+        @app.get("/oauth2/v3/certs")
+        async def get_jwks() -> dict[str, object]:
+            await sleep(self.latency)
+            return jwks
+
+        @app.post("/token")
+        async def exchange_code(request: Request) -> dict[str, str | int]:
+            # Parsed by hand, `python-multipart` is not a dependency of the service
+            form = parse_qs((await request.body()).decode("ascii"))
+            await sleep(self.latency)
+            return self._issue(form.get("code", [""])[0])
+
+        return app
@@ -0,0 +1,160 @@
+"""
+Drives mixed auth traffic against the service and reports latency per route and event loop lag.
+
+The application runs in-process against Postgres and Redis from the environment,
+e.g. the `docker-compose.testing.yml` stack, and Google is replaced with an in-process provider.
+The load generator shares the event loop with the application, so lag includes its own overhead.
+
+    python -m tests.load.run --users 50 --duration 60
+    python -m tests.load.run --mix register=1,login=2,refresh=10,logout=1,oauth_mobile=1,oauth_web=1
+    python -m tests.load.run --fake-redis --provider-latency 0.05 --output load.json
+"""
+
+from argparse import ArgumentParser, ArgumentTypeError, Namespace, RawTextHelpFormatter
+from asyncio import gather, run, sleep
+from contextlib import ExitStack
+from json import dumps
+from pathlib import Path
+from random import choices, uniform
+from time import perf_counter
+from typing import Any
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+from api import limits
+from core.clients.http import HTTPPools
+from core.configs.jwt import jwt_settings
+from core.configs.warmup import warmup_settings
+from db.session import async_engine
+from enums import OAuth2ProviderEnum, PlatformEnum
+from main import app
+from models import BaseModel
+from services.oauth2 import get_oauth2_client
+from services.oidc import provider_cache
+from tests.fakes import FakeRedis
+from tests.load.provider import FakeOIDCProvider
+from tests.load.scenarios import SCENARIOS, AccountPool, VirtualUser
+from tests.load.stats import LagMonitor, LoadStats, format_report
+
+DEFAULT_MIX = "register=1,login=2,refresh=10,logout=1,oauth_mobile=1,oauth_web=1"
+
+# Modules holding the Redis client, replaced with `--fake-redis`
+REDIS_CLIENTS = (
+    "core.health.checks.redis",
+    "services.cache.redis",
+    "services.limits.redis",
+    "services.revocation.redis",
+    "services.token.redis",
+)
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """Parse `scenario=weight` pairs."""
+    mix = {}
+
+    for pair in value.split(","):
+        name, _, weight = pair.partition("=")
+
+        if name not in SCENARIOS:
+            raise ArgumentTypeError(f"unknown scenario {name!r}, choose from: {', '.join(SCENARIOS)}")
+
+        mix[name] = float(weight or 1)
+
+    return mix
+
+
+def _patch_dependencies(stack: ExitStack, args: Namespace, provider: FakeOIDCProvider) -> None:
+    """Route OAuth2 calls to the fake provider and optionally Redis to memory."""
+    stack.enter_context(patch.object(provider_cache, "_transport", provider.transport))
+    stack.enter_context(patch.object(HTTPPools, "get", lambda _, __: provider.transport))
+
+    for platform in PlatformEnum:
+        client = get_oauth2_client(OAuth2ProviderEnum.GOOGLE, platform)
+        stack.enter_context(patch.dict(client.client_kwargs, transport=provider.transport))
+
+    if args.fake_redis:
+        for target in REDIS_CLIENTS:
+            stack.enter_context(patch(target, FakeRedis()))
+
+        # In-memory Redis has neither a connection pool to warm up nor pub/sub to keep the filter in sync
+        stack.enter_context(patch.object(warmup_settings, "REDIS_CONNECTIONS", 0))
+        stack.enter_context(patch.object(jwt_settings, "REVOCATION_FILTER_ENABLED", False))
+
+
+def _prepare(application: FastAPI, rate_limits: bool) -> FastAPI:
+    """Drop rate limits, which would reject most of the load from a single address."""
+    if not rate_limits:
+        for name in limits.__all__:
+            application.dependency_overrides[getattr(limits, name).dependency] = lambda: None
+
+    return application
+
+
+async def _user(user: VirtualUser, mix: dict[str, float], deadline: float, think_time: float) -> None:
+    """Run random scenarios until the deadline."""
+    scenarios, weights = list(mix), list(mix.values())
+
+    while perf_counter() < deadline:
+        scenario = choices(scenarios, weights)[0]
+        await getattr(user, scenario)()
+
+        if think_time:
+            await sleep(uniform(0, 2 * think_time))
+
+
+async def _load(args: Namespace) -> tuple[dict[str, Any], dict[str, float]]:
+    provider = FakeOIDCProvider(latency=args.provider_latency)
+    application = _prepare(app, args.rate_limits)
+
+    with ExitStack() as stack:
+        _patch_dependencies(stack, args, provider)
+
+        async with application.router.lifespan_context(application):
+            async with async_engine.begin() as conn:
+                await conn.run_sync(BaseModel.metadata.create_all)
+
+            transport = ASGITransport(app=application, raise_app_exceptions=False)
+            pool, stats, lag = AccountPool(), LoadStats(), LagMonitor()
+            users = [VirtualUser(transport, pool, provider, stats) for _ in range(args.users)]
+
+            print(f"Running {args.users} users for {args.duration}s: {args.mix}")
+
+            await lag.start()
+            started = perf_counter()
+
+            try:
+                deadline = started + args.duration
+                await gather(*(_user(user, args.mix, deadline, args.think_time) for user in users))
+            finally:
+                elapsed = perf_counter() - started
+                await lag.stop()
+                await gather(*(user.close() for user in users))
+
+    return stats.summary(elapsed), lag.summary()
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__, formatter_class=RawTextHelpFormatter)
+
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=30, help="Run time in seconds.")
+    parser.add_argument("--think-time", type=float, default=0, help="Mean pause between scenarios in seconds.")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"Scenario weights, {DEFAULT_MIX}.")
+    parser.add_argument("--provider-latency", type=float, default=0, help="OAuth2 provider latency in seconds.")
+    parser.add_argument("--fake-redis", action="store_true", help="Use in-memory Redis.")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep rate limits enabled.")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON.")
+
+    args = parser.parse_args()
+
+    summary, lag = run(_load(args))
+    print(format_report(summary, lag))
+
+    if args.output:
+        args.output.write_text(dumps({"summary": summary, "lag": lag}, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Traffic of a single client against auth routes."""
+
+from itertools import count
+from random import choice, random, randrange
+from secrets import token_hex, token_urlsafe
+from time import perf_counter
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from httpx import AsyncBaseTransport, AsyncClient, HTTPError, Response
+
+from core.configs.oauth2 import OAuth2Settings
+from enums import MobilePlatformEnum, OAuth2ProviderEnum
+from tests.load.provider import FakeOIDCProvider
+from tests.load.stats import LoadStats
+
+__all__ = [
+    "SCENARIOS",
+    "AccountPool",
+    "VirtualUser",
+]
+
+SCENARIOS = (
+    "register",
+    "login",
+    "refresh",
+    "logout",
+    "oauth_mobile",
+    "oauth_web",
+)
+
+BASE_URL = "http://auth"
+
+
+class AccountPool:
+    """Accounts and live sessions shared by all virtual users."""
+
+    __slots__ = (
+        "_ids",
+        "_run_id",
+        "_sessions",
+        "credentials",
+        "oauth_emails",
+    )
+
+    def __init__(self) -> None:
+        """Initialize empty pool with a unique email namespace for this run."""
+        self._ids = count()
+        self._run_id = token_hex(4)
+        self._sessions: list[str] = []
+
+        self.credentials: list[tuple[str, str]] = []
+        self.oauth_emails: list[str] = []
+
+    def new_email(self) -> str:
+        """Get an email address that is not registered yet."""
+        return f"load-{self._run_id}-{next(self._ids)}@example.com"
+
+    def add_session(self, refresh_token: str) -> None:
+        """Add a refresh token of a logged-in client."""
+        self._sessions.append(refresh_token)
+
+    def take_session(self) -> str | None:
+        """Take a random refresh token out of the pool, so no other user refreshes or revokes it meanwhile."""
+        if not self._sessions:
+            return None
+
+        idx = randrange(len(self._sessions))
+        self._sessions[idx], self._sessions[-1] = self._sessions[-1], self._sessions[idx]
+        return self._sessions.pop()
+
+
+class VirtualUser:
+    """Client running scenarios one after another, like a single app instance would."""
+
+    # Share of OAuth2 logins by an already linked account
+    RETURNING_OAUTH_RATE = 0.5
+
+    __slots__ = (
+        "_client",
+        "_pool",
+        "_provider",
+        "stats",
+    )
+
+    def __init__(
+        self,
+        transport: AsyncBaseTransport,
+        pool: AccountPool,
+        provider: FakeOIDCProvider,
+        stats: LoadStats,
+    ) -> None:
+        """Initialize virtual user with its own cookie jar."""
+        self._client = AsyncClient(transport=transport, base_url=BASE_URL)
+        self._pool = pool
+        self._provider = provider
+        self.stats = stats
+
+    async def register(self) -> None:
+        email, password = self._pool.new_email(), token_urlsafe(12)
+        creds = {"email": email, "password": password}
+
+        if response := await self._request("POST /register", "POST", "/register", json=creds):
+            if response.status_code == 201:
+                self._pool.credentials.append((email, password))
+                self._pool.add_session(response.json()["refresh_token"])
+
+    async def login(self) -> None:
+        if not self._pool.credentials:
+            return await self.register()
+
+        email, password = choice(self._pool.credentials)
+        creds = {"email": email, "password": password}
+
+        if response := await self._request("POST /login", "POST", "/login", json=creds):
+            if response.status_code == 200:
+                self._pool.add_session(response.json()["refresh_token"])
+
+    async def refresh(self) -> None:
+        if (refresh_token := self._pool.take_session()) is None:
+            return await self.login()
+
+        headers = {"Authorization": f"Bearer {refresh_token}"}
+
+        if response := await self._request("POST /token/refresh", "POST", "/token/refresh", headers=headers):
+            if response.status_code == 200:
+                # Keep the rotated refresh token, if any
+                self._pool.add_session(response.json().get("refresh_token", refresh_token))
+
+    async def logout(self) -> None:
+        if (refresh_token := self._pool.take_session()) is None:
+            return await self.login()
+
+        headers = {"Authorization": f"Bearer {refresh_token}"}
+        await self._request("POST /logout", "POST", "/logout", headers=headers)
+
+    async def oauth_mobile(self) -> None:
+        provider, platform = OAuth2ProviderEnum.GOOGLE, MobilePlatformEnum.ANDROID
+        client_id = OAuth2Settings.get_settings(provider, platform).CLIENT_ID
+
+        nonce = token_urlsafe(16)
+        data = {
+            "code": self._provider.authorize(self._oauth_email(), client_id, nonce),
+            "code_verifier": token_urlsafe(43),
+            "nonce": nonce,
+            "state": token_urlsafe(16),
+        }
+
+        if response := await self._request(
+            "POST /oauth2/{provider}/mobile/callback",
+            "POST",
+            f"/oauth2/{provider}/mobile/callback",
+            params={"platform": platform},
+            json=data,
+        ):
+            if response.status_code == 200:
+                self._pool.add_session(response.json()["refresh_token"])
+
+    async def oauth_web(self) -> None:
+        provider = OAuth2ProviderEnum.GOOGLE
+
+        try:
+            redirect = await self._request(
+                "GET /oauth2/{provider}/login",
+                "GET",
+                f"/oauth2/{provider}/login",
+                params={"platform": "web"},
+            )
+
+            if redirect is None or not redirect.is_redirect:
+                return
+
+            # Act as the browser: consent on the provider side and follow the redirect back
+            query = parse_qs(urlsplit(redirect.headers["Location"]).query)
+            code = self._provider.authorize(self._oauth_email(), query["client_id"][0], query["nonce"][0])
+
+            if response := await self._request(
+                "GET /oauth2/{provider}/callback",
+                "GET",
+                f"/oauth2/{provider}/callback",
+                params={"code": code, "state": query["state"][0]},
+            ):
+                if response.status_code == 200:
+                    self._pool.add_session(response.json()["refresh_token"])
+        finally:
+            self._client.cookies.clear()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    def _oauth_email(self) -> str:
+        """Get an email of a returning OAuth2 account, or of a new one."""
+        if self._pool.oauth_emails and random() < self.RETURNING_OAUTH_RATE:
+            return choice(self._pool.oauth_emails)
+
+        email = self._pool.new_email()
+        self._pool.oauth_emails.append(email)
+        return email
+
+    async def _request(self, route: str, method: str, url: str, **kwargs: Any) -> Response | None:
+        """Send a request and record its latency under the route template."""
+        started = perf_counter()
+
+        try:
+            response = await self._client.request(method, url, **kwargs)
+        except HTTPError as exc:
+            self.stats.record_error(route, exc)
+            return None
+
+        self.stats.record(route, response.status_code, perf_counter() - started)
+        return response
@@ -0,0 +1,143 @@
+"""Latency and event loop lag collection for load runs."""
+
+from asyncio import CancelledError, Task, create_task, get_running_loop, sleep
+from collections import Counter, defaultdict
+from contextlib import suppress
+from dataclasses import dataclass, field
+from math import ceil
+from typing import Any
+
+__all__ = [
+    "LagMonitor",
+    "LoadStats",
+    "format_report",
+    "percentile",
+]
+
+
+def percentile(samples: list[float], rank: float) -> float:
+    """Get percentile of samples with the nearest-rank method."""
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    return ordered[max(ceil(rank / 100 * len(ordered)) - 1, 0)]
+
+
+@dataclass
+class LoadStats:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    statuses: dict[str, Counter[int]] = field(default_factory=lambda: defaultdict(Counter))
+    errors: Counter[str] = field(default_factory=Counter)
+
+    def record(self, route: str, status: int, seconds: float) -> None:
+        """Record a completed request."""
+        self.latencies[route].append(seconds)
+        self.statuses[route][status] += 1
+
+    def record_error(self, route: str, exc: BaseException) -> None:
+        """Record a request that failed without a response."""
+        self.errors[f"{route}: {type(exc).__name__}"] += 1
+
+    def summary(self, elapsed: float) -> dict[str, Any]:
+        """Summarize throughput, status codes and latency percentiles per route."""
+        routes = {}
+
+        for route, samples in sorted(self.latencies.items()):
+            routes[route] = {
+                "requests": len(samples),
+                "throughput": len(samples) / elapsed,
+                "statuses": dict(sorted(self.statuses[route].items())),
+                "p50": percentile(samples, 50),
+                "p95": percentile(samples, 95),
+                "p99": percentile(samples, 99),
+                "max": max(samples),
+            }
+
+        total = sum(len(samples) for samples in self.latencies.values())
+
+        return {
+            "elapsed": elapsed,
+            "requests": total,
+            "throughput": total / elapsed,
+            "routes": routes,
+            "errors": dict(self.errors),
+        }
+
+
+class LagMonitor:
+    """
+    Measure event loop lag as the delay of a periodic wake-up.
+    Lag shows how long handlers block the loop, e.g. with CPU-bound work.
+    """
+
+    __slots__ = (
+        "_interval",
+        "_samples",
+        "_task",
+    )
+
+    def __init__(self, interval: float = 0.01) -> None:
+        """Initialize monitor with wake-up interval in seconds."""
+        self._interval = interval
+        self._samples: list[float] = []
+        self._task: Task[None] | None = None
+
+    async def start(self) -> None:
+        """Start sampling lag in background."""
+        self._task = create_task(self._sample())
+
+    async def stop(self) -> None:
+        """Stop sampling lag."""
+        if self._task is not None:
+            self._task.cancel()
+
+            with suppress(CancelledError):
+                await self._task
+
+            self._task = None
+
+    def summary(self) -> dict[str, float]:
+        """Summarize lag percentiles."""
+        return {
+            "p50": percentile(self._samples, 50),
+            "p95": percentile(self._samples, 95),
+            "p99": percentile(self._samples, 99),
+            "max": max(self._samples, default=0.0),
+        }
+
+    async def _sample(self) -> None:
+        loop = get_running_loop()
+
+        while True:
+            started = loop.time()
+            await sleep(self._interval)
+            self._samples.append(max(loop.time() - started - self._interval, 0.0))
+
+
+def format_report(summary: dict[str, Any], lag: dict[str, float] | None) -> str:
+    """Format summary as a text table with latencies in milliseconds."""
+    lines = [
+        f"{'route':<40} {'requests':>9} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  statuses",
+    ]
+
+    for route, row in summary["routes"].items():
+        statuses = " ".join(f"{code}:{count}" for code, count in row["statuses"].items())
+        lines.append(
+            f"{route:<40} {row['requests']:>9} {row['throughput']:>9.1f} "
+            f"{row['p50'] * 1e3:>9.1f} {row['p95'] * 1e3:>9.1f} {row['p99'] * 1e3:>9.1f} {row['max'] * 1e3:>9.1f}"
+            f"  {statuses}",
+        )
+
+    lines.append(f"\n{summary['requests']} requests in {summary['elapsed']:.1f}s, {summary['throughput']:.1f} req/s")
+
+    if lag is not None:
+        lines.append(
+            f"Event loop lag, ms: p50 {lag['p50'] * 1e3:.1f}, p95 {lag['p95'] * 1e3:.1f}, "
+            f"p99 {lag['p99'] * 1e3:.1f}, max {lag['max'] * 1e3:.1f}",
+        )
+
+    for error, count in summary["errors"].items():
+        lines.append(f"Error {error} x{count}")
+
+    return "\n".join(lines)
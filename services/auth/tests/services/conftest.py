@@ -1,13 +1,20 @@
-from typing import Any, Generator
+from typing import Any, AsyncGenerator, Generator
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from cryptography.hazmat.primitives import serialization
+import pytest_asyncio
+from cryptography.hazmat.primitives.asymmetric.ec import SECP256R1
+from cryptography.hazmat.primitives.asymmetric.ec import generate_private_key as generate_ec_private_key
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
 from fastapi import Request
 from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
+from core.clients.redis import _create_client  # noqa
 from services.token import _TokenFactory  # noqa
+from tests.fakes import FakeRedis
+from tests.helpers import serialize_key_pair
 
 
 @pytest.fixture(scope="session")
@@ -15,9 +22,33 @@ def mock_redis() -> AsyncMock:
     redis_mock = AsyncMock(spec=Redis)
     redis_mock.exists = AsyncMock(return_value=False)
     redis_mock.setex = AsyncMock()
+    redis_mock.evalsha = AsyncMock(return_value=1)
+    redis_mock.publish = AsyncMock(return_value=0)
     return redis_mock
 
 
+@pytest_asyncio.fixture(params=["fake", "server"])
+async def script_redis(request: pytest.FixtureRequest) -> AsyncGenerator[Redis | FakeRedis, None]:
+    """
+    Redis running the Lua scripts: the in-memory fake with their Python versions, and a Redis server
+    running the scripts that ship, e.g. the one of the testing stack; tests with the server are skipped without it.
+    """
+    if request.param == "fake":
+        yield FakeRedis()
+        return
+
+    client = _create_client()
+
+    try:
+        await client.ping()
+    except (RedisError, OSError):
+        await client.aclose()
+        pytest.skip("Redis server is not available")
+
+    yield client
+    await client.aclose()
+
+
 @pytest.fixture(scope="session")
 def mock_request() -> MagicMock:
     request = MagicMock(spec=Request)
@@ -31,23 +62,19 @@ def rsa_key_pair() -> tuple[str, str]:
         public_exponent=65537,
         key_size=2048,
     )
+    return serialize_key_pair(private_key)
 
-    private_pem = private_key.private_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PrivateFormat.PKCS8,
-        encryption_algorithm=serialization.NoEncryption(),
-    ).decode("utf-8")
-
-    public_pem = (
-        private_key.public_key()
-        .public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo,
-        )
-        .decode("utf-8")
-    )
 
-    return private_pem, public_pem
+@pytest.fixture(scope="session")
+def ec_key_pair() -> tuple[str, str]:
+    """Generates a new P-256 key pair for testing."""
+    return serialize_key_pair(generate_ec_private_key(SECP256R1()))
+
+
+@pytest.fixture(scope="session")
+def ed25519_key_pair() -> tuple[str, str]:
+    """Generates a new Ed25519 key pair for testing."""
+    return serialize_key_pair(Ed25519PrivateKey.generate())
 
 
 @pytest.fixture
@@ -60,4 +87,4 @@ def token_factory(mock_request: MagicMock, rsa_key_pair: tuple[str, str]) -> Gen
         patch.object(_TokenFactory, "SIGNING_KID", 0),
     ):
         yield _TokenFactory(request=mock_request)
-        _TokenFactory.get_jwks.cache_clear()
+        _TokenFactory.reload_keys()
@@ -0,0 +1,139 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from pytest_mock import MockerFixture
+
+from core.exceptions import AccountAlreadyExists, InvalidCredentials
+from core.security import UNUSABLE_PASSWORD_HASH
+from schemas import AccountSnapshot, Credentials
+from services.auth import authenticate, get_account, register_account
+from services.cache import AccountCache, account_cache
+from tests.fakes import FakeRedis
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestRegisterAccount:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        self.cache = mocker.patch("services.auth.account_cache", AsyncMock())
+        self.cache.get_by_email.return_value = (False, None)
+        mocker.patch("services.auth.hash_password", AsyncMock(return_value="hash"))
+
+        self.session = AsyncMock(info={})
+        self.creds = Credentials(email="user@example.com", password="password")
+
+    async def test_register(self) -> None:
+        self.session.scalar.return_value = uuid4()
+
+        account = await register_account(self.session, self.creds)
+
+        assert account.email == self.creds.email
+        assert account.password_hash == "hash"
+        self.session.scalar.assert_awaited_once()
+
+        # The cache is updated only after the session committed
+        self.cache.invalidate.assert_not_awaited()
+
+        for callback in self.session.info["after_commit"]:
+            await callback()
+
+        self.cache.invalidate.assert_awaited_once_with(self.creds.email, account.id)
+
+    async def test_conflict_is_settled_by_database(self) -> None:
+        self.session.scalar.return_value = None
+
+        with pytest.raises(AccountAlreadyExists):
+            await register_account(self.session, self.creds)
+
+        assert not self.session.info
+
+    async def test_cached_account_skips_database(self) -> None:
+        cached = AccountSnapshot(
+            id=uuid4(),
+            email=self.creds.email,
+            password_hash="hash",
+            is_active=True,
+            is_verified=False,
+        )
+        self.cache.get_by_email.return_value = (True, cached)
+
+        with pytest.raises(AccountAlreadyExists):
+            await register_account(self.session, self.creds)
+
+        self.session.scalar.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestGetAccount:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        self.cache = mocker.patch("services.auth.account_cache", AsyncMock())
+        self.cache.get_by_email.return_value = (False, None)
+        self.execute_read = mocker.patch("services.auth.execute_read", AsyncMock())
+        self.execute_read.return_value.scalar_one_or_none = MagicMock(return_value=None)
+
+        self.email = "user@example.com"
+        self.account = SimpleNamespace(
+            id=uuid4(),
+            email=self.email,
+            password_hash="hash",
+            is_active=True,
+            is_verified=False,
+            oauth2=None,
+        )
+        self.session = AsyncMock(info={})
+        self.session.execute.return_value.scalar_one_or_none = MagicMock(return_value=self.account)
+
+    async def test_replica_miss_is_confirmed_on_primary(self) -> None:
+        self.session.info["replica"] = True
+
+        account = await get_account(self.session, self.email)
+
+        assert account is not None and account.id == self.account.id
+        self.session.execute.assert_awaited_once()
+        self.cache.set.assert_awaited_once_with(self.email, account)
+
+    async def test_primary_miss_is_cached(self) -> None:
+        assert await get_account(self.session, self.email) is None
+
+        self.session.execute.assert_not_awaited()
+        self.cache.set.assert_awaited_once_with(self.email, None)
+
+    async def test_sign_up_during_lookup_is_not_hidden(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(AccountCache, "ENABLED", True)
+        mocker.patch("services.cache.redis", FakeRedis())
+        mocker.patch("services.auth.account_cache", account_cache)
+        mocker.patch("services.auth.hash_password", AsyncMock(return_value="hash"))
+        sign_up = AsyncMock(info={})
+        sign_up.scalar.return_value = uuid4()
+
+        async def read_during_sign_up(*_: object) -> MagicMock:
+            # The lookup read the database before the account was committed
+            await register_account(sign_up, Credentials(email=self.email, password="password"))
+
+            for callback in sign_up.info["after_commit"]:
+                await callback()
+
+            return MagicMock(scalar_one_or_none=MagicMock(return_value=None))
+
+        self.execute_read.side_effect = read_during_sign_up
+
+        assert await get_account(AsyncMock(info={}), self.email) is None
+        assert await account_cache.get_by_email(self.email) == (False, None)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestAuthenticate:
+    async def test_unknown_email_verifies_unusable_hash(self, mocker: MockerFixture) -> None:
+        mocker.patch("services.auth.get_account", AsyncMock(return_value=None))
+        verify_password = mocker.patch("services.auth.verify_password", AsyncMock(return_value=False))
+
+        with pytest.raises(InvalidCredentials):
+            await authenticate(AsyncMock(), Credentials(email="user@example.com", password="password"))
+
+        verify_password.assert_awaited_once_with("password", UNUSABLE_PASSWORD_HASH)
@@ -0,0 +1,59 @@
+from typing import Any
+
+import pytest
+from pytest_mock import MockerFixture
+
+from core.configs.jwt import jwt_settings
+from schemas import AccessToken, TokenPair
+from services.batch import _chunks, _SigningPool, issue_access_tokens, issue_token_pairs  # noqa
+
+
+@pytest.mark.unit
+class TestBatch:
+    @pytest.fixture(autouse=True)
+    def setup(self, token_factory: Any) -> None:
+        self.factory = token_factory
+
+    @pytest.mark.parametrize("size, expected", [(2, [["a", "b"], ["c"]]), (3, [["a", "b", "c"]])])
+    def test_chunks(self, size: int, expected: list[list[str]]) -> None:
+        assert list(_chunks(["a", "b", "c"], size)) == expected
+
+    def test_issue_token_pairs(self) -> None:
+        subjects = [f"user-{idx}" for idx in range(5)]
+        pairs = issue_token_pairs(subjects)
+
+        assert all(isinstance(pair, TokenPair) for pair in pairs)
+        assert [self.factory.decode_token(pair.refresh_token)["sub"] for pair in pairs] == subjects
+
+        # One timestamp for all tokens of the batch
+        tokens = [token for pair in pairs for token in (pair.access_token, pair.refresh_token)]
+        assert len({self.factory.decode_token(token)["iat"] for token in tokens}) == 1
+
+    def test_issue_access_tokens(self) -> None:
+        subjects = [f"user-{idx}" for idx in range(5)]
+        tokens = issue_access_tokens(subjects)
+
+        assert all(isinstance(token, AccessToken) for token in tokens)
+        assert [self.factory.decode_token(token.access_token)["sub"] for token in tokens] == subjects
+
+    def test_issue_in_process_pool(
+        self,
+        mocker: MockerFixture,
+        monkeypatch: pytest.MonkeyPatch,
+        rsa_key_pair: tuple[str, str],
+    ) -> None:
+        # Spawned workers load keys from the environment, like the application does
+        monkeypatch.setenv("JWT_PRIVATE_KEY_0", rsa_key_pair[0])
+        monkeypatch.setenv("JWT_PUBLIC_KEY_0", rsa_key_pair[1])
+        mocker.patch.object(jwt_settings, "BATCH_CHUNK_SIZE", 2)
+        subjects = [f"user-{idx}" for idx in range(5)]
+        pool = _SigningPool()
+        pool.start(workers=2)
+
+        try:
+            pairs = issue_token_pairs(subjects, pool.executor)
+        finally:
+            pool.shutdown()
+
+        assert [self.factory.decode_token(pair.access_token)["sub"] for pair in pairs] == subjects
+        assert [self.factory.decode_token(pair.refresh_token)["sub"] for pair in pairs] == subjects
@@ -0,0 +1,78 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from pytest_mock import MockerFixture
+from redis.exceptions import ConnectionError
+
+from schemas import AccountSnapshot
+from services.cache import AccountCache
+from tests.fakes import FakeRedis
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestAccountCache:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(AccountCache, "ENABLED", True)
+        mocker.patch("services.cache.redis", FakeRedis())
+
+        self.cache = AccountCache()
+        self.account = AccountSnapshot(
+            id=uuid4(),
+            email="user@example.com",
+            password_hash="hash",
+            is_active=True,
+            is_verified=False,
+        )
+
+    async def test_miss(self) -> None:
+        assert await self.cache.get_by_email(self.account.email) == (False, None)
+        assert await self.cache.get_by_id(self.account.id) == (False, None)
+
+    async def test_hit_by_email_and_id(self) -> None:
+        await self.cache.set(self.account.email, self.account)
+
+        assert await self.cache.get_by_email(self.account.email) == (True, self.account)
+        assert await self.cache.get_by_id(self.account.id) == (True, self.account)
+
+    async def test_unknown_email_is_cached(self) -> None:
+        await self.cache.set("unknown@example.com", None)
+
+        assert await self.cache.get_by_email("unknown@example.com") == (True, None)
+
+    async def test_invalidate(self) -> None:
+        await self.cache.set(self.account.email, self.account)
+        await self.cache.invalidate(self.account.email, self.account.id)
+
+        assert await self.cache.get_by_email(self.account.email) == (False, None)
+        assert await self.cache.get_by_id(self.account.id) == (False, None)
+
+    async def test_unknown_email_cached_before_invalidation(self) -> None:
+        await self.cache.set(self.account.email, None)
+        await self.cache.invalidate(self.account.email, self.account.id)
+
+        assert await self.cache.get_by_email(self.account.email) == (False, None)
+
+    async def test_unknown_email_cached_after_invalidation(self) -> None:
+        # A lookup read the database before the account was committed, and writes after it was invalidated
+        await self.cache.invalidate(self.account.email, self.account.id)
+        await self.cache.set(self.account.email, None)
+
+        assert await self.cache.get_by_email(self.account.email) == (False, None)
+
+        await self.cache.set(self.account.email, self.account)
+
+        assert await self.cache.get_by_email(self.account.email) == (True, self.account)
+
+    async def test_redis_failure_is_a_miss(self, mocker: MockerFixture) -> None:
+        mocker.patch("services.cache.redis", MagicMock(get=AsyncMock(side_effect=ConnectionError())))
+
+        assert await self.cache.get_by_email(self.account.email) == (False, None)
+
+    async def test_disabled(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(AccountCache, "ENABLED", False)
+        await self.cache.set(self.account.email, self.account)
+
+        assert await self.cache.get_by_email(self.account.email) == (False, None)
@@ -0,0 +1,86 @@
+from json import loads
+from time import time
+
+import pytest
+from authlib.jose import JsonWebToken
+
+from services.keys import KeyRegistry
+
+
+@pytest.mark.unit
+class TestKeyRegistry:
+    @pytest.fixture(autouse=True)
+    def setup(self, rsa_key_pair: tuple[str, str]) -> None:
+        private_pem, public_pem = rsa_key_pair
+
+        self.registry = KeyRegistry(
+            algorithm="RS256",
+            signing_kid="auth-key-0",
+            private_key=private_pem,
+            public_keys={"auth-key-0": public_pem},
+        )
+
+    def test_signing_key_has_kid(self) -> None:
+        assert self.registry.signing_key.kid == "auth-key-0"
+
+    @pytest.mark.parametrize("kid, found", [("auth-key-0", True), ("auth-key-1", False)])
+    def test_find_verification_key(self, kid: str, found: bool) -> None:
+        header = {"kid": kid, "alg": "RS256"}
+
+        if found:
+            assert self.registry.find_verification_key(header, None).kid == kid
+        else:
+            with pytest.raises(ValueError):
+                self.registry.find_verification_key(header, None)
+
+    def test_jwks_document(self) -> None:
+        document = loads(self.registry.jwks_document)
+
+        assert document == self.registry.jwks.model_dump(exclude_none=True)
+        assert [key["kid"] for key in document["keys"]] == ["auth-key-0"]
+
+    def test_jwks_etag_is_strong_and_stable(self, rsa_key_pair: tuple[str, str]) -> None:
+        private_pem, public_pem = rsa_key_pair
+        registry = KeyRegistry("RS256", "auth-key-0", private_pem, {"auth-key-0": public_pem})
+
+        assert self.registry.jwks_etag.startswith('"')
+        assert self.registry.jwks_etag == registry.jwks_etag
+
+    @pytest.mark.parametrize(
+        "key_pair, algorithm, kty",
+        [
+            ("rsa_key_pair", "RS256", "RSA"),
+            ("ec_key_pair", "ES256", "EC"),
+            ("ed25519_key_pair", "EdDSA", "OKP"),
+        ],
+    )
+    def test_algorithm_by_key_type(
+        self,
+        request: pytest.FixtureRequest,
+        rsa_key_pair: tuple[str, str],
+        key_pair: str,
+        algorithm: str,
+        kty: str,
+    ) -> None:
+        private_pem, public_pem = request.getfixturevalue(key_pair)
+        registry = KeyRegistry(
+            algorithm="RS256",
+            signing_kid="auth-key-1",
+            private_key=private_pem,
+            public_keys={"auth-key-0": rsa_key_pair[1], "auth-key-1": public_pem},
+        )
+        jwt = JsonWebToken(["RS256", *KeyRegistry.CURVE_ALGORITHMS.values()])
+
+        # New tokens are signed with the algorithm of the signing key
+        token = registry.sign({"sub": "subject", "exp": int(time()) + 60})
+        claims = jwt.decode(token, registry.find_verification_key)
+
+        assert claims.header["alg"] == algorithm
+        assert [(key.kty, key.alg) for key in registry.jwks.keys][1] == (kty, algorithm)
+
+        # Tokens signed with the previous RSA key stay valid during rotation
+        assert jwt.decode(self.registry.sign({"sub": "subject"}), registry.find_verification_key)["sub"] == "subject"
+
+    def test_find_verification_key_rejects_other_algorithm(self) -> None:
+        with pytest.raises(ValueError):
+            self.registry.find_verification_key({"kid": "auth-key-0", "alg": "ES256"}, None)
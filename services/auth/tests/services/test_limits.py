@@ -0,0 +1,203 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from fastapi import Depends, FastAPI, status
+from httpx import ASGITransport, AsyncClient
+from pytest_mock import MockerFixture
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from api.routes import token
+from services.limits import (
+    GCRARateLimiter,
+    HybridRateLimiter,
+    RateLimiterMiddleware,
+    TokenBucket,
+    credential_rate_limiter,
+)
+from tests.fakes import FakeRedis
+
+KEY = "POST:/login:127.0.0.1"
+
+
+@pytest.mark.unit
+class TestTokenBucket:
+    def test_bucket_refills_evenly(self) -> None:
+        bucket = TokenBucket(requests=2, period=60, now=0.0)
+
+        assert bucket.take(0.0) == bucket.take(0.0) == 0.0
+        assert bucket.take(0.0) == pytest.approx(30.0)
+        assert bucket.take(30.0) == 0.0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestHybridRateLimiter:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        self.redis = FakeRedis()
+        mocker.patch("services.limits.redis", self.redis)
+        mocker.patch.object(HybridRateLimiter, "LATENCY_BUDGET", 1.0)
+
+        self.limiter = HybridRateLimiter()
+
+    async def test_local_limit(self) -> None:
+        assert [self.limiter.hit(KEY, 3, 60) for _ in range(3)] == [0.0] * 3
+        assert self.limiter.hit(KEY, 3, 60) > 0
+
+    async def test_cluster_wide_limit(self) -> None:
+        other = HybridRateLimiter()
+
+        for limiter in (self.limiter, other):
+            assert limiter.hit(KEY, 3, 60) == limiter.hit(KEY, 3, 60) == 0.0
+            await limiter.sync()
+
+        # Both replicas have a local token left, but the cluster used 4 out of 3
+        assert other.hit(KEY, 3, 60) > 0
+        assert self.limiter.hit(KEY, 3, 60) == 0.0
+
+    async def test_hits_sync_after_eviction(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(HybridRateLimiter, "MAX_KEYS", 1)
+        mocker.patch.object(HybridRateLimiter, "SYNC_BATCH_SIZE", 1)
+        other = HybridRateLimiter()
+
+        # The bucket of the first key is evicted while its hit is pending
+        assert self.limiter.hit("first", 2, 60) == self.limiter.hit(KEY, 2, 60) == 0.0
+        await self.limiter.sync()
+        await self.limiter.sync()
+
+        assert other.hit(KEY, 2, 60) == 0.0
+        await other.sync()
+
+        assert other.hit(KEY, 2, 60) > 0
+
+    async def test_breaker_opens_on_failures(self, mocker: MockerFixture) -> None:
+        pipeline = mocker.patch.object(self.redis, "pipeline", side_effect=RedisConnectionError("unavailable"))
+
+        for _ in range(3):
+            self.limiter.hit(KEY, 10, 60)
+            await self.limiter.sync()
+
+        assert not self.limiter.breaker.closed
+
+        # Limits are enforced locally, without calling Redis
+        self.limiter.hit(KEY, 10, 60)
+        await self.limiter.sync()
+
+        assert pipeline.call_count == 3
+        assert self.limiter.hit(KEY, 10, 60) == 0.0
+
+    async def test_breaker_opens_on_slow_syncs(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(HybridRateLimiter, "LATENCY_BUDGET", 0.0)
+        mocker.patch.object(self.redis, "incrby", AsyncMock(return_value=1))
+
+        for _ in range(3):
+            self.limiter.hit(KEY, 10, 60)
+            await self.limiter.sync()
+
+        assert not self.limiter.breaker.closed
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestGCRARateLimiter:
+    @pytest.fixture(autouse=True)
+    def setup(self, script_redis: Redis | FakeRedis, mocker: MockerFixture) -> None:
+        self.redis = script_redis
+        mocker.patch("services.limits.redis", self.redis)
+        mocker.patch.object(GCRARateLimiter, "LATENCY_BUDGET", 1.0)
+        # Keys are left on a Redis server between tests and runs
+        mocker.patch.object(GCRARateLimiter, "PREFIX", f"test-rate-limit-{uuid4()}")
+
+        self.limiter = GCRARateLimiter()
+
+    async def test_limit_by_strictest_key(self) -> None:
+        states = [await self.limiter.check(["ip:1", "email:a"], 3, 60) for _ in range(4)]
+        # The email is exhausted from any address, and rejected checks are not counted for the other keys
+        states += [
+            await self.limiter.check(["ip:2", "email:a"], 3, 60),
+            await self.limiter.check(["ip:2", "email:b"], 3, 60),
+        ]
+
+        assert [state.remaining if state else None for state in states] == [2, 1, 0, 0, 0, 2]
+        assert [state.allowed if state else None for state in states] == [True] * 3 + [False] * 2 + [True]
+        assert states[3] and states[3].retry_after == pytest.approx(20, abs=0.1)
+
+    async def test_breaker_opens_on_failures(self, mocker: MockerFixture) -> None:
+        evalsha = mocker.patch.object(self.redis, "evalsha", side_effect=RedisConnectionError("unavailable"))
+
+        for _ in range(4):
+            assert await self.limiter.check(["ip:1"], 3, 60) is None
+
+        assert not self.limiter.breaker.closed
+        assert evalsha.call_count == 3
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestCredentialRateLimiter:
+    @pytest.fixture(autouse=True)
+    def setup(self, script_redis: Redis | FakeRedis, mocker: MockerFixture) -> None:
+        self.redis = script_redis
+        mocker.patch("services.limits.redis", self.redis)
+        mocker.patch.object(GCRARateLimiter, "PREFIX", f"test-rate-limit-{uuid4()}")
+        mocker.patch("services.limits.hybrid_limiter", HybridRateLimiter())
+        mocker.patch("services.limits.gcra_limiter", GCRARateLimiter())
+
+        self.app = FastAPI()
+        self.app.post("/login", dependencies=[Depends(credential_rate_limiter(requests=2, per="minute"))])(lambda: None)
+
+    def client(self, host: str) -> AsyncClient:
+        return AsyncClient(transport=ASGITransport(app=self.app, client=(host, 1234)), base_url="http://auth")
+
+    async def test_email_is_limited_across_addresses(self) -> None:
+        body = {"email": "User@Example.com", "password": "secret"}
+
+        first = await self.client("10.0.0.1").post("/login", json=body)
+        second = await self.client("10.0.0.2").post("/login", json=body | {"email": "user@example.com"})
+        third = await self.client("10.0.0.3").post("/login", json=body)
+        other = await self.client("10.0.0.3").post("/login", json=body | {"email": "other@example.com"})
+
+        assert [first.headers["X-RateLimit-Remaining"], second.headers["X-RateLimit-Remaining"]] == ["1", "0"]
+        assert third.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert third.headers["Retry-After"] == "30"
+        assert third.headers["X-RateLimit-Limit"] == "2"
+        assert other.status_code == status.HTTP_200_OK
+
+    async def test_falls_back_to_local_limits(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(self.redis, "evalsha", side_effect=RedisConnectionError("unavailable"))
+        client = self.client("10.0.0.1")
+
+        responses = [await client.post("/login", json={"email": f"{i}@example.com"}) for i in range(3)]
+
+        assert [response.status_code for response in responses[:2]] == [status.HTTP_200_OK] * 2
+        assert responses[2].status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert "X-RateLimit-Limit" not in responses[0].headers
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestRateLimiterMiddleware:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        mocker.patch("services.limits.hybrid_limiter", HybridRateLimiter())
+        mocker.patch("api.routes.token.get_key_registry", return_value=MagicMock(jwks_document="{}", jwks_etag='"1"'))
+
+        self.app = FastAPI()
+        self.app.include_router(token.router)
+        self.app.add_middleware(RateLimiterMiddleware, requests=2, per="minute")
+
+    def client(self, host: str) -> AsyncClient:
+        return AsyncClient(transport=ASGITransport(app=self.app, client=(host, 1234)), base_url="http://auth")
+
+    async def test_route_without_own_limit(self) -> None:
+        client = self.client("10.0.0.1")
+
+        responses = [await client.get("/.well-known/jwks.json") for _ in range(3)]
+        other = await self.client("10.0.0.2").get("/.well-known/jwks.json")
+
+        assert [response.status_code for response in responses[:2]] == [status.HTTP_200_OK] * 2
+        assert responses[2].status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert responses[2].headers["Retry-After"] == "30"
+        assert other.status_code == status.HTTP_200_OK
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from pytest_mock import MockerFixture
+
+from core.security import UNUSABLE_PASSWORD_HASH, _PasswordHasher, verify_password  # noqa
+from schemas import OAuth2AccountSchema
+from services.oauth2 import oauth2_authenticate
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestOAuth2Authenticate:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        self.cache = mocker.patch("services.oauth2.account_cache", AsyncMock())
+        self.cache.get_by_email.return_value = (False, None)
+
+        self.info = OAuth2AccountSchema(email="user@example.com", provider="google", provider_id="42")
+        self.row = SimpleNamespace(
+            id=uuid4(),
+            email=self.info.email,
+            password_hash=UNUSABLE_PASSWORD_HASH,
+            is_active=True,
+            is_verified=True,
+            oauth2_provider="google",
+            linked=True,
+        )
+        self.session = AsyncMock(info={})
+
+    def results(self, *rows: SimpleNamespace | None) -> None:
+        self.session.execute.side_effect = [
+            MagicMock(one_or_none=MagicMock(return_value=row), one=MagicMock(return_value=row)) for row in rows
+        ]
+
+    async def test_new_account_is_not_hashed(self, mocker: MockerFixture) -> None:
+        run = mocker.patch.object(_PasswordHasher, "run")
+        self.results(self.row)
+
+        account = await oauth2_authenticate(self.session, self.info)
+
+        assert account.id == self.row.id
+        assert self.session.execute.await_count == 1
+        run.assert_not_called()
+
+    async def test_verified_account_falls_back_to_select(self) -> None:
+        self.results(None, self.row)
+
+        account = await oauth2_authenticate(self.session, self.info)
+
+        assert account.id == self.row.id
+        assert self.session.execute.await_count == 2
+
+        # The cache is updated only after the session committed
+        self.cache.invalidate.assert_not_awaited()
+
+        for callback in self.session.info["after_commit"]:
+            await callback()
+
+        self.cache.invalidate.assert_awaited_once_with(self.info.email, self.row.id)
+
+    async def test_unusable_password_hash(self) -> None:
+        assert not await verify_password("", UNUSABLE_PASSWORD_HASH)
@@ -0,0 +1,77 @@
+from asyncio import gather
+from typing import Any
+
+import pytest
+from httpx import MockTransport, Request, Response
+from pytest_mock import MockerFixture
+
+from services.oidc import ProviderCache
+
+METADATA_URL = "https://provider.test/.well-known/openid-configuration"
+JWKS_URL = "https://provider.test/jwks"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestProviderCache:
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        self.requests: list[str] = []
+        self.fail = False
+        self.cache = ProviderCache(transport=MockTransport(self.handler))
+
+    def handler(self, request: Request) -> Response:
+        self.requests.append(str(request.url))
+
+        if self.fail:
+            return Response(503)
+
+        documents: dict[str, Any] = {
+            METADATA_URL: {"issuer": "https://provider.test", "jwks_uri": JWKS_URL},
+            JWKS_URL: {"keys": [{"kid": str(len(self.requests))}]},
+        }
+        return Response(200, json=documents[str(request.url)], headers={"Cache-Control": "public, max-age=600"})
+
+    async def test_documents_are_cached(self) -> None:
+        await self.cache.get_jwks(METADATA_URL)
+        await self.cache.get_jwks(METADATA_URL)
+        await self.cache.get_metadata(METADATA_URL)
+
+        assert self.requests == [METADATA_URL, JWKS_URL]
+
+    async def test_concurrent_fetches_are_merged(self) -> None:
+        await gather(*(self.cache.get_metadata(METADATA_URL) for _ in range(10)))
+
+        assert self.requests == [METADATA_URL]
+
+    async def test_forced_refetch_is_rate_limited(self, mocker: MockerFixture) -> None:
+        first = await self.cache.get_jwks(METADATA_URL)
+
+        assert await self.cache.get_jwks(METADATA_URL, force=True) == first
+
+        mocker.patch.object(ProviderCache, "REFETCH_INTERVAL", 0)
+
+        assert await self.cache.get_jwks(METADATA_URL, force=True) != first
+
+    async def test_stale_document_is_served_on_failure(self, mocker: MockerFixture) -> None:
+        metadata = await self.cache.get_metadata(METADATA_URL)
+        mocker.patch("services.oidc.monotonic", return_value=10**9)
+        self.fail = True
+
+        assert await self.cache.get_metadata(METADATA_URL) == metadata
+        # The next attempt waits for the minimal TTL
+        assert await self.cache.get_metadata(METADATA_URL) == metadata
+        assert self.requests == [METADATA_URL, METADATA_URL]
+
+    @pytest.mark.parametrize(
+        "cache_control, ttl",
+        [
+            (None, ProviderCache.DEFAULT_TTL),
+            ("public, max-age=19000, must-revalidate", 19000),
+            ("max-age=1", ProviderCache.MIN_TTL),
+            ("max-age=999999999", ProviderCache.MAX_TTL),
+            ("no-cache", ProviderCache.MIN_TTL),
+        ],
+    )
+    async def test_ttl(self, cache_control: str | None, ttl: int) -> None:
+        assert self.cache._ttl(cache_control) == ttl
@@ -0,0 +1,64 @@
+from typing import AsyncIterator
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from services.revocation import BloomFilter, RevocationFilter
+
+
+@pytest.mark.unit
+class TestBloomFilter:
+    def test_added_items_are_always_found(self) -> None:
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"jti-{idx}" for idx in range(1000)]
+
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+
+    def test_false_positive_rate(self) -> None:
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+
+        for idx in range(1000):
+            bloom.add(f"jti-{idx}")
+
+        false_positives = sum(f"other-{idx}" in bloom for idx in range(10000))
+        assert false_positives < 300
+
+
+@pytest.mark.unit
+class TestRevocationFilter:
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        self.filter = RevocationFilter()
+
+    def test_lookup_when_not_synced(self) -> None:
+        self.filter.remember("revoked")
+
+        assert self.filter.lookup("revoked") is None
+        assert self.filter.lookup("unknown") is None
+
+    @pytest.mark.asyncio
+    async def test_lookup_when_synced(self, mocker: MockerFixture) -> None:
+        async def scan_iter(**_: object) -> AsyncIterator[str]:
+            yield f"{RevocationFilter.BLACKLIST_PREFIX}:loaded"
+
+        mocker.patch("services.revocation.redis", MagicMock(scan_iter=scan_iter))
+        await self.filter._rebuild()
+        self.filter.remember("revoked")
+
+        assert self.filter.synced
+        assert self.filter.lookup("unknown") is False
+        assert self.filter.lookup("revoked") is True
+        # Only Redis knows if a loaded token is still revoked
+        assert self.filter.lookup("loaded") is None
+
+    def test_positive_cache_is_bounded(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(RevocationFilter, "CACHE_SIZE", 2)
+
+        for jti in ["first", "second", "third"]:
+            self.filter.remember(jti)
+
+        assert list(self.filter._cache) == ["second", "third"]
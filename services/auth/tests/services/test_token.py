@@ -3,16 +3,19 @@ from datetime import datetime, timedelta, timezone
 from time import time
 from typing import Any
 from unittest.mock import AsyncMock
+from uuid import uuid4
 
 import pytest
-from authlib.jose import JWTClaims
+from authlib.jose import JsonWebKey, JWTClaims
 from pytest_mock import MockerFixture
+from redis.asyncio import Redis
 
 from core.exceptions import InvalidToken, TokenRequired, TokenRevoked
 from enums import TokenTypeEnum
 from models import Account
 from schemas import AccessToken, TokenPair
 from services.token import _require_refresh, _TokenFactory  # noqa
+from tests.fakes import FakeRedis
 
 
 @pytest.mark.unit
@@ -47,6 +50,7 @@ class TestTokenFactory:
             # Imitate action for old token with not actual key id in system
             # It will raise exception in this case if we try to decode token
             mocker.patch.object(_TokenFactory, "signing_kid", return_value="auth-key-1")
+            _TokenFactory.reload_keys()
 
         # Decode token
         with pytest.raises(InvalidToken) if old_token_with_expired_kid else nullcontext():
@@ -56,7 +60,9 @@ class TestTokenFactory:
     def test_access_and_refresh_token_create(self, mocker: MockerFixture, token_type: TokenTypeEnum) -> None:
         create_token_mock = mocker.patch.object(_TokenFactory, "create_token", return_value="test_token")
         result = getattr(self.factory, f"{token_type}_token")(self.subject)
-        create_token_mock.assert_called_once_with(self.subject, token_type)
+        create_token_mock.assert_called_once()
+
+        assert create_token_mock.call_args.args[:2] == (self.subject, token_type)
 
         assert result == "test_token"
 
@@ -94,10 +100,10 @@ class TestTokenFactory:
             "access_token",
             return_value="test_access_token",
         )
-        blacklist_token_mock = mocker.patch.object(_TokenFactory, "blacklist_token")
-        create_pair_mock = mocker.patch.object(_TokenFactory, "create_pair")
+        rotate_mock = mocker.patch.object(_TokenFactory, "rotate_refresh_token")
+        revoked_mock = mocker.patch.object(_TokenFactory, "is_token_revoked", return_value=False)
 
-        async def fake_token_required(_: Any) -> None:
+        async def fake_token_required(*_: Any, **__: Any) -> None:
             self.factory._payload = payload
             return None
 
@@ -115,18 +121,39 @@ class TestTokenFactory:
         if payload_exists:
             token_required_mock.assert_not_called()
         else:
-            token_required_mock.assert_called_once_with(TokenTypeEnum.REFRESH)
+            token_required_mock.assert_called_once_with(TokenTypeEnum.REFRESH, check_revoked=False)
 
         if refresh_will_expire:
-            blacklist_token_mock.assert_called_once_with()
-            create_pair_mock.assert_called_once_with(self.subject)
+            rotate_mock.assert_awaited_once_with()
+            revoked_mock.assert_not_called()
             access_token_mock.assert_not_called()
         else:
-            blacklist_token_mock.assert_not_called()
-            create_pair_mock.assert_not_called()
+            rotate_mock.assert_not_called()
+            revoked_mock.assert_awaited_once_with()
             access_token_mock.assert_called_once_with(self.subject)
             assert isinstance(result, AccessToken)
 
+    @pytest.mark.asyncio
+    async def test_revoked_refresh_token_is_rejected(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(_TokenFactory, "is_token_revoked", return_value=True)
+        self.factory._payload = JWTClaims(
+            payload={"sub": self.subject, "exp": int(time()) + 3600 * 24 * 7},
+            header={"kid": "auth-key-0"},
+        )
+
+        with pytest.raises(TokenRevoked):
+            await self.factory.create_access_token_from_refresh()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("first_use", [True, False])
+    async def test_rotate_refresh_token(self, mocker: MockerFixture, first_use: bool) -> None:
+        mocker.patch.object(_TokenFactory, "blacklist_token", return_value=first_use)
+        self.factory._payload = {"sub": self.subject}
+
+        with nullcontext() if first_use else pytest.raises(TokenRevoked):
+            pair = await self.factory.rotate_refresh_token()
+            assert self.factory.decode_token(pair.refresh_token)["sub"] == self.subject
+
     @pytest.mark.parametrize("account_type", [Account, "some account"])
     def test_create_pair_with_account_and_str(
         self,
@@ -194,6 +221,9 @@ class TestTokenFactory:
         payload = {
             "jti": jti,
             "exp": str(exp),
+            "iat": int(time()),
+            "sub": self.subject,
+            "fid": "test-family",
         }
 
         async def fake_token_required(_: Any) -> None:
@@ -209,22 +239,31 @@ class TestTokenFactory:
         if payload_exists:
             self.factory._payload = payload
 
-        self.redis.setex.reset_mock()
+        self.redis.evalsha.reset_mock()
 
-        await self.factory.blacklist_token()
+        assert await self.factory.blacklist_token()
 
         if payload_exists:
             token_required_mock.assert_not_awaited()
         else:
             token_required_mock.assert_awaited_once_with(TokenTypeEnum.REFRESH)
 
-        self.redis.setex.assert_awaited_once()
-        args, kwargs = self.redis.setex.await_args
-        key, ttl, value = args[:3]
+        # One round-trip both checks and blacklists the token
+        self.redis.evalsha.assert_awaited_once()
+        _, numkeys, key, family_key, account_key, ttl, channel, published, _ = self.redis.evalsha.await_args.args
 
-        assert key.endswith(f":{jti}")
+        assert numkeys == 3 and key.endswith(f":{jti}")
+        assert family_key.endswith(":family:test-family") and account_key.endswith(f":account:{self.subject}")
         assert isinstance(ttl, int) and 1 <= ttl <= 3600
-        assert value == 1
+        assert (channel, published) == (_TokenFactory.REVOCATION_CHANNEL, jti)
+
+    @pytest.mark.asyncio
+    async def test_blacklist_token_once(self, mocker: MockerFixture) -> None:
+        mocker.patch("services.token.redis", self.redis)
+        self.factory._payload = {"jti": "test-jti", "exp": int(time()) + 3600, "iat": int(time()), "sub": self.subject}
+        mocker.patch.object(self.redis, "evalsha", AsyncMock(return_value=0))
+
+        assert not await self.factory.blacklist_token()
 
     @pytest.mark.parametrize(
         "token_type, token_from",
@@ -285,13 +324,28 @@ class TestTokenFactory:
             await self.factory.token_required(expected_token_type)
 
     @pytest.mark.asyncio
-    async def test_is_token_revoked_enabled(self, mocker: MockerFixture) -> None:
+    @pytest.mark.parametrize(
+        "values, expected",
+        [
+            ([None, None, None], False),
+            (["1", None, None], True),
+            ([None, "1", None], True),
+            ([None, None, "100001"], True),
+            ([None, None, "100000"], False),
+        ],
+    )
+    async def test_is_token_revoked_enabled(
+        self,
+        mocker: MockerFixture,
+        values: list[str | None],
+        expected: bool,
+    ) -> None:
         mocker.patch("services.token.redis", self.redis)
         mocker.patch.object(_TokenFactory, "BLACKLIST_ENABLED", True)
-        self.factory._payload = {"jti": "test-jti"}
+        mocker.patch.object(self.redis, "mget", AsyncMock(return_value=values))
+        self.factory._payload = {"jti": "test-jti", "fid": "test-family", "sub": self.subject, "iat": 100}
 
-        self.redis.exists.return_value = True
-        assert await self.factory.is_token_revoked()
+        assert await self.factory.is_token_revoked() is expected
 
     @pytest.mark.asyncio
     async def test_is_token_revoked_disabled(self, mocker: MockerFixture) -> None:
@@ -304,3 +358,95 @@ class TestTokenFactory:
         result = await _require_refresh(self.factory)
 
         assert result is self.factory
+
+    def test_keys_are_parsed_once(self, mocker: MockerFixture) -> None:
+        import_key_spy = mocker.spy(JsonWebKey, "import_key")
+        _TokenFactory.reload_keys()
+
+        for _ in range(3):
+            self.factory.decode_token(self.factory.access_token(self.subject))
+
+        # One signing key and one verification key
+        assert import_key_spy.call_count == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestTokenFamilies:
+    @pytest.fixture(autouse=True)
+    def setup(self, token_factory: Any, script_redis: Redis | FakeRedis, mocker: MockerFixture) -> None:
+        mocker.patch("services.token.redis", script_redis)
+        mocker.patch.object(_TokenFactory, "BLACKLIST_ENABLED", True)
+
+        self.factory = token_factory
+        # Keys of a Redis server outlive the test, so every test revokes its own account
+        self.subject = f"user-{uuid4()}"
+
+    async def test_rotation_keeps_family(self) -> None:
+        refresh_token = self.factory.create_pair(self.subject).refresh_token
+        rotated = await self._use(refresh_token)
+
+        family = self.factory.decode_token(refresh_token)["fid"]
+        assert self.factory.decode_token(rotated.refresh_token)["fid"] == family
+
+    async def test_reuse_revokes_family(self) -> None:
+        refresh_token = self.factory.create_pair(self.subject).refresh_token
+        rotated = await self._use(refresh_token)
+
+        with pytest.raises(TokenRevoked):
+            await self._use(refresh_token)
+
+        with pytest.raises(TokenRevoked):
+            await self._use(rotated.refresh_token)
+
+    async def test_account_revocation(self, mocker: MockerFixture) -> None:
+        now = self.factory._now
+        self.factory._now = now - timedelta(seconds=10)
+        refresh_tokens = [self.factory.create_pair(self.subject).refresh_token for _ in range(3)]
+
+        mocker.patch("services.token.time", return_value=now.timestamp() - 5)
+        await self.factory.revoke_account(self.subject)
+
+        for refresh_token in refresh_tokens:
+            self.factory._payload = self.factory.decode_token(refresh_token)
+            assert await self.factory.is_token_revoked()
+
+        # Tokens of later logins are not affected
+        self.factory._now = now
+        self.factory._payload = self.factory.decode_token(self.factory.create_pair(self.subject).refresh_token)
+        assert not await self.factory.is_token_revoked()
+
+    async def test_login_in_the_second_of_revocation(self, mocker: MockerFixture) -> None:
+        second = self.factory._now.replace(microsecond=0) - timedelta(seconds=10)
+
+        self.factory._now = second + timedelta(milliseconds=100)
+        before = self.factory.create_pair(self.subject).refresh_token
+
+        mocker.patch("services.token.time", return_value=(second + timedelta(milliseconds=200)).timestamp())
+        await self.factory.revoke_account(self.subject)
+
+        self.factory._now = second + timedelta(milliseconds=300)
+        after = self.factory.create_pair(self.subject).refresh_token
+
+        self.factory._payload = self.factory.decode_token(before)
+        assert await self.factory.is_token_revoked()
+
+        # The new login survives the revocation and its token rotates without tripping reuse detection
+        self.factory._payload = self.factory.decode_token(after)
+        assert not await self.factory.is_token_revoked()
+        assert await self._use(after)
+
+    async def test_rotation_after_account_revocation(self, mocker: MockerFixture) -> None:
+        now = self.factory._now
+        self.factory._now = now - timedelta(seconds=10)
+        refresh_token = self.factory.create_pair(self.subject).refresh_token
+
+        mocker.patch("services.token.time", return_value=now.timestamp() - 5)
+        await self.factory.revoke_account(self.subject)
+
+        with pytest.raises(TokenRevoked):
+            await self._use(refresh_token)
+
+    async def _use(self, refresh_token: str) -> TokenPair:
+        self.factory._payload = self.factory.decode_token(refresh_token)
+        return await self.factory.rotate_refresh_token()
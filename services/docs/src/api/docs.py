@@ -1,38 +1,27 @@
-from typing import Any
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.openapi.docs import get_swagger_ui_html
-from fastapi.responses import HTMLResponse
-from httpx import AsyncClient
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
 from core.configs.base import settings
 from core.security import basic_auth
 from schemas import Service
+from services.files import CompressedFile
+from services.openapi import merged_document_cache
+from services.specs import spec_cache
+from services.swagger import load_swagger_ui_assets, render_swagger_ui
 
 router = APIRouter(dependencies=[Depends(basic_auth)])
+assets_router = APIRouter()
 
 
 SERVICES = [Service(name=service) for service in settings.SERVICES]
 
+SWAGGER_UI_PAGE = render_swagger_ui(
+    [s.swagger_data for s in SERVICES] + [{"name": settings.SERVICE_TITLE, "url": "/openapi.json"}]
+)
+SWAGGER_UI_ASSETS = load_swagger_ui_assets()
 
-async def fetch_service_openapi(service_name: str) -> dict[str, Any]:
-    """Fetch service openapi.json from kubernetes cluster."""
-    # noinspection HttpUrlsUsage
-    url = f"http://{service_name}.{settings.NAMESPACE}.svc.cluster.local/openapi.json"
-
-    async with AsyncClient(auth=(settings.BASIC_AUTH_USER, settings.BASIC_AUTH_PASS)) as client:
-        result = await client.get(url)
-
-        if result.status_code != status.HTTP_200_OK:
-            raise HTTPException(status_code=result.status_code)
-
-        data: dict[str, Any] = result.json()
-        return data
 
-
-@router.get("/openapi/{service_name}.json")
-async def proxy_openapi(service_name: str) -> dict[str, Any]:
-    """Proxy for fetching service openapi.json."""
+def _service(service_name: str) -> Service:
+    """Get a known service by its name or host name."""
     service = service_name.replace("-service", "")
 
     if service not in settings.SERVICES:
@@ -41,38 +30,62 @@ async def proxy_openapi(service_name: str) -> dict[str, Any]:
             detail="Service not found",
         )
 
-    return await fetch_service_openapi(service_name)
+    return Service(name=service)
+
+
+def _is_not_modified(request: Request, etag: str) -> bool:
+    """Check if the client already has the current version of a response."""
+    if_none_match = request.headers.get("If-None-Match", "")
+    return if_none_match.strip() == "*" or etag in {tag.strip() for tag in if_none_match.split(",")}
+
+
+def _file_response(request: Request, body: CompressedFile, cache_control: str = "no-cache") -> Response:
+    """Respond with a prepared file, compressed if the client accepts it."""
+    headers = {"ETag": body.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+    if _is_not_modified(request, body.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=body.compressed, media_type=body.media_type, headers=headers)
+
+    return Response(content=body.content, media_type=body.media_type, headers=headers)
+
+
+@router.get("/openapi.json")
+async def merged_openapi(request: Request) -> Response:
+    """Merged openapi.json of all services."""
+    document = await merged_document_cache.get(SERVICES)
+    return _file_response(request, document.body)
+
+
+@router.get("/openapi/{service_name}.json")
+async def proxy_openapi(service_name: str) -> Response:
+    """Proxy for fetching service openapi.json."""
+    spec = await spec_cache.get(_service(service_name).host)
+    return Response(content=spec.content, media_type="application/json")
+
+
+@router.delete("/openapi/cache", status_code=status.HTTP_204_NO_CONTENT)
+async def purge_openapi_cache(service_name: str | None = None) -> None:
+    """Drop cached openapi.json of a service, or of all services, e.g. right after a deploy."""
+    spec_cache.purge(_service(service_name).host if service_name is not None else None)
 
 
 @router.get("/docs")
-async def custom_swagger_ui() -> HTMLResponse:
+async def custom_swagger_ui(request: Request) -> Response:
     """Loads custom swagger ui with multiple services."""
-    html = get_swagger_ui_html(
-        openapi_url="",
-        title=settings.SERVICE_TITLE,
-        swagger_js_url="https://unpkg.com/swagger-ui-dist@5.27.1/swagger-ui-bundle.js",
-        swagger_css_url="https://unpkg.com/swagger-ui-dist@5.27.1/swagger-ui.css",
-        swagger_ui_parameters={
-            "urls": [s.swagger_data for s in SERVICES],
-            "layout": "StandaloneLayout",
-        },
-    )
-
-    standalone_preset = "https://unpkg.com/swagger-ui-dist@5.27.1/swagger-ui-standalone-preset.js"
-    standalone_script = f'<script src="{standalone_preset}"></script>'
-
-    # update body
-    html.body = (
-        bytes(html.body)
-        # --------------
-        .decode("utf-8")
-        .replace("<!-- `SwaggerUIBundle` is now available on the page -->", standalone_script)
-        .replace("SwaggerUIBundle.SwaggerUIStandalonePreset", "SwaggerUIStandalonePreset")
-        .encode("utf-8")
-    )
-
-    # update content length
-    content_length = str(len(html.body)).encode("utf-8")
-    html.raw_headers[0] = (b"content-length", content_length)
-
-    return html
+    return _file_response(request, SWAGGER_UI_PAGE)
+
+
+@assets_router.get("/static/swagger-ui/{version}/{filename}")
+async def swagger_ui_asset(request: Request, version: str, filename: str) -> Response:
+    """Vendored swagger ui file, versioned by URL and thus cached forever."""
+    if version != settings.SWAGGER_UI_VERSION or filename not in SWAGGER_UI_ASSETS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found",
+        )
+
+    return _file_response(request, SWAGGER_UI_ASSETS[filename], "public, max-age=31536000, immutable")
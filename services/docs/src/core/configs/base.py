@@ -13,6 +13,18 @@ class Settings(BaseSettings):
     SERVICE_TITLE: str = "MiM Network API"
     SERVICES: list[str] = []
 
+    # Upstream specs are revalidated after TTL and served stale while upstream is unavailable
+    SPEC_CACHE_TTL_SECONDS: float = 60
+    SPEC_CACHE_STALE_SECONDS: float = 3600
+
+    UPSTREAM_TIMEOUT_SECONDS: float = 5.0
+    UPSTREAM_MAX_CONNECTIONS: int = 20
+    UPSTREAM_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+
+    # Swagger UI bundle is served from this directory if set, otherwise from unpkg.com
+    SWAGGER_UI_VERSION: str = "5.27.1"
+    SWAGGER_UI_ASSETS_DIR: str | None = None
+
     # noinspection PyMethodParameters
     @field_validator("SERVICES")
     def validate_services(cls, values: list[str]) -> list[str]:
@@ -1,14 +1,29 @@
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
 from fastapi import FastAPI
 from httpx import HTTPError
 
-from api.docs import router
+from api.docs import assets_router, router
 from core.exceptions import http_error_handler
+from services.specs import spec_cache
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
+    """Shut down application resources."""
+    yield
+
+    await spec_cache.stop()
+
 
 app = FastAPI(
     docs_url=None,
     redoc_url=None,
     openapi_url=None,
+    lifespan=lifespan,
 )
 
 app.include_router(router)
+app.include_router(assets_router)
 app.add_exception_handler(HTTPError, http_error_handler)
@@ -12,9 +12,13 @@ class Service(BaseModel):
     def title(self) -> str:
         return f"{self.name.title()} Service"
 
+    @property
+    def host(self) -> str:
+        return f"{self.name}-service"
+
     @property
     def openapi_url(self) -> str:
-        return f"/openapi/{self.name}-service.json"
+        return f"/openapi/{self.host}.json"
 
     @property
     def swagger_data(self) -> dict[str, Any]:
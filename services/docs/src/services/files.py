@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+from gzip import compress
+from hashlib import blake2b
+
+__all__ = ["CompressedFile"]
+
+
+@dataclass(frozen=True, slots=True)
+class CompressedFile:
+    """Response body prepared once, along with its gzip version and ETag."""
+
+    content: bytes
+    compressed: bytes
+    media_type: str
+    etag: str
+
+    @classmethod
+    def build(cls, content: bytes, media_type: str) -> "CompressedFile":
+        return cls(
+            content=content,
+            compressed=compress(content, mtime=0),
+            media_type=media_type,
+            # Weak, as the file is served both plain and compressed
+            etag=f'W/"{blake2b(content, digest_size=16).hexdigest()}"',
+        )
@@ -0,0 +1,175 @@
+from asyncio import gather
+from dataclasses import dataclass
+from json import dumps
+from logging import getLogger
+from typing import Any
+
+from core.configs.base import settings
+from schemas import Service
+from services.files import CompressedFile
+from services.specs import CachedSpec, spec_cache
+
+__all__ = [
+    "MergedDocument",
+    "MergedDocumentCache",
+    "merge_specs",
+    "merged_document_cache",
+]
+
+logger = getLogger("uvicorn.error")
+
+_REF_PREFIX = "#/components/"
+
+
+@dataclass(slots=True)
+class MergedDocument:
+    body: CompressedFile
+    sources: tuple[CachedSpec | None, ...]
+
+
+def _mount_path(service: Service, spec: dict[str, Any]) -> str:
+    """Get path the service is mounted at, e.g. `/auth` of a service with `root_path`."""
+    servers = spec.get("servers") or [{}]
+    url: str = servers[0].get("url", "")
+
+    return url.rstrip("/") if url.startswith("/") else f"/{service.name}"
+
+
+def _rewrite_refs(value: Any, renames: dict[str, str]) -> Any:
+    """Rewrite `$ref` pointers to renamed components."""
+    if isinstance(value, dict):
+        return {
+            key: renames.get(item, item) if key == "$ref" else _rewrite_refs(item, renames)
+            for key, item in value.items()
+        }
+
+    if isinstance(value, list):
+        return [_rewrite_refs(item, renames) for item in value]
+
+    return value
+
+
+def _component_renames(service: Service, spec: dict[str, Any], merged: dict[str, Any]) -> dict[tuple[str, str], str]:
+    """Get new names of service components conflicting by name with different ones of other services."""
+    renames = {}
+
+    for section, items in spec.get("components", {}).items():
+        existing = merged["components"].get(section, {})
+
+        for name, item in items.items():
+            if name in existing and existing[name] != item:
+                renames[section, name] = f"{service.name.title()}{name}"
+
+    return renames
+
+
+def _merge_paths(service: Service, spec: dict[str, Any], merged: dict[str, Any]) -> None:
+    """Add service paths under its mount path, keeping operation ids unique."""
+    prefix = _mount_path(service, spec)
+    operation_ids = {
+        operation.get("operationId")
+        for path_item in merged["paths"].values()
+        for operation in path_item.values()
+        if isinstance(operation, dict)
+    }
+
+    for path, path_item in spec.get("paths", {}).items():
+        if (prefixed := f"{prefix}{path}") in merged["paths"]:
+            logger.warning(f"Path {prefixed} of {service.title} conflicts with another service, skipped")
+            continue
+
+        for operation in path_item.values():
+            if not isinstance(operation, dict):
+                continue
+
+            if "security" in spec:
+                operation.setdefault("security", spec["security"])
+
+            if operation.get("operationId") in operation_ids:
+                operation["operationId"] = f"{service.name}_{operation['operationId']}"
+
+        merged["paths"][prefixed] = path_item
+
+
+def merge_specs(specs: list[tuple[Service, dict[str, Any]]]) -> dict[str, Any]:
+    """
+    Merge OpenAPI documents of services into a single one.
+    Paths are prefixed with the service mount path. Components equal across services are shared,
+    and conflicting ones are renamed after the service along with their refs.
+    """
+    merged: dict[str, Any] = {
+        "openapi": "3.1.0",
+        "info": {"title": settings.SERVICE_TITLE, "version": settings.API_VERSION},
+        "paths": {},
+        "components": {},
+        "tags": [],
+    }
+
+    for service, spec in specs:
+        renames = _component_renames(service, spec, merged)
+        refs = {
+            f"{_REF_PREFIX}{section}/{name}": f"{_REF_PREFIX}{section}/{new}"
+            for (section, name), new in renames.items()
+        }
+
+        # Rewriting copies the document, so merging doesn't modify the cached spec
+        spec = _rewrite_refs(spec, refs)
+        _merge_paths(service, spec, merged)
+
+        for section, items in spec.get("components", {}).items():
+            target = merged["components"].setdefault(section, {})
+
+            for name, item in items.items():
+                target.setdefault(renames.get((section, name), name), item)
+
+        tags = {tag["name"] for tag in merged["tags"]}
+        merged["tags"].extend(tag for tag in spec.get("tags", []) if tag["name"] not in tags)
+
+    return merged
+
+
+class MergedDocumentCache:
+    """
+    Merged OpenAPI document of all services, kept serialized and compressed.
+    It is rebuilt only when a service spec changes in the spec cache.
+    """
+
+    __slots__ = ("_document",)
+
+    def __init__(self) -> None:
+        """Initialize merged document cache."""
+        self._document: MergedDocument | None = None
+
+    @staticmethod
+    def _build(services: list[Service], sources: tuple[CachedSpec | None, ...]) -> MergedDocument:
+        specs = [(service, spec.data) for service, spec in zip(services, sources) if spec is not None]
+        content = dumps(merge_specs(specs), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        return MergedDocument(body=CompressedFile.build(content, "application/json"), sources=sources)
+
+    @staticmethod
+    def _changed(sources: tuple[CachedSpec | None, ...], previous: tuple[CachedSpec | None, ...]) -> bool:
+        """Check if any spec was refetched, the spec cache keeps the same object while a spec is not modified."""
+        return len(sources) != len(previous) or any(spec is not old for spec, old in zip(sources, previous))
+
+    async def get(self, services: list[Service]) -> MergedDocument:
+        """Get merged document of given services, fetching their specs concurrently."""
+        results = await gather(*(spec_cache.get(service.host) for service in services), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+
+        if errors and len(errors) == len(results):
+            raise errors[0]
+
+        for service, result in zip(services, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"{service.title} is missing in merged openapi.json: {result!r}")
+
+        sources = tuple(result if isinstance(result, CachedSpec) else None for result in results)
+
+        if self._document is None or self._changed(sources, self._document.sources):
+            self._document = self._build(services, sources)
+
+        return self._document
+
+
+merged_document_cache = MergedDocumentCache()
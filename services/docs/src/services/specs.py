@@ -0,0 +1,174 @@
+from asyncio import Task, create_task, shield
+from dataclasses import dataclass
+from functools import partial
+from logging import getLogger
+from time import monotonic
+from typing import Any
+
+from fastapi import HTTPException, status
+from httpx import AsyncBaseTransport, AsyncClient, HTTPError, Limits, Response
+
+from core.configs.base import settings
+
+__all__ = [
+    "CachedSpec",
+    "SpecCache",
+    "spec_cache",
+]
+
+logger = getLogger("uvicorn.error")
+
+
+@dataclass(slots=True)
+class CachedSpec:
+    data: dict[str, Any]
+    content: bytes
+    etag: str | None
+    last_modified: str | None
+    checked_at: float
+
+
+class SpecCache:
+    """
+    In-memory cache of service openapi.json documents, fetched through a single pooled HTTP client.
+    Specs change only on deploys, so a cached spec is served as is for `TTL` seconds. After that it is still
+    served while being revalidated in background with `ETag` / `Last-Modified`, and it keeps being served
+    while the service is unavailable, until it is `STALE` seconds past its TTL.
+    """
+
+    TTL = settings.SPEC_CACHE_TTL_SECONDS
+    STALE = settings.SPEC_CACHE_STALE_SECONDS
+
+    __slots__ = (
+        "_client",
+        "_inflight",
+        "_specs",
+        "_transport",
+    )
+
+    def __init__(self, transport: AsyncBaseTransport | None = None) -> None:
+        """Initialize spec cache."""
+        self._client: AsyncClient | None = None
+        self._inflight: dict[str, Task[CachedSpec]] = {}
+        self._specs: dict[str, CachedSpec] = {}
+        self._transport = transport
+
+    @property
+    def client(self) -> AsyncClient:
+        """Get HTTP client, creating it on first use."""
+        if self._client is None:
+            self._client = AsyncClient(
+                auth=(settings.BASIC_AUTH_USER, settings.BASIC_AUTH_PASS),
+                timeout=settings.UPSTREAM_TIMEOUT_SECONDS,
+                limits=Limits(
+                    max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+                    keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                transport=self._transport,
+            )
+
+        return self._client
+
+    @staticmethod
+    def url(service_name: str) -> str:
+        """Get URL of service openapi.json in kubernetes cluster."""
+        # noinspection HttpUrlsUsage
+        return f"http://{service_name}.{settings.NAMESPACE}.svc.cluster.local/openapi.json"
+
+    @staticmethod
+    def _parse(response: Response) -> CachedSpec:
+        data: dict[str, Any] = response.json()
+
+        return CachedSpec(
+            data=data,
+            content=response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            checked_at=monotonic(),
+        )
+
+    @staticmethod
+    def _validators(spec: CachedSpec | None) -> dict[str, str]:
+        """Get conditional request headers for revalidation of a cached spec."""
+        headers = {}
+
+        if spec is not None and spec.etag:
+            headers["If-None-Match"] = spec.etag
+
+        if spec is not None and spec.last_modified:
+            headers["If-Modified-Since"] = spec.last_modified
+
+        return headers
+
+    async def get(self, service_name: str) -> CachedSpec:
+        """Get service spec, fetching it only if it isn't cached or is too stale to be served."""
+        spec = self._specs.get(service_name)
+
+        if spec is None or self._expired(spec):
+            return await shield(self._load_task(service_name))
+
+        if monotonic() - spec.checked_at >= self.TTL:
+            self._load_task(service_name)
+
+        return spec
+
+    def purge(self, service_name: str | None = None) -> None:
+        """Drop cached spec of a service, or of all services."""
+        if service_name is None:
+            self._specs.clear()
+        else:
+            self._specs.pop(service_name, None)
+
+    async def stop(self) -> None:
+        """Close HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _expired(self, spec: CachedSpec) -> bool:
+        """Check if a spec is too stale to be served."""
+        return monotonic() - spec.checked_at >= self.TTL + self.STALE
+
+    def _load_task(self, service_name: str) -> Task[CachedSpec]:
+        """Get a task loading the spec, shared by concurrent callers."""
+        if (task := self._inflight.get(service_name)) is None:
+            task = self._inflight[service_name] = create_task(self._load(service_name))
+            task.add_done_callback(partial(self._forget, service_name))
+
+        return task
+
+    def _forget(self, service_name: str, task: Task[CachedSpec]) -> None:
+        self._inflight.pop(service_name, None)
+
+        # Background revalidation is not awaited by anyone, its failure must not be reported as unretrieved
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(self, service_name: str) -> CachedSpec:
+        """Load a spec from the service, falling back to the cached one on failure."""
+        cached = self._specs.get(service_name)
+
+        try:
+            response = await self.client.get(self.url(service_name), headers=self._validators(cached))
+
+            if cached is not None and response.status_code == status.HTTP_304_NOT_MODIFIED:
+                cached.checked_at = monotonic()
+                return cached
+
+            if response.status_code != status.HTTP_200_OK:
+                raise HTTPException(status_code=response.status_code)
+
+            spec = self._parse(response)
+        except (HTTPError, HTTPException, ValueError) as exc:
+            if cached is None or self._expired(cached):
+                raise
+
+            logger.warning(f"Serving stale openapi.json of {service_name}: {exc!r}")
+            return cached
+
+        self._specs[service_name] = spec
+        return spec
+
+
+spec_cache = SpecCache()
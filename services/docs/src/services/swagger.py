@@ -0,0 +1,72 @@
+from pathlib import Path
+from typing import Any
+
+from fastapi.openapi.docs import get_swagger_ui_html
+
+from core.configs.base import settings
+from services.files import CompressedFile
+
+__all__ = [
+    "SWAGGER_UI_FILES",
+    "load_swagger_ui_assets",
+    "render_swagger_ui",
+    "swagger_ui_asset_url",
+]
+
+SWAGGER_UI_FILES = {
+    "favicon-32x32.png": "image/png",
+    "swagger-ui-bundle.js": "text/javascript",
+    "swagger-ui-standalone-preset.js": "text/javascript",
+    "swagger-ui.css": "text/css",
+}
+
+
+def swagger_ui_asset_url(filename: str) -> str:
+    """Get URL of a swagger ui file, served locally if the bundle is vendored."""
+    if settings.SWAGGER_UI_ASSETS_DIR:
+        return f"/static/swagger-ui/{settings.SWAGGER_UI_VERSION}/{filename}"
+
+    return f"https://unpkg.com/swagger-ui-dist@{settings.SWAGGER_UI_VERSION}/{filename}"
+
+
+def load_swagger_ui_assets() -> dict[str, CompressedFile]:
+    """Load vendored swagger ui files, if any, to be served from memory."""
+    if not settings.SWAGGER_UI_ASSETS_DIR:
+        return {}
+
+    directory = Path(settings.SWAGGER_UI_ASSETS_DIR)
+    return {
+        name: CompressedFile.build((directory / name).read_bytes(), media) for name, media in SWAGGER_UI_FILES.items()
+    }
+
+
+def render_swagger_ui(urls: list[dict[str, Any]]) -> CompressedFile:
+    """Render swagger ui page with multiple services."""
+    kwargs = {}
+
+    if settings.SWAGGER_UI_ASSETS_DIR:
+        kwargs["swagger_favicon_url"] = swagger_ui_asset_url("favicon-32x32.png")
+
+    html = get_swagger_ui_html(
+        openapi_url="",
+        title=settings.SERVICE_TITLE,
+        swagger_js_url=swagger_ui_asset_url("swagger-ui-bundle.js"),
+        swagger_css_url=swagger_ui_asset_url("swagger-ui.css"),
+        swagger_ui_parameters={
+            "urls": urls,
+            "layout": "StandaloneLayout",
+        },
+        **kwargs,
+    )
+
+    standalone_script = f'<script src="{swagger_ui_asset_url("swagger-ui-standalone-preset.js")}"></script>'
+    body = (
+        bytes(html.body)
+        # --------------
+        .decode("utf-8")
+        .replace("<!-- `SwaggerUIBundle` is now available on the page -->", standalone_script)
+        .replace("SwaggerUIBundle.SwaggerUIStandalonePreset", "SwaggerUIStandalonePreset")
+        .encode("utf-8")
+    )
+
+    return CompressedFile.build(body, "text/html; charset=utf-8")
@@ -0,0 +1,34 @@
+import pytest
+from fastapi import HTTPException
+from pytest_mock import MockerFixture
+
+from api.docs import purge_openapi_cache
+from core.configs.base import settings
+from services.specs import SpecCache
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestPurgeOpenAPICache:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(settings, "SERVICES", ["auth"])
+        self.purge = mocker.patch.object(SpecCache, "purge")
+
+    @pytest.mark.parametrize("service_name", ["auth", "auth-service"])
+    async def test_purge_by_name_or_host(self, service_name: str) -> None:
+        await purge_openapi_cache(service_name)
+
+        self.purge.assert_called_once_with("auth-service")
+
+    async def test_purge_all(self) -> None:
+        await purge_openapi_cache()
+
+        self.purge.assert_called_once_with(None)
+
+    async def test_unknown_service(self) -> None:
+        with pytest.raises(HTTPException) as exc_info:
+            await purge_openapi_cache("billing")
+
+        assert exc_info.value.status_code == 404
+        self.purge.assert_not_called()
@@ -0,0 +1,94 @@
+from typing import Any
+
+import pytest
+from httpx import MockTransport, Request, Response
+from pytest_mock import MockerFixture
+
+from schemas import Service
+from services.openapi import MergedDocumentCache, merge_specs
+from services.specs import SpecCache
+
+AUTH, USERS = Service(name="auth"), Service(name="users")
+
+
+def _spec(paths: dict[str, Any], schemas: dict[str, Any], **extra: Any) -> dict[str, Any]:
+    return {"openapi": "3.1.0", "paths": paths, "components": {"schemas": schemas}, **extra}
+
+
+def _operation(operation_id: str, schema: str) -> dict[str, Any]:
+    content = {"application/json": {"schema": {"$ref": f"#/components/schemas/{schema}"}}}
+    return {"get": {"operationId": operation_id, "responses": {"200": {"content": content}}}}
+
+
+@pytest.mark.unit
+class TestMergeSpecs:
+    def test_paths_are_prefixed(self) -> None:
+        auth = _spec({"/login": _operation("login", "Error")}, {}, servers=[{"url": "/auth"}])
+        users = _spec({"/me": _operation("me", "Error")}, {})
+
+        merged = merge_specs([(AUTH, auth), (USERS, users)])
+
+        assert list(merged["paths"]) == ["/auth/login", "/users/me"]
+
+    def test_equal_components_are_shared(self) -> None:
+        error = {"type": "object", "properties": {"detail": {"type": "string"}}}
+
+        merged = merge_specs(
+            [
+                (AUTH, _spec({"/a": _operation("a", "Error")}, {"Error": error})),
+                (USERS, _spec({"/b": _operation("b", "Error")}, {"Error": error})),
+            ]
+        )
+
+        assert merged["components"]["schemas"] == {"Error": error}
+
+    def test_conflicts_are_renamed(self) -> None:
+        auth = _spec({"/item": _operation("get_item", "Item")}, {"Item": {"type": "string"}})
+        users = _spec({"/item": _operation("get_item", "Item")}, {"Item": {"type": "integer"}})
+
+        merged = merge_specs([(AUTH, auth), (USERS, users)])
+        operation = merged["paths"]["/users/item"]["get"]
+
+        assert merged["components"]["schemas"] == {"Item": {"type": "string"}, "UsersItem": {"type": "integer"}}
+        assert operation["operationId"] == "users_get_item"
+        assert operation["responses"]["200"]["content"]["application/json"]["schema"] == {
+            "$ref": "#/components/schemas/UsersItem"
+        }
+        # Cached specs stay intact
+        assert users["paths"]["/item"]["get"]["operationId"] == "get_item"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestMergedDocumentCache:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockerFixture) -> None:
+        self.requests: list[str] = []
+        self.fail: set[str] = set()
+        self.cache = MergedDocumentCache()
+
+        mocker.patch("services.openapi.spec_cache", SpecCache(transport=MockTransport(self.handler)))
+
+    def handler(self, request: Request) -> Response:
+        host = request.url.host.split(".")[0]
+        self.requests.append(host)
+
+        if host in self.fail:
+            return Response(503)
+
+        return Response(200, json=_spec({"/ping": _operation(f"{host}_ping", "Pong")}, {"Pong": {"type": "string"}}))
+
+    async def test_document_is_cached(self) -> None:
+        document = await self.cache.get([AUTH, USERS])
+
+        assert await self.cache.get([AUTH, USERS]) is document
+        assert sorted(self.requests) == ["auth-service", "users-service"]
+        assert document.body.etag.startswith('W/"')
+
+    async def test_unavailable_service_is_skipped(self) -> None:
+        self.fail.add("users-service")
+
+        document = await self.cache.get([AUTH, USERS])
+
+        assert b"/auth/ping" in document.body.content
+        assert b"/users/ping" not in document.body.content
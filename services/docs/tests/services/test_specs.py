@@ -0,0 +1,77 @@
+from asyncio import gather, sleep
+
+import pytest
+from fastapi import HTTPException
+from httpx import MockTransport, Request, Response
+from pytest_mock import MockerFixture
+
+from services.specs import SpecCache
+
+SERVICE = "auth-service"
+ETAG = '"v1"'
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestSpecCache:
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        self.requests: list[Request] = []
+        self.status = 200
+        self.cache = SpecCache(transport=MockTransport(self.handler))
+
+    def handler(self, request: Request) -> Response:
+        self.requests.append(request)
+
+        if self.status != 200:
+            return Response(self.status)
+
+        if request.headers.get("If-None-Match") == ETAG:
+            return Response(304)
+
+        return Response(200, json={"openapi": "3.1.0", "paths": {}}, headers={"ETag": ETAG})
+
+    async def test_spec_is_cached(self) -> None:
+        spec = await self.cache.get(SERVICE)
+
+        assert await self.cache.get(SERVICE) is spec
+        assert spec.data["openapi"] == "3.1.0"
+        assert len(self.requests) == 1
+
+    async def test_concurrent_fetches_are_merged(self) -> None:
+        await gather(*(self.cache.get(SERVICE) for _ in range(10)))
+
+        assert len(self.requests) == 1
+
+    async def test_expired_spec_is_revalidated_in_background(self, mocker: MockerFixture) -> None:
+        spec = await self.cache.get(SERVICE)
+        mocker.patch.object(SpecCache, "TTL", 0)
+
+        assert await self.cache.get(SERVICE) is spec
+        await sleep(0.01)
+
+        assert len(self.requests) == 2
+        assert self.requests[1].headers["If-None-Match"] == ETAG
+
+    async def test_stale_spec_is_served_on_failure(self, mocker: MockerFixture) -> None:
+        spec = await self.cache.get(SERVICE)
+        mocker.patch.object(SpecCache, "TTL", 0)
+        self.status = 503
+
+        assert await self.cache.get(SERVICE) is spec
+        await sleep(0.01)
+
+        assert await self.cache.get(SERVICE) is spec
+
+        mocker.patch.object(SpecCache, "STALE", 0)
+
+        with pytest.raises(HTTPException):
+            await self.cache.get(SERVICE)
+
+    async def test_purge(self) -> None:
+        await self.cache.get(SERVICE)
+        self.cache.purge(SERVICE)
+        await self.cache.get(SERVICE)
+
+        assert len(self.requests) == 2
+        assert "If-None-Match" not in self.requests[1].headers
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from core.configs.base import settings
+from services.swagger import SWAGGER_UI_FILES, load_swagger_ui_assets, render_swagger_ui
+
+URLS = [{"name": "Auth Service", "url": "/openapi/auth-service.json"}]
+
+
+@pytest.mark.unit
+class TestSwaggerUI:
+    def test_page_uses_cdn_by_default(self) -> None:
+        page = render_swagger_ui(URLS)
+
+        assert b'<script src="https://unpkg.com/swagger-ui-dist@' in page.content
+        assert load_swagger_ui_assets() == {}
+
+    def test_vendored_assets(self, mocker: MockerFixture, tmp_path: Path) -> None:
+        for name in SWAGGER_UI_FILES:
+            (tmp_path / name).write_bytes(name.encode())
+
+        mocker.patch.object(settings, "SWAGGER_UI_ASSETS_DIR", str(tmp_path))
+
+        page = render_swagger_ui(URLS)
+        assets = load_swagger_ui_assets()
+
+        assert b"unpkg.com" not in page.content
+        assert f"/static/swagger-ui/{settings.SWAGGER_UI_VERSION}/swagger-ui-bundle.js".encode() in page.content
+        assert assets["swagger-ui.css"].content == b"swagger-ui.css"
+        assert assets["swagger-ui.css"].media_type == "text/css"